@@ -0,0 +1,123 @@
+"""
+Microbenchmark of the shared keyword matcher against per-keyword substring scans.
+
+Builds a corpus of Reddit-style titles (or reads one title per line from
+--titles-file), then times the previous RedditMonitor filter, which lowered the
+title and every keyword and ran `in` for each one, against one pass of the
+compiled matcher. A substring scan over the whole shared vocabulary shows the
+cost of answering every category the same way. Also reports how many titles
+are flagged, since substring scans match short keywords such as "fe" inside
+unrelated words and send those posts on to AI evaluation.
+
+Usage:
+    python -m benchmarks.keyword_benchmark --titles 200000
+    python -m benchmarks.keyword_benchmark --titles-file titles.txt
+"""
+import argparse
+import random
+import time
+
+from src.keywords import KEYWORD_CATEGORIES, KeywordMatcher
+from src.retailers.reddit_monitor import RELEVANT_CATEGORIES
+
+# Keyword list of the substring-based Reddit filter, kept for comparison
+LEGACY_KEYWORDS = [
+    "priority access", "priority program", "purchase program",
+    "RTX 5080", "RTX 5090", "drawing", "lottery",
+    "nvidia official", "founders edition", "fe", "queue"
+]
+
+SUBJECTS = [
+    "RTX 5080", "RTX 5090", "RTX 4070 Super", "RX 9070 XT", "Ryzen 7 9800X3D", "Samsung 990 Pro 2TB",
+    "Corsair RM850x", "LG 27GP850", "Fractal North", "Noctua NH-D15", "MSI MAG B650", "G.Skill 32GB DDR5"
+]
+TEMPLATES = [
+    "[GPU] {subject} - ${price} at {store}",
+    "[Build Help] Is the {subject} worth it for 1440p?",
+    "Finally got my {subject} after {weeks} weeks",
+    "{subject} Founders Edition restock megathread",
+    "Safe to buy the {subject} before the holidays? Feeling a bit unsure",
+    "NVIDIA priority access invitations for {subject} are out",
+    "Coil whine on my new {subject}, is this a defect?",
+    "Different fans, same temps: {subject} review",
+    "{store} queue for {subject} live now",
+    "Lottery / drawing for {subject} at {store}",
+    "Coffee break build with a {subject}: feedback welcome",
+    "[Monitor] {subject} - ${price} ({store}) free shipping"
+]
+STORES = ["Best Buy", "Newegg", "Amazon", "B&H", "Micro Center", "Walmart"]
+
+
+def build_corpus(count, seed=7):
+    """Synthetic but realistic mix of titles; each is unique so no cache can help."""
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(count):
+        title = rng.choice(TEMPLATES).format(
+            subject=rng.choice(SUBJECTS), price=rng.randint(49, 2499),
+            store=rng.choice(STORES), weeks=rng.randint(1, 12)
+        )
+        corpus.append(f"{title} #{index}")
+    return corpus
+
+
+def legacy_filter(titles):
+    return sum(1 for title in titles if any(keyword.lower() in title.lower() for keyword in LEGACY_KEYWORDS))
+
+
+def vocabulary_scan(titles):
+    """Every category answered with substring checks of the shared vocabulary."""
+    vocabulary = [(category, term.rstrip("*")) for category, terms in KEYWORD_CATEGORIES.items() for term in terms]
+    flagged = 0
+    for title in titles:
+        lowered = title.lower()
+        categories = {category for category, term in vocabulary if term in lowered}
+        flagged += not RELEVANT_CATEGORIES.isdisjoint(categories)
+    return flagged
+
+
+def matcher_filter(titles, matcher):
+    # The uncached scan, so the numbers reflect matching work rather than cache hits
+    return sum(1 for title in titles if not RELEVANT_CATEGORIES.isdisjoint(matcher._categories(title)))
+
+
+def timed(func, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyword matcher microbenchmark")
+    parser.add_argument("--titles", type=int, default=100000, help="Size of the synthetic corpus")
+    parser.add_argument("--titles-file", help="Read titles from a file, one per line")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs; the best is reported")
+    args = parser.parse_args()
+
+    if args.titles_file:
+        with open(args.titles_file, encoding="utf-8") as f:
+            titles = [line.strip() for line in f if line.strip()]
+    else:
+        titles = build_corpus(args.titles)
+
+    start = time.perf_counter()
+    matcher = KeywordMatcher()
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    print(f"Corpus: {len(titles)} titles, matcher compiled in {compile_ms:.1f} ms")
+    runs = [
+        ("Reddit substring filter", legacy_filter, (titles,)),
+        ("vocabulary substring scan", vocabulary_scan, (titles,)),
+        ("compiled matcher", matcher_filter, (titles, matcher))
+    ]
+    for label, func, func_args in runs:
+        flagged, elapsed = timed(func, *func_args, repeat=args.repeat)
+        print(f"  {label:<26} {len(titles) / elapsed:>10,.0f} titles/s  {elapsed / len(titles) * 1e6:6.2f} us/title  "
+              f"flagged {flagged} ({flagged / len(titles):.0%})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+Offline end-to-end benchmark for GPUMonitor sweeps.
+
+Serves the fixture pages in benchmarks/fixtures from a local HTTP server,
+points every retailer and the NowInStock aggregator at it, runs full sweeps
+and writes per-retailer and per-stage latency percentiles, throughput and peak
+RSS to a JSON file so runs can be compared.
+
+Sweeps go through GPUMonitor.run_sweep (the SweepEngine), which runs the same
+retailer checks as scheduled monitoring but not the TargetScheduler itself, so
+scheduling overhead and interval jitter are not part of the numbers.
+
+Usage:
+    python -m benchmarks.run_benchmark --sweeps 10
+    python -m benchmarks.run_benchmark --compare benchmarks/results/previous.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.metrics import get_metrics
+from src.retailers.browser_recycler import process_tree_rss
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# URL path prefix served for each source -> fixture file
+FIXTURE_ROUTES = {
+    "/bestbuy/": "bestbuy_search.html",
+    "/newegg/": "newegg_search.html",
+    "/msi/": "msi_search.html",
+    "/asus/": "asus_search.html",
+    "/bhphoto/": "bhphoto_search.html",
+    "/nowinstock/": "nowinstock_tracker.html"
+}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves fixture pages with an ETag so conditional requests behave like the real sites."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without this, delayed ACKs add ~40ms per request
+    disable_nagle_algorithm = True
+    fixtures = {}
+
+    def do_GET(self):
+        for prefix, name in FIXTURE_ROUTES.items():
+            if self.path.startswith(prefix):
+                body, etag = self.fixtures[name]
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+        # Images, stylesheets and scripts referenced by the fixtures
+        self.send_response(404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server():
+    """Start the fixture server on a free local port and return (server, base_url)."""
+    for name in set(FIXTURE_ROUTES.values()):
+        with open(os.path.join(FIXTURE_DIR, name), "rb") as f:
+            body = f.read()
+        FixtureHandler.fixtures[name] = (body, f'"{hash(body) & 0xffffffff:08x}"')
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, name="fixture-server", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def point_at_fixtures(monitor, base_url, use_browser):
+    """Redirect every retailer and the aggregator to the fixture server."""
+    prefixes = {"bestbuy": "/bestbuy/", "newegg": "/newegg/", "msi": "/msi/", "asus": "/asus/", "bhphoto": "/bhphoto/"}
+    for key, retailer in monitor.retailers.items():
+        retailer.base_url = base_url + prefixes[key].rstrip("/")
+        retailer.search_url_template = base_url + prefixes[key] + "search?q={}"
+        if not use_browser:
+            # Fixtures are server-rendered, so every retailer can use the HTTP tier
+            retailer.use_http_fetch = True
+    monitor.aggregator.base_url = base_url + "/nowinstock"
+    monitor.aggregator.tracker_urls = [base_url + "/nowinstock/rtx5080/", base_url + "/nowinstock/rtx5090/"]
+
+
+class StageTimer:
+    """Collects durations per (retailer, stage) by wrapping instance methods."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def wrap(self, owner, attribute, retailer, stage):
+        original = getattr(owner, attribute)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.samples[(retailer, stage)].append(time.perf_counter() - start)
+
+        setattr(owner, attribute, timed)
+
+
+class PeakRssSampler:
+    """Samples RSS of this process and its children (e.g. Chrome) in the background."""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, process_tree_rss(os.getpid()) or 0)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        if not self.peak:
+            import resource
+            self.peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentiles(samples):
+    """Summary statistics of a list of durations, in milliseconds."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pick(fraction):
+        return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "p50_ms": pick(0.50),
+        "p90_ms": pick(0.90),
+        "p99_ms": pick(0.99),
+        "max_ms": ordered[-1] * 1000
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_benchmark(sweeps, use_browser=False, verbose=False):
+    """Run GPUMonitor sweeps against the fixture server and return the results dict."""
+    # Keep benchmark state out of the real databases (fixture products must not reach
+    # the snapshot the chatbot answers from) and alert channels
+    state_dir = tempfile.mkdtemp(prefix="gpu-monitor-bench-")
+    os.environ["STATE_DB_PATH"] = os.path.join(state_dir, "state.db")
+    os.environ["AVAILABILITY_SNAPSHOT_PATH"] = os.path.join(state_dir, "availability_snapshot.db")
+    os.environ["REDDIT_STATE_PATH"] = os.path.join(state_dir, "reddit_state.db")
+
+    from src.monitor import GPUMonitor
+    from src.notification import NotificationManager
+    from src.ai_agent.multimodal_agent import MultimodalAgent
+
+    server, base_url = start_fixture_server()
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+    with output:
+        notification_manager = NotificationManager(backends=[])
+        monitor = GPUMonitor(notification_manager, MultimodalAgent())
+    point_at_fixtures(monitor, base_url, use_browser)
+
+    timer = StageTimer()
+    for key, retailer in monitor.retailers.items():
+        timer.wrap(retailer, "fetch_page", key, "fetch")
+        timer.wrap(retailer, "analyze_search_page", key, "analyze")
+    timer.wrap(monitor.aggregator.tracker_engine, "poll", "nowinstock", "fetch")
+    timer.wrap(monitor, "_handle_check_result", "all", "state_and_notify")
+    timer.wrap(monitor, "check_aggregator", "nowinstock", "check")
+
+    check_latencies = defaultdict(list)
+    errors = defaultdict(int)
+    sweep_times = []
+    checks = 0
+
+    with PeakRssSampler() as sampler:
+        for _ in range(sweeps):
+            start = time.perf_counter()
+            with output:
+                monitor.check_aggregator()
+                results = monitor.run_sweep()
+            sweep_times.append(time.perf_counter() - start)
+            checks += len(results) + 1
+            for result in results:
+                retailer_name = result["key"][0]
+                check_latencies[retailer_name].append(result["elapsed"])
+                if result["status"] != "ok" or monitor.retailers[retailer_name].search_errors.get(result["key"][1]):
+                    errors[retailer_name] += 1
+
+    # Spans recorded by the monitor's own instrumentation, before cleanup logs and resets the window
+    spans = get_metrics().summary()
+    with output:
+        monitor.cleanup()
+        notification_manager.close()
+    server.shutdown()
+
+    total_time = sum(sweep_times)
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "config": {"sweeps": sweeps, "browser": use_browser, "engine": "sweep_engine", "python": sys.version.split()[0]},
+        "sweep": percentiles(sweep_times),
+        "retailers": {
+            name: dict(percentiles(samples), errors=errors[name]) for name, samples in check_latencies.items()
+        },
+        "stages": {f"{retailer}.{stage}": percentiles(samples) for (retailer, stage), samples in sorted(timer.samples.items())},
+        "spans": spans,
+        "throughput_checks_per_s": checks / total_time if total_time else 0.0,
+        "peak_rss_mb": sampler.peak / 1048576
+    }
+
+
+def print_report(results, baseline=None):
+    """Print a summary, with p50 changes against a baseline run if given."""
+    def delta(section, key):
+        if not baseline or key not in baseline.get(section, {}):
+            return ""
+        before = baseline[section][key].get("p50_ms")
+        after = results[section][key].get("p50_ms")
+        if not before or after is None:
+            return ""
+        return f"  ({(after - before) / before * 100:+.0f}% vs baseline)"
+
+    sweep = results["sweep"]
+    print(f"Sweeps (SweepEngine via run_sweep, not the scheduler): {sweep['count']}  p50 {sweep['p50_ms']:.0f} ms  p90 {sweep['p90_ms']:.0f} ms")
+    print(f"Throughput: {results['throughput_checks_per_s']:.1f} checks/s  Peak RSS: {results['peak_rss_mb']:.0f} MB")
+    print("\nPer retailer:")
+    for name, stats in results["retailers"].items():
+        print(f"  {name:<10} p50 {stats['p50_ms']:8.1f} ms  p90 {stats['p90_ms']:8.1f} ms  "
+              f"p99 {stats['p99_ms']:8.1f} ms  errors {stats['errors']}{delta('retailers', name)}")
+    print("\nPer stage:")
+    for name, stats in results["stages"].items():
+        print(f"  {name:<28} p50 {stats['p50_ms']:8.2f} ms  p90 {stats['p90_ms']:8.2f} ms{delta('stages', name)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline GPUMonitor sweep benchmark")
+    parser.add_argument("--sweeps", type=int, default=10, help="Number of sweeps to run")
+    parser.add_argument("--browser", action="store_true",
+                        help="Keep browser-bound retailers on headless Chrome instead of the HTTP tier")
+    parser.add_argument("--output", help="Results JSON path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    parser.add_argument("--verbose", action="store_true", help="Show monitor output")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.sweeps, use_browser=args.browser, verbose=args.verbose)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Startup guard for the chatbot.
+
+Starts the chatbot in several fresh interpreters and times the import of
+src.chatbot.gpu_sourcing_chatbot and the construction of GPUSourcingChatbot.
+Each run also reports whether selenium, webdriver_manager or praw were
+loaded, since those belong to the retailer and Reddit clients that are only
+created once a query needs them. Exits with status 1 when the median startup
+exceeds the budget or a heavy module was loaded, so it can guard CI.
+
+Usage:
+    python -m benchmarks.startup_benchmark
+    python -m benchmarks.startup_benchmark --runs 10 --budget 0.5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Modules the chatbot must not load before a query routes to a live check
+DEFERRED_MODULES = ("selenium", "webdriver_manager", "praw")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from src.chatbot.gpu_sourcing_chatbot import GPUSourcingChatbot
+imported = time.perf_counter()
+chatbot = GPUSourcingChatbot()
+ready = time.perf_counter()
+loaded = [name for name in {modules!r} if name in sys.modules]
+chatbot.cleanup()
+print(json.dumps({{"import": imported - start, "init": ready - imported, "loaded": loaded}}))
+"""
+
+
+def run_probe(env):
+    """Start the chatbot in a fresh interpreter and return its timings."""
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE.format(modules=DEFERRED_MODULES)],
+        capture_output=True, text=True, env=env, check=True
+    )
+    # The chatbot prints its own startup lines; the probe result is the last one
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chatbot startup benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to start")
+    parser.add_argument("--budget", type=float, default=1.0, help="Maximum median startup in seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, AVAILABILITY_SNAPSHOT_PATH=os.path.join(workdir, "availability_snapshot.db"))
+        results = [run_probe(env) for _ in range(args.runs)]
+
+    totals = [result["import"] + result["init"] for result in results]
+    median = statistics.median(totals)
+    print(f"Chatbot startup over {args.runs} runs: median {median * 1000:.0f} ms, max {max(totals) * 1000:.0f} ms "
+          f"(import {statistics.median(r['import'] for r in results) * 1000:.0f} ms, "
+          f"init {statistics.median(r['init'] for r in results) * 1000:.0f} ms)")
+
+    failures = []
+    if median > args.budget:
+        failures.append(f"median startup {median:.2f}s exceeds the {args.budget:.2f}s budget")
+    loaded = sorted({name for result in results for name in result["loaded"]})
+    if loaded:
+        failures.append(f"loaded at startup: {', '.join(loaded)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+import io
+import os
+import copy
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from PIL import Image
+
+# Side of the grid used for the difference hash; 16 gives a 256-bit hash
+HASH_SIZE = 16
+
+
+def perceptual_hash(image):
+    """
+    Compute a difference hash (dHash) of a screenshot.
+
+    The image is shrunk to a small grayscale grid and each bit records whether
+    a pixel is brighter than its right-hand neighbour, so re-encoding noise,
+    anti-aliasing and tiny rendering differences produce the same or a very
+    close hash.
+
+    Args:
+        image: Screenshot as PNG/JPEG bytes, or None
+
+    Returns:
+        Hex string of the hash, 'none' for a missing image, or a 'sha1:' digest
+        for data that cannot be decoded as an image
+    """
+    if image is None:
+        return "none"
+    try:
+        grid = Image.open(io.BytesIO(image)).convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS)
+    except Exception:
+        return "sha1:" + hashlib.sha1(image if isinstance(image, bytes) else str(image).encode()).hexdigest()
+
+    pixels = list(grid.getdata())
+    value = 0
+    for row in range(HASH_SIZE):
+        offset = row * (HASH_SIZE + 1)
+        for col in range(HASH_SIZE):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return f"{value:0{HASH_SIZE * HASH_SIZE // 4}x}"
+
+
+def hamming_distance(first, second):
+    """Number of differing bits between two hex perceptual hashes."""
+    return bin(int(first, 16) ^ int(second, 16)).count("1")
+
+
+def _is_perceptual(image_hash):
+    return image_hash != "none" and not image_hash.startswith("sha1:")
+
+
+class InferenceCache:
+    """
+    Cache for visual model inference keyed by a perceptual hash of the image plus the prompt.
+
+    Entries live in an in-memory LRU with a TTL; calls without a screenshot
+    bypass the cache. Screenshots whose hashes are
+    within max_distance bits of a cached one count as the same image. The
+    default of 0 still absorbs encoding noise, but a single changed button
+    label can move the hash by just one bit, so raise it with care. An
+    optional SQLite file keeps results across restarts.
+    """
+
+    def __init__(self, max_entries=512, ttl=300, max_distance=0, disk_path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self.disk_path = disk_path
+        self.hits = 0
+        self.near_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._entries = OrderedDict()  # (prompt, image_hash) -> (value, created)
+        self._hashes_by_prompt = {}
+        self._lock = threading.Lock()
+        self._db = self._open_disk(disk_path) if disk_path else None
+
+    @classmethod
+    def from_env(cls):
+        """Build a cache configured from environment variables."""
+        return cls(
+            max_entries=int(os.getenv("INFERENCE_CACHE_SIZE", "512")),
+            ttl=int(os.getenv("INFERENCE_CACHE_TTL", "300")),  # 5 minutes
+            max_distance=int(os.getenv("INFERENCE_CACHE_MAX_DISTANCE", "0")),
+            disk_path=os.getenv("INFERENCE_CACHE_PATH") or None
+        )
+
+    def get_or_compute(self, image, prompt, compute):
+        """
+        Return the cached result for image + prompt, computing and storing it on a miss.
+
+        Calls without an image are never cached: the prompt alone does not
+        identify the page (e.g. every product check sends the same prompt).
+
+        Args:
+            image: Screenshot bytes (or None)
+            prompt: Prompt or operation name the result depends on
+            compute: Zero-argument callable producing a JSON-serialisable result
+
+        Returns:
+            The cached or freshly computed result
+        """
+        if image is None:
+            with self._lock:
+                self.bypassed += 1
+            return compute()
+        image_hash = perceptual_hash(image)
+        found, value = self.lookup(image_hash, prompt)
+        if found:
+            return value
+        value = compute()
+        self.store(image_hash, prompt, value)
+        return value
+
+    def lookup(self, image_hash, prompt):
+        """
+        Look up a result by image hash and prompt.
+
+        Returns:
+            Tuple of (found, value)
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get((prompt, image_hash))
+            if entry and now - entry[1] < self.ttl:
+                self._entries.move_to_end((prompt, image_hash))
+                self.hits += 1
+                return True, copy.deepcopy(entry[0])
+
+            near_hash = self._find_near(prompt, image_hash, now)
+            if near_hash is not None:
+                self._entries.move_to_end((prompt, near_hash))
+                self.near_hits += 1
+                return True, copy.deepcopy(self._entries[(prompt, near_hash)][0])
+
+        found, value = self._lookup_disk(image_hash, prompt, now)
+        with self._lock:
+            if found:
+                self.disk_hits += 1
+                self._remember(prompt, image_hash, copy.deepcopy(value), now)
+            else:
+                self.misses += 1
+        return found, value
+
+    def store(self, image_hash, prompt, value):
+        """Store a result in memory and, if configured, on disk."""
+        now = time.time()
+        with self._lock:
+            # Keep a private copy so callers mutating their result cannot corrupt the cache
+            self._remember(prompt, image_hash, copy.deepcopy(value), now)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO inference_cache (prompt, image_hash, value, created) VALUES (?, ?, ?, ?)",
+                    (prompt, image_hash, json.dumps(value), now)
+                )
+                self._db.commit()
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.near_hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_rate": (lookups - self.misses) / lookups if lookups else 0.0
+            }
+
+    def _remember(self, prompt, image_hash, value, created):
+        """Insert into the in-memory LRU. Caller holds the lock."""
+        key = (prompt, image_hash)
+        self._entries[key] = (value, created)
+        self._entries.move_to_end(key)
+        self._hashes_by_prompt.setdefault(prompt, set()).add(image_hash)
+        while len(self._entries) > self.max_entries:
+            (old_prompt, old_hash), _ = self._entries.popitem(last=False)
+            self._forget_hash(old_prompt, old_hash)
+
+    def _forget_hash(self, prompt, image_hash):
+        hashes = self._hashes_by_prompt.get(prompt)
+        if hashes:
+            hashes.discard(image_hash)
+            if not hashes:
+                del self._hashes_by_prompt[prompt]
+
+    def _find_near(self, prompt, image_hash, now):
+        """Find a fresh cached hash for the same prompt within max_distance bits. Caller holds the lock."""
+        if not self.max_distance or not _is_perceptual(image_hash):
+            return None
+        for candidate in list(self._hashes_by_prompt.get(prompt, ())):
+            if not _is_perceptual(candidate) or len(candidate) != len(image_hash):
+                continue
+            created = self._entries[(prompt, candidate)][1]
+            if now - created >= self.ttl:
+                del self._entries[(prompt, candidate)]
+                self._forget_hash(prompt, candidate)
+                continue
+            if hamming_distance(candidate, image_hash) <= self.max_distance:
+                return candidate
+        return None
+
+    def _open_disk(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS inference_cache ("
+            "prompt TEXT NOT NULL, image_hash TEXT NOT NULL, value TEXT NOT NULL, "
+            "created REAL NOT NULL, PRIMARY KEY (prompt, image_hash))"
+        )
+        db.commit()
+        return db
+
+    def _lookup_disk(self, image_hash, prompt, now):
+        """Exact or near match in the on-disk tier."""
+        if self._db is None:
+            return False, None
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT image_hash, value FROM inference_cache WHERE prompt = ? AND created > ?",
+                (prompt, now - self.ttl)
+            ).fetchall()
+        for stored_hash, value in rows:
+            if stored_hash == image_hash:
+                return True, json.loads(value)
+        if self.max_distance and _is_perceptual(image_hash):
+            for stored_hash, value in rows:
+                if (_is_perceptual(stored_hash) and len(stored_hash) == len(image_hash)
+                        and hamming_distance(stored_hash, image_hash) <= self.max_distance):
+                    return True, json.loads(value)
+        return False, None
+
+    def close(self):
+        """Close the on-disk tier."""
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,117 @@
+import time
+import threading
+from concurrent.futures import Future
+from queue import Queue, Empty
+
+
+class MicroBatcher:
+    """
+    Collects requests for a few milliseconds and dispatches them as one batch.
+
+    Callers submit single items and get a Future back; a background thread
+    groups items that arrive within max_wait of the first one (up to
+    max_batch_size), calls batch_fn once for the group and routes each result
+    back to its caller's Future. A failing item only fails its own Future.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=8, max_wait=0.005, name="micro-batcher"):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.name = name
+        self.batches = 0
+        self.items = 0
+        self._queue = Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    def submit(self, item):
+        """
+        Queue an item for the next batch.
+
+        Returns:
+            Future resolved with the item's result
+        """
+        future = Future()
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError(f"{self.name} is stopped")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        self._queue.put((item, future))
+        return future
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except Empty:
+                    break
+                if entry is None:
+                    stop = True
+                    break
+                batch.append(entry)
+
+            self._dispatch(batch)
+            if stop:
+                return
+
+    def _dispatch(self, batch):
+        """
+        Run batch_fn for a group and resolve each caller's Future.
+
+        If the batch call fails, each item is retried on its own, so one bad
+        request only fails its own caller rather than the whole batch.
+        """
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = self._call([item for item, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            print(f"{self.name} batch of {len(batch)} failed ({e}), retrying items individually")
+            for item, future in batch:
+                try:
+                    future.set_result(self._call([item])[0])
+                except Exception as item_error:
+                    future.set_exception(item_error)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _call(self, items):
+        results = self.batch_fn(items)
+        if len(results) != len(items):
+            raise RuntimeError(f"{self.name} returned {len(results)} results for {len(items)} items")
+        return results
+
+    def stats(self):
+        """Batch counters, including the average batch size."""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "average_batch_size": self.items / self.batches if self.batches else 0.0
+        }
+
+    def stop(self):
+        """Stop the dispatch thread after queued items are processed."""
+        with self._lock:
+            self._stopped = True
+            if self._thread is None:
+                return
+        self._queue.put(None)
@@ -1,10 +1,24 @@
+import os
 from src.ai_agent.visual_language_model import VisualLanguageModel
 from src.ai_agent.tree_search import TreeSearch
+from src.ai_agent.micro_batcher import MicroBatcher
 
 class MultimodalAgent:
     def __init__(self):
         self.visual_language_model = VisualLanguageModel()
         self.tree_search = TreeSearch(self.visual_language_model)
+        
+        # Requests arriving within the batch window (e.g. from concurrent retailer
+        # checks) are sent to the model together
+        batch_window_ms = float(os.getenv("AI_BATCH_WINDOW_MS", "5"))
+        self.batcher = None
+        if batch_window_ms > 0:
+            self.batcher = MicroBatcher(
+                self.process_input_batch,
+                max_batch_size=int(os.getenv("AI_MAX_BATCH_SIZE", "8")),
+                max_wait=batch_window_ms / 1000,
+                name="ai-batcher"
+            )
 
     def process_input(self, text_input, visual_input):
         """
@@ -17,20 +31,50 @@ class MultimodalAgent:
         Returns:
             Dict with extracted information
         """
-        text_response = self.visual_language_model.process_text(text_input)
+        if self.batcher is not None:
+            return self.batcher.submit((text_input, visual_input)).result()
+        return self.process_input_batch([(text_input, visual_input)])[0]
+
+    def process_input_batch(self, requests):
+        """
+        Process several (text_input, visual_input) requests in one pass.
         
-        # Process visual input if available
-        visual_response = {}
-        if 'screenshot' in visual_input:
-            visual_response = self.visual_language_model.process_visual(visual_input['screenshot'])
+        Screenshots from all requests go to the visual model as a single batch.
+        
+        Args:
+            requests: List of (text_input, visual_input) tuples
             
-        # If HTML is provided, process it as well
-        if 'html' in visual_input:
-            html_response = self.visual_language_model.process_html(visual_input['html'])
-            # Merge HTML response with visual response
-            visual_response = {**visual_response, **html_response}
+        Returns:
+            List of response dicts, in input order
+        """
+        screenshot_indexes = [index for index, (_, visual_input) in enumerate(requests)
+                              if 'screenshot' in visual_input]
+        visual_results = self.visual_language_model.process_visual_batch(
+            [requests[index][1]['screenshot'] for index in screenshot_indexes]
+        )
+        visual_by_index = dict(zip(screenshot_indexes, visual_results))
+        
+        responses = []
+        for index, (text_input, visual_input) in enumerate(requests):
+            text_response = self.visual_language_model.process_text(text_input)
             
-        return self.combine_responses(text_response, visual_response)
+            # Process visual input if available
+            visual_response = visual_by_index.get(index, {})
+            
+            # If HTML is provided, process it as well
+            if 'html' in visual_input:
+                html_response = self.visual_language_model.process_html(visual_input['html'])
+                visual_response = self._merge_html_response(visual_response, html_response)
+                
+            responses.append(self.combine_responses(text_response, visual_response))
+        return responses
+
+    def _merge_html_response(self, visual_response, html_response):
+        """Merge HTML analysis into the visual response."""
+        if isinstance(visual_response, list):
+            # Detected elements stay a list; page-level HTML metadata does not belong in it
+            return visual_response
+        return {**visual_response, **html_response}
 
     def combine_responses(self, text_response, visual_response):
         """Combine text and visual responses."""
@@ -1,7 +1,11 @@
+from src.ai_agent.inference_cache import InferenceCache, perceptual_hash
+
 class VisualLanguageModel:
-    def __init__(self):
+    def __init__(self, inference_cache=None):
         # Initialize the visual language model
         self.model = self.load_model()
+        # Screenshots of unchanged pages are answered from the cache
+        self.inference_cache = inference_cache or InferenceCache.from_env()
 
     def load_model(self):
         # Load the pre-trained visual language model
@@ -23,6 +27,10 @@ class VisualLanguageModel:
         Returns:
             List of detected objects/elements
         """
+        return self.inference_cache.get_or_compute(image, "process_visual", lambda: self._process_visual(image))
+        
+    def _process_visual(self, image):
+        """Run the model on a screenshot (uncached)."""
         print(f"Processing screenshot...")
         # This would call the actual VLM to analyze the screenshot
         # For now, return placeholder data
@@ -31,6 +39,27 @@ class VisualLanguageModel:
             {"type": "button", "text": "See Details", "position": [300, 400]}
         ]
 
+    def process_visual_batch(self, images):
+        """
+        Process several screenshots with a single model invocation.
+        
+        Args:
+            images: List of screenshots as binary data
+            
+        Returns:
+            List of detected objects/elements per screenshot, in input order
+        """
+        return self._cached_batch(
+            [(image, "process_visual") for image in images],
+            lambda missed: self._process_visual_batch([image for image, _ in missed])
+        )
+        
+    def _process_visual_batch(self, images):
+        """Run the model on a batch of screenshots (uncached)."""
+        print(f"Processing batch of {len(images)} screenshots...")
+        # This would run the actual VLM once over the stacked screenshots
+        return [self._process_visual(image) for image in images]
+
     def process_html(self, html):
         """
         Process HTML content to extract structured information.
@@ -57,10 +86,70 @@ class VisualLanguageModel:
         Returns:
             Tuple of (response, input)
         """
+        response = self.inference_cache.get_or_compute(
+            image, text_input, lambda: self._multimodal_inference(image, text_input)
+        )
+        return response, text_input
+        
+    def _multimodal_inference(self, image, text_input):
+        """Run the model on a screenshot and prompt (uncached), returning the response text."""
         # Process the visual and text inputs together
         print(f"Multimodal inference: {text_input}")
         response = "Yes, the RTX 5080 is available with a 'See Details' button."
-        return response, text_input
+        return response
+        
+    def multimodal_inference_batch(self, requests):
+        """
+        Run multimodal inference for several (image, text_input) pairs at once.
+        
+        Args:
+            requests: List of (image, text_input) tuples
+            
+        Returns:
+            List of (response, input) tuples, in input order
+        """
+        responses = self._cached_batch(
+            requests,
+            lambda missed: self._multimodal_inference_batch(missed)
+        )
+        return [(response, text_input) for response, (_, text_input) in zip(responses, requests)]
+        
+    def _multimodal_inference_batch(self, requests):
+        """Run the model on a batch of (image, text_input) pairs (uncached)."""
+        print(f"Multimodal inference batch of {len(requests)} requests")
+        # This would run the actual VLM once over the whole batch
+        return [self._multimodal_inference(image, text_input) for image, text_input in requests]
+        
+    def _cached_batch(self, requests, compute_batch):
+        """
+        Answer (image, prompt) requests from the cache and compute the misses in one batch.
+        
+        Requests without an image are always computed and never cached.
+        
+        Args:
+            requests: List of (image, prompt) tuples
+            compute_batch: Callable taking the missed requests and returning their results
+            
+        Returns:
+            List of results in input order
+        """
+        results = [None] * len(requests)
+        missed, missed_keys = [], []
+        for index, (image, prompt) in enumerate(requests):
+            image_hash = perceptual_hash(image) if image is not None else None
+            found, value = self.inference_cache.lookup(image_hash, prompt) if image_hash else (False, None)
+            if found:
+                results[index] = value
+            else:
+                missed.append((image, prompt))
+                missed_keys.append((index, image_hash, prompt))
+        
+        if missed:
+            for (index, image_hash, prompt), value in zip(missed_keys, compute_batch(missed)):
+                if image_hash:
+                    self.inference_cache.store(image_hash, prompt, value)
+                results[index] = value
+        return results
         
     def generate_decision(self, context):
         """Generate a decision based on context."""
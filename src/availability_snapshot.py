@@ -0,0 +1,96 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+
+def format_age(seconds):
+    """Human-readable age such as 'just now', '4 minutes ago' or '2 hours ago'."""
+    if seconds < 60:
+        return "just now"
+    if seconds < 3600:
+        minutes = int(seconds // 60)
+        return f"{minutes} minute{'s' if minutes != 1 else ''} ago"
+    hours = int(seconds // 3600)
+    return f"{hours} hour{'s' if hours != 1 else ''} ago"
+
+
+def default_max_age():
+    """
+    Snapshot age, in seconds, after which a source counts as stale: twice the
+    monitor's slowest check interval (its time-of-day intervals and any
+    CHECK_INTERVAL_<RETAILER> override), so a running monitor keeps every source fresh.
+    """
+    # Same defaults as the monitor's intervals
+    intervals = [
+        int(os.getenv("INTENSIVE_CHECK_INTERVAL", "60")),
+        int(os.getenv("NORMAL_CHECK_INTERVAL", "300")),
+        int(os.getenv("EXTENDED_CHECK_INTERVAL", "3600"))
+    ]
+    intervals.extend(int(value) for name, value in os.environ.items() if name.startswith("CHECK_INTERVAL_"))
+    return 2 * max(intervals)
+
+
+class AvailabilitySnapshotStore:
+    """
+    Latest in-stock products per source, shared between the monitor and the chatbot.
+
+    The monitor records the outcome of every successful check (including empty
+    ones), keyed by source and scope such as the GPU model searched for. Other
+    processes read the snapshot from the same SQLite file in WAL mode, so the
+    chatbot can answer availability questions without running a sweep itself.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("AVAILABILITY_SNAPSHOT_PATH", os.path.join("data", "availability_snapshot.db"))
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS availability_snapshot (
+                source TEXT NOT NULL,
+                scope TEXT NOT NULL,
+                products TEXT NOT NULL,
+                checked_at REAL NOT NULL,
+                PRIMARY KEY (source, scope)
+            ) WITHOUT ROWID
+        """)
+        self._db.commit()
+
+    def record(self, source, scope, products, checked_at=None):
+        """Replace the products last seen in stock by one check of a source and scope."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO availability_snapshot (source, scope, products, checked_at) VALUES (?, ?, ?, ?)",
+                (source, scope, json.dumps(products, default=str), checked_at or time.time())
+            )
+            self._db.commit()
+
+    def snapshot(self):
+        """
+        Current snapshot, with the products of every scope of a source combined.
+
+        Returns:
+            Dict mapping source -> {'products': list of product dicts,
+            'checked_at': time of the oldest check of the source}
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT source, products, checked_at FROM availability_snapshot ORDER BY source, scope"
+            ).fetchall()
+        result = {}
+        for source, products, checked_at in rows:
+            entry = result.setdefault(source, {"products": [], "checked_at": checked_at})
+            entry["products"].extend(json.loads(products))
+            entry["checked_at"] = min(entry["checked_at"], checked_at)
+        return result
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -1,20 +1,27 @@
 import os
 import sys
 import time
+import threading
 from datetime import datetime
 from src.chatbot.response_generator import ResponseGenerator
 from src.ai_agent.multimodal_agent import MultimodalAgent
-from src.retailers.bestbuy_retailer import BestBuyRetailer
-from src.retailers.newegg_retailer import NeweggRetailer
-from src.retailers.msi_retailer import MSIRetailer
-from src.retailers.asus_retailer import ASUSRetailer
-from src.retailers.bhphoto_retailer import BHPhotoRetailer
-from src.retailers.nowinstock_aggregator import NowInStockAggregator
-from src.retailers.reddit_monitor import RedditMonitor
+from src.keywords import RETAILER_CATEGORIES, get_keyword_matcher
+from src.availability_snapshot import AvailabilitySnapshotStore, default_max_age, format_age
 from dotenv import load_dotenv
 
 class GPUSourcingChatbot:
+    """
+    Interactive assistant for sourcing RTX 5080 and 5090 GPUs.
+    
+    Retailer, aggregator and Reddit clients (and the selenium, webdriver_manager
+    and praw imports behind them) are created the first time a query needs
+    them, so the chatbot starts in well under a second and questions answered
+    from the knowledge base or the availability snapshot never launch Chrome.
+    """
+    
     def __init__(self):
+        init_start = time.time()
+        
         # Load environment variables
         load_dotenv()
         
@@ -22,25 +29,79 @@ class GPUSourcingChatbot:
         self.ai_agent = MultimodalAgent()
         self.response_generator = ResponseGenerator(self.ai_agent)
         
-        # Initialize retailer connections for real-time info
-        self.retailers = {
-            'bestbuy': BestBuyRetailer(self.ai_agent),
-            'newegg': NeweggRetailer(self.ai_agent),
-            'msi': MSIRetailer(self.ai_agent),
-            'asus': ASUSRetailer(self.ai_agent),
-            'bhphoto': BHPhotoRetailer(self.ai_agent)
-        }
-        
-        # Initialize aggregator and Reddit monitor
-        self.aggregator = NowInStockAggregator(self.ai_agent)
-        self.reddit_monitor = RedditMonitor(self.ai_agent)
+        # Browser pool, retailers, aggregator and Reddit monitor are created on first use
+        self._driver_pool = None
+        self._retailers = None
+        self._aggregator = None
+        self._reddit_monitor = None
+        self._clients_lock = threading.RLock()
         
         # Knowledge base on GPU models
         self.gpu_models = ["RTX 5080", "RTX 5090"]
         
+        # Shared keyword matcher used to route queries
+        self.keywords = get_keyword_matcher()
+        
+        # Availability is answered from the monitor's snapshot; sources older than this are refreshed in the background
+        self.availability_snapshot = AvailabilitySnapshotStore()
+        self.availability_max_age = int(os.getenv("AVAILABILITY_MAX_AGE") or default_max_age())
+        self._refresh_lock = threading.Lock()
+        # Last refresh attempt per source, so a source that keeps failing is retried once per max age
+        self._refresh_attempts = {}
+        
         # Session state
         self.chat_history = []
         
+        print(f"Startup: chatbot ready in {time.time() - init_start:.2f}s (retailer clients load on demand)")
+    
+    @property
+    def driver_pool(self):
+        """Shared browser pool for real-time checks."""
+        with self._clients_lock:
+            if self._driver_pool is None:
+                from src.retailers.driver_pool import DriverPool
+                self._driver_pool = DriverPool(size=int(os.getenv("DRIVER_POOL_SIZE", "2")))
+            return self._driver_pool
+    
+    @property
+    def retailers(self):
+        """Retailer connections for real-time info."""
+        with self._clients_lock:
+            if self._retailers is None:
+                start = time.time()
+                from src.retailers.bestbuy_retailer import BestBuyRetailer
+                from src.retailers.newegg_retailer import NeweggRetailer
+                from src.retailers.msi_retailer import MSIRetailer
+                from src.retailers.asus_retailer import ASUSRetailer
+                from src.retailers.bhphoto_retailer import BHPhotoRetailer
+                self._retailers = {
+                    'bestbuy': BestBuyRetailer(self.ai_agent, self.driver_pool),
+                    'newegg': NeweggRetailer(self.ai_agent, self.driver_pool),
+                    'msi': MSIRetailer(self.ai_agent, self.driver_pool),
+                    'asus': ASUSRetailer(self.ai_agent, self.driver_pool),
+                    'bhphoto': BHPhotoRetailer(self.ai_agent, self.driver_pool)
+                }
+                print(f"Startup: retailer clients loaded in {time.time() - start:.2f}s")
+            return self._retailers
+    
+    @property
+    def aggregator(self):
+        """NowInStock aggregator, checked before individual retailers."""
+        with self._clients_lock:
+            if self._aggregator is None:
+                from src.retailers.nowinstock_aggregator import NowInStockAggregator
+                self._aggregator = NowInStockAggregator(self.ai_agent, self.driver_pool)
+            return self._aggregator
+    
+    @property
+    def reddit_monitor(self):
+        """Reddit monitor for priority access posts."""
+        with self._clients_lock:
+            if self._reddit_monitor is None:
+                from src.retailers.reddit_monitor import RedditMonitor
+                self._reddit_monitor = RedditMonitor(self.ai_agent)
+            return self._reddit_monitor
+        
     def start(self):
         """Start the chatbot interface."""
         print("\n" + "=" * 80)
@@ -88,70 +149,133 @@ class GPUSourcingChatbot:
     
     def _is_availability_check(self, query):
         """Check if the query is asking about current GPU availability."""
-        availability_keywords = [
-            'available', 'availability', 'in stock', 'where can i buy', 'where to buy',
-            'find', 'purchase', 'get', 'buy'
-        ]
-        
-        query_lower = query.lower()
+        categories = self.keywords.categories(query)
         
         # Check if query contains both GPU model reference and availability keywords
-        has_gpu_reference = any(gpu.lower() in query_lower for gpu in self.gpu_models) or 'gpu' in query_lower
-        has_availability_keyword = any(keyword in query_lower for keyword in availability_keywords)
+        has_gpu_reference = not categories.isdisjoint({"rtx_5080", "rtx_5090", "gpu"})
         
-        return has_gpu_reference and has_availability_keyword
+        return has_gpu_reference and "availability" in categories
     
     def _is_priority_access_query(self, query):
         """Check if the query is about NVIDIA priority access program."""
-        priority_keywords = [
-            'priority access', 'priority program', 'nvidia direct', 
-            'purchase program', 'drawing', 'lottery', 'invitation'
-        ]
-        
-        query_lower = query.lower()
-        
-        return any(keyword in query_lower for keyword in priority_keywords)
+        return "priority_access" in self.keywords.categories(query)
     
     def _is_retailer_strategy_query(self, query):
         """Check if the query is about retailer strategies."""
-        retailer_names = ['bestbuy', 'best buy', 'newegg', 'msi', 'asus', 'b&h', 'bhphoto']
-        strategy_keywords = ['strategy', 'tip', 'advice', 'how to', 'when', 'restock']
-        
-        query_lower = query.lower()
+        categories = self.keywords.categories(query)
         
-        has_retailer = any(retailer in query_lower for retailer in retailer_names)
-        has_strategy_keyword = any(keyword in query_lower for keyword in strategy_keywords)
+        has_retailer = not categories.isdisjoint(RETAILER_CATEGORIES)
         
-        return has_retailer and has_strategy_keyword
+        return has_retailer and "strategy" in categories
     
     def _check_current_availability(self):
-        """Check and report current GPU availability across retailers."""
-        print("Checking current GPU availability across retailers...")
+        """
+        Report GPU availability from the shared snapshot, with the age of each source's data.
         
-        availability = {}
+        The snapshot is written by the monitor after every check. The answer is
+        always given straight away; sources whose data is older than
+        availability_max_age (e.g. the monitor is not running) are refreshed in
+        the background, or every source when there is no snapshot yet. A source
+        is not retried within availability_max_age of its last refresh, so one
+        that keeps failing does not trigger a live check on every question.
+        """
+        snapshot = self.availability_snapshot.snapshot()
+        now = time.time()
+        due = [
+            source for source, entry in sorted(snapshot.items())
+            if now - entry["checked_at"] > self.availability_max_age
+            and now - self._refresh_attempts.get(source, 0.0) > self.availability_max_age
+        ]
+        refreshing = self._start_availability_refresh(due if snapshot else None) if due or not snapshot else False
         
-        # Check NowInStock first (most efficient)
-        try:
-            in_stock_products = self.aggregator.search_products()
-            if in_stock_products:
-                availability['nowinstock'] = in_stock_products
-        except Exception as e:
-            print(f"Error checking NowInStock: {e}")
+        if not snapshot:
+            return ("I don't have any recent availability data yet. "
+                    + ("I'm checking the retailers now, so ask me again in a minute or two."
+                       if refreshing else "A check is already running, so ask me again in a minute or two."))
         
-        # Check individual retailers if needed
-        if not availability:
-            for retailer_name, retailer in self.retailers.items():
+        availability = {source: entry["products"] for source, entry in snapshot.items()}
+        response = self.response_generator.generate_availability_response(availability)
+        ages = ", ".join(
+            f"{source.title()} {format_age(now - entry['checked_at'])}" for source, entry in sorted(snapshot.items())
+        )
+        response += f"\n\n(Stock data last updated: {ages}"
+        if refreshing:
+            response += f"; refreshing {', '.join(source.title() for source in due)} in the background.)"
+        else:
+            response += ".)"
+        return response
+    
+    def _start_availability_refresh(self, sources=None):
+        """Start a background check of some sources (None for all) unless one is running; returns whether it started."""
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        now = time.time()
+        for source in sources or ():
+            self._refresh_attempts[source] = now
+        threading.Thread(target=self._refresh_availability, args=(sources,), name="availability-refresh",
+                         daemon=True).start()
+        return True
+    
+    def _refresh_availability(self, sources=None):
+        """Check the given sources (None for all) and record them in the snapshot. Holds the refresh lock."""
+        try:
+            print(f"Checking current GPU availability: {', '.join(sources) if sources else 'all sources'}...")
+            
+            # Check NowInStock first (most efficient)
+            if sources is None or "nowinstock" in sources:
                 try:
-                    # Check each GPU model
-                    products = []
-                    for gpu_model in self.gpu_models:
-                        model_products = retailer.search_products(gpu_model)
-                        if model_products:
-                            products.extend(model_products)
-                    
-                    if products:
-                        availability[retailer_name] = products
+                    in_stock_products = self.aggregator.search_products()
+                    if not self.aggregator.search_errors.get(None):
+                        self.availability_snapshot.record("nowinstock", "tracker", in_stock_products)
                 except Exception as e:
-                    print(f"Error checking {retailer_name}: {e}")
-        
-        # Generate response based
\ No newline at end of file
+                    print(f"Error checking NowInStock: {e}")
+            
+            # Retailers are checked even when NowInStock lists stock; when only NowInStock is
+            # stale, the retailer clients (and Chrome) are not loaded at all
+            retailers = self.retailers.items() if sources is None or set(sources) - {"nowinstock"} else ()
+            for retailer_name, retailer in retailers:
+                if sources is not None and retailer_name not in sources:
+                    continue
+                for gpu_model in self.gpu_models:
+                    try:
+                        products = retailer.search_products(gpu_model)
+                        # A failed check says nothing about stock, so the snapshot keeps the previous result
+                        if not retailer.search_errors.get(gpu_model):
+                            self.availability_snapshot.record(retailer_name, gpu_model, products)
+                    except Exception as e:
+                        print(f"Error checking {retailer_name}: {e}")
+        finally:
+            self._refresh_lock.release()
+    
+    def _get_priority_access_info(self):
+        """Report the latest NVIDIA priority access posts from Reddit."""
+        try:
+            priority_data = self.reddit_monitor.check_nvidia_priority_access()
+        except Exception as e:
+            print(f"Error checking priority access: {e}")
+            priority_data = []
+        return self.response_generator.generate_priority_access_response(priority_data)
+    
+    def _get_retailer_strategy(self, query):
+        """Share sourcing strategies for the retailers mentioned in the query."""
+        categories = self.keywords.categories(query)
+        retailer_names = sorted(category.removeprefix("retailer_") for category in categories & RETAILER_CATEGORIES)
+        return "\n\n".join(self.response_generator.generate_retailer_response(name) for name in retailer_names)
+    
+    def cleanup(self):
+        """Close retailer resources and the shared browser pool, if they were ever created."""
+        for retailer_name, retailer in (self._retailers or {}).items():
+            try:
+                retailer.cleanup()
+            except Exception as e:
+                print(f"Error cleaning up {retailer_name}: {e}")
+        if self._aggregator is not None:
+            try:
+                self._aggregator.cleanup()
+            except Exception as e:
+                print(f"Error cleaning up aggregator: {e}")
+        if self._driver_pool is not None:
+            self._driver_pool.close()
+        if self._reddit_monitor is not None:
+            self._reddit_monitor.close()
+        self.availability_snapshot.close()
@@ -3,6 +3,7 @@ import json
 import random
 from datetime import datetime
 from typing import List, Dict, Any
+from src.keywords import get_keyword_matcher
 
 class ResponseGenerator:
     """
@@ -12,6 +13,7 @@ class ResponseGenerator:
     
     def __init__(self, ai_agent):
         self.ai_agent = ai_agent
+        self.keywords = get_keyword_matcher()
         
         # Knowledge base of common GPU questions and answers
         self.knowledge_base = {
@@ -108,26 +110,26 @@ class ResponseGenerator:
     
     def _check_knowledge_base(self, query: str) -> str:
         """Check if the query can be answered directly from the knowledge base."""
-        query_lower = query.lower()
+        categories = self.keywords.categories(query)
         
         # Check for Best Buy strategy questions
-        if re.search(r'best buy|bestbuy', query_lower) and re.search(r'strateg|tip|how|when', query_lower):
+        if "retailer_bestbuy" in categories and "strategy" in categories:
             return self.knowledge_base["bestbuy_strategy"]
             
         # Check for Newegg strategy questions
-        elif re.search(r'newegg', query_lower) and re.search(r'strateg|tip|shuffle|how|when', query_lower):
+        elif "retailer_newegg" in categories and not categories.isdisjoint({"strategy", "shuffle"}):
             return self.knowledge_base["newegg_strategy"]
             
         # Check for priority access questions
-        elif re.search(r'priority access|program|nvidia direct|drawing', query_lower):
+        elif "priority_access" in categories:
             return self.knowledge_base["priority_access"]
             
         # Check for RTX 5080 specifications
-        elif re.search(r'5080', query_lower) and re.search(r'spec|detail|performance|feature', query_lower):
+        elif "rtx_5080" in categories and "specs" in categories:
             return self.knowledge_base["rtx_5080_specs"]
             
         # Check for RTX 5090 specifications
-        elif re.search(r'5090', query_lower) and re.search(r'spec|detail|performance|feature', query_lower):
+        elif "rtx_5090" in categories and "specs" in categories:
             return self.knowledge_base["rtx_5090_specs"]
             
         return None
@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+
+
+class HotModeEscalator:
+    """
+    Polls specific product URLs at a tight interval after a stock signal.
+
+    A signal (a NowInStock listing or a Reddit post linking a retailer) starts
+    an escalation: the product page is checked every few seconds through the
+    retailer's check_product_availability until the time box runs out. The
+    number of concurrent escalations is capped, and escalations end on their own.
+    Polls run in the retailer's scheduler lane, so they never share a browser
+    session with that retailer's regular searches.
+    """
+
+    def __init__(self, scheduler, on_available, interval=15, duration=600, max_active=3):
+        self.scheduler = scheduler
+        self.on_available = on_available
+        self.interval = interval
+        self.duration = duration
+        self.max_active = max_active
+        self.active = {}  # url -> escalation dict
+        self.escalations = 0
+        self.rejected = 0
+        self.detection_latencies = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, scheduler, on_available):
+        """Build an escalator configured from environment variables."""
+        return cls(
+            scheduler,
+            on_available,
+            interval=float(os.getenv("HOT_MODE_INTERVAL", "15")),
+            duration=float(os.getenv("HOT_MODE_DURATION", "600")),  # 10 minutes
+            max_active=int(os.getenv("HOT_MODE_MAX_ACTIVE", "3"))
+        )
+
+    def escalate(self, url, checker, retailer_name, reason, lane=None):
+        """
+        Start (or extend) tight polling of a product URL.
+
+        Args:
+            url: Product page to poll
+            checker: The retailer's check_product_availability
+            retailer_name: Retailer the URL belongs to, for messages
+            reason: What triggered the escalation, e.g. "NowInStock"
+            lane: Scheduler lane of the retailer's searches; defaults to a lane of its own
+
+        Returns:
+            True if the URL is being polled, False if the cap was reached
+        """
+        now = time.monotonic()
+        with self._lock:
+            escalation = self.active.get(url)
+            if escalation:
+                escalation["expires"] = now + self.duration
+                return True
+            if len(self.active) >= self.max_active:
+                self.rejected += 1
+                print(f"Hot mode: {self.max_active} escalations active, not polling {url}")
+                return False
+
+            self.active[url] = {
+                "url": url,
+                "retailer": retailer_name,
+                "reason": reason,
+                "checker": checker,
+                "signalled": now,
+                "expires": now + self.duration,
+                "checks": 0,
+                "available": False
+            }
+            self.escalations += 1
+
+        print(f"Hot mode: polling {url} at {retailer_name} every {self.interval:.0f}s ({reason})")
+        self.scheduler.add(("hot", url), self._poll, url, interval=self.interval, jitter=0.1, lane=lane)
+        return True
+
+    def _poll(self, url):
+        """One scheduled check of an escalated URL."""
+        with self._lock:
+            escalation = self.active.get(url)
+        if escalation is None:
+            return None
+        if time.monotonic() >= escalation["expires"]:
+            self.deescalate(url, "time box reached")
+            return None
+
+        result = escalation["checker"](url)
+        with self._lock:
+            escalation["checks"] += 1
+            if not result or result.get("status") == "ERROR":
+                return result
+            newly_available = bool(result.get("available")) and not escalation["available"]
+            escalation["available"] = bool(result.get("available"))
+            if newly_available:
+                escalation["latency"] = time.monotonic() - escalation["signalled"]
+                self.detection_latencies.append(escalation["latency"])
+
+        if newly_available:
+            self.on_available(escalation, result)
+        return result
+
+    def deescalate(self, url, reason):
+        """Stop polling a URL."""
+        with self._lock:
+            escalation = self.active.pop(url, None)
+        self.scheduler.remove(("hot", url))
+        if escalation:
+            print(f"Hot mode: stopped polling {url} after {escalation['checks']} checks ({reason})")
+
+    def stats(self):
+        """Escalation counters and detection latencies in seconds."""
+        with self._lock:
+            latencies = sorted(self.detection_latencies)
+            return {
+                "active": len(self.active),
+                "escalations": self.escalations,
+                "rejected": self.rejected,
+                "detections": len(latencies),
+                "median_detection_latency": latencies[len(latencies) // 2] if latencies else None
+            }
@@ -0,0 +1,159 @@
+import re
+from functools import lru_cache
+
+# Shared vocabulary for Reddit filtering and chatbot routing, by category.
+# Terms match whole words, case-insensitively; words of a phrase may be joined by
+# spaces, hyphens or nothing ("best buy", "bestbuy", "rtx-5090"), and a trailing
+# "*" matches any word ending ("strateg*" matches "strategy" and "strategies").
+KEYWORD_CATEGORIES = {
+    # Model numbers are prefixes so plurals and suffixed variants ("5090s", "5090ti") still count
+    "rtx_5080": ["rtx 5080*", "5080*"],
+    "rtx_5090": ["rtx 5090*", "5090*"],
+    "gpu": ["gpu*", "graphics card*"],
+    "priority_access": [
+        "priority access", "priority program", "purchase program", "nvidia direct",
+        "drawing", "lottery", "invitation*"
+    ],
+    "drop_signal": ["nvidia official", "founders edition", "fe", "queue"],
+    "megathread": ["megathread*", "mega thread", "launch thread", "drop thread", "restock thread", "live thread"],
+    "stock_chatter": [
+        "in stock", "back in stock", "restock*", "live", "drop", "dropped", "add to cart", "added to cart",
+        "carted", "checkout", "checked out", "sold out", "oos", "got one", "got mine", "queue", "shuffle*"
+    ],
+    "availability": [
+        "available", "availability", "in stock", "where can i buy", "where to buy",
+        "find", "purchase", "get", "buy"
+    ],
+    "strategy": ["strateg*", "tip*", "advice", "how", "when", "restock*"],
+    "shuffle": ["shuffle*"],
+    "specs": ["spec*", "detail*", "performance", "feature*"],
+    "retailer_bestbuy": ["best buy"],
+    "retailer_newegg": ["newegg"],
+    "retailer_msi": ["msi"],
+    "retailer_asus": ["asus"],
+    "retailer_bhphoto": ["b&h", "b&h photo", "bhphoto"]
+}
+
+RETAILER_CATEGORIES = frozenset(category for category in KEYWORD_CATEGORIES if category.startswith("retailer_"))
+
+
+# Separator allowed between the words of a phrase
+PHRASE_SEPARATOR = r"[\s\-]*"
+
+
+_SEPARATOR_TABLE = str.maketrans("", "", " \t\n\r\f\v-")
+
+
+def normalize(text):
+    """Lowercase and drop phrase separators, so "Best-Buy" and "best buy" compare equal."""
+    return text.lower().translate(_SEPARATOR_TABLE)
+
+
+def trie_pattern(terms):
+    """
+    Regex alternation for many terms, factored into a character trie.
+
+    Terms sharing a prefix share a branch of the alternation. Exact terms must
+    end at a word boundary; terms ending in "*" extend to the end of the word.
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term.rstrip("*"):
+            node = node.setdefault(char, {})
+        node[""] = "prefix" if term.endswith("*") or node.get("") == "prefix" else "exact"
+
+    def build(node):
+        branches = [
+            (PHRASE_SEPARATOR if char == " " else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if "" in node:
+            branches.append(r"\w*" if node[""] == "prefix" else r"(?!\w)")
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return r"(?<!\w)" + build(trie)
+
+
+class KeywordMatcher:
+    """
+    Finds every keyword category present in a text with one compiled regex.
+
+    All terms are merged into a single trie-shaped alternation that is scanned
+    once over the lowercased text. A match is resolved back to its term, and the
+    categories of every shorter term it contains (e.g. "5090" inside "rtx 5090",
+    "buy" inside "where to buy") are implied, so overlapping terms never hide a
+    category. Matching whole words costs more per title than the substring scan
+    it replaced; it buys accuracy, not speed.
+    """
+
+    def __init__(self, categories=None, cache_size=1024):
+        categories = categories if categories is not None else KEYWORD_CATEGORIES
+        term_categories = {}
+        for category, terms in categories.items():
+            for term in terms:
+                term_categories.setdefault(term.lower(), set()).add(category)
+
+        self._regex = re.compile(trie_pattern(term_categories))
+        single_patterns = {term: re.compile(trie_pattern([term])) for term in term_categories}
+
+        # Normalised literal -> (term, implied categories); prefix terms are also tried by startswith
+        self._exact = {}
+        self._prefixes = []
+        for term in term_categories:
+            literal = term.rstrip("*")
+            implied = set()
+            for other, pattern in single_patterns.items():
+                if pattern.search(literal):
+                    implied |= term_categories[other]
+            entry = (term, frozenset(implied))
+            # Keyed as written too, so the common case needs no normalisation
+            self._exact[literal] = entry
+            self._exact[normalize(literal)] = entry
+            if term.endswith("*"):
+                self._prefixes.append((normalize(literal), entry))
+        # Longest prefix first, so "graphics card*" resolves before a shorter overlapping prefix
+        self._prefixes.sort(key=lambda item: -len(item[0]))
+        # Chatbot routing asks about the same query several times per turn
+        self.categories = lru_cache(maxsize=cache_size)(self._categories)
+
+    def _resolve(self, matched):
+        """Term and implied categories for a matched span of text."""
+        entry = self._exact.get(matched)
+        if entry is not None:
+            return entry
+        key = normalize(matched)
+        entry = self._exact.get(key)
+        if entry is not None:
+            return entry
+        for prefix, entry in self._prefixes:
+            if key.startswith(prefix):
+                return entry
+        return None, frozenset()
+
+    def _categories(self, text):
+        """Frozenset of the categories present in a text; called through the cached categories()."""
+        found = set()
+        for matched in self._regex.findall(text.lower()):
+            found |= self._resolve(matched)[1]
+        return frozenset(found)
+
+    def matches(self, text):
+        """Dict mapping each matched category to the set of terms found for it."""
+        result = {}
+        for matched in self._regex.findall(text.lower()):
+            term, implied = self._resolve(matched)
+            for category in implied:
+                result.setdefault(category, set()).add(term)
+        return result
+
+
+_shared_matcher = None
+
+
+def get_keyword_matcher():
+    """Return the process-wide matcher over KEYWORD_CATEGORIES, compiled on first use."""
+    global _shared_matcher
+    if _shared_matcher is None:
+        _shared_matcher = KeywordMatcher()
+    return _shared_matcher
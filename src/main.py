@@ -2,10 +2,6 @@ from dotenv import load_dotenv
 import os
 import sys
 import argparse
-from src.monitor import GPUMonitor
-from src.notification import NotificationManager
-from src.ai_agent.multimodal_agent import MultimodalAgent
-from src.chatbot.gpu_sourcing_chatbot import GPUSourcingChatbot
 
 # Retailer check intervals (seconds)
 INTENSIVE_CHECK_INTERVAL=60
@@ -25,7 +21,9 @@ def main():
     # Load environment variables
     load_dotenv()
     
+    # Each mode imports only what it runs; the monitor pulls in selenium and praw, the chatbot defers them
     if args.chatbot:
+        from src.chatbot.gpu_sourcing_chatbot import GPUSourcingChatbot
         print("Starting GPU Sourcing Chatbot...")
         chatbot = GPUSourcingChatbot()
         try:
@@ -38,10 +36,13 @@ def main():
             print("Cleaning up resources...")
             chatbot.cleanup()
     else:
+        from src.monitor import GPUMonitor
+        from src.notification import NotificationManager
+        from src.ai_agent.multimodal_agent import MultimodalAgent
         print("Starting GPU Stock Monitor...")
         
         # Initialize the notification manager
-        notification_manager = NotificationManager()
+        notification_manager = NotificationManager.from_env()
         
         # Initialize the stock monitor with AI agent
         ai_agent = MultimodalAgent()
@@ -56,6 +57,7 @@ def main():
         finally:
             print("Cleaning up resources...")
             monitor.cleanup()
+            notification_manager.close()
 
 if __name__ == "__main__":
     main()
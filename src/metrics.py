@@ -0,0 +1,209 @@
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Bucket upper bounds in seconds, from a cached HTTP fetch up to a slow model call
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+METRIC_NAME = "gpu_monitor_stage_seconds"
+
+
+def source_label(name):
+    """Normalise a retailer or component name ("Best Buy", "bestbuy") to one label value."""
+    return re.sub(r"[^a-z0-9]+", "", str(name).lower()) or "unknown"
+
+
+class Histogram:
+    """Fixed-bucket duration histogram; an observation is one bisect and three additions."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # the last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def snapshot(self):
+        return list(self.counts), self.count, self.sum
+
+
+def bucket_quantile(buckets, counts, fraction):
+    """Estimate a quantile from bucket counts by interpolating inside the bucket, like histogram_quantile."""
+    total = sum(counts)
+    if not total:
+        return 0.0
+    rank = fraction * total
+    seen = 0
+    for index, count in enumerate(counts):
+        if count and seen + count >= rank:
+            if index == len(buckets):
+                return buckets[-1]  # beyond the largest bound
+            lower = buckets[index - 1] if index else 0.0
+            return lower + (buckets[index] - lower) * (rank - seen) / count
+        seen += count
+    return buckets[-1]
+
+
+class StageMetrics:
+    """
+    Timing histograms per (source, stage).
+
+    A source is a retailer or a component such as a notification backend;
+    stages are the steps of a check (driver_acquire, page_load, readiness,
+    page_source, screenshot, ai_inference, filter, notify, ...). Histograms
+    are cumulative for the Prometheus endpoint, while summary() reports the
+    window since the previous summary.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._histograms = {}
+        self._last_summary = {}
+        self._last_summary_at = time.time()
+        self._lock = threading.Lock()
+
+    def observe(self, source, stage, seconds):
+        """Record one duration in seconds."""
+        key = (source_label(source), stage)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def span(self, source, stage):
+        """Time the enclosed block, including blocks that raise."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(source, stage, time.perf_counter() - start)
+
+    def _snapshots(self):
+        with self._lock:
+            return {key: histogram.snapshot() for key, histogram in self._histograms.items()}
+
+    def render_prometheus(self):
+        """All histograms in the Prometheus text exposition format."""
+        lines = [
+            f"# HELP {METRIC_NAME} Duration of GPU monitor check stages",
+            f"# TYPE {METRIC_NAME} histogram"
+        ]
+        for (source, stage), (counts, count, total) in sorted(self._snapshots().items()):
+            labels = f'source="{source}",stage="{stage}"'
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{METRIC_NAME}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{METRIC_NAME}_sum{{{labels}}} {total}")
+            lines.append(f"{METRIC_NAME}_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """
+        Per-stage statistics for the window since the previous summary() call.
+
+        Returns:
+            Dict mapping "source.stage" to {'count', 'total_seconds',
+            'average_seconds', 'p50_seconds', 'p90_seconds'}, ordered by total time
+        """
+        snapshots = self._snapshots()
+        with self._lock:
+            previous, self._last_summary = self._last_summary, snapshots
+            self._last_summary_at = time.time()
+
+        result = {}
+        for key, (counts, count, total) in snapshots.items():
+            before_counts, before_count, before_total = previous.get(key, ([0] * len(counts), 0, 0.0))
+            window = [after - before for after, before in zip(counts, before_counts)]
+            window_count, window_total = count - before_count, total - before_total
+            if not window_count:
+                continue
+            result[f"{key[0]}.{key[1]}"] = {
+                "count": window_count,
+                "total_seconds": window_total,
+                "average_seconds": window_total / window_count,
+                "p50_seconds": bucket_quantile(self.buckets, window, 0.5),
+                "p90_seconds": bucket_quantile(self.buckets, window, 0.9)
+            }
+        return dict(sorted(result.items(), key=lambda item: -item[1]["total_seconds"]))
+
+    def log_summary(self):
+        """Print the stage timings since the previous summary, most time-consuming first."""
+        window_minutes = (time.time() - self._last_summary_at) / 60
+        stages = self.summary()
+        if not stages:
+            print(f"Stage timings (last {window_minutes:.0f} min): no checks")
+            return
+        print(f"Stage timings (last {window_minutes:.0f} min), by total time:")
+        for name, stats in stages.items():
+            print(f"  {name:<32} {stats['count']:>5}x  avg {stats['average_seconds']:7.2f}s  "
+                  f"p50 {stats['p50_seconds']:7.2f}s  p90 {stats['p90_seconds']:7.2f}s  "
+                  f"total {stats['total_seconds']:8.1f}s")
+
+
+class MetricsServer:
+    """Serves the stage histograms at /metrics for Prometheus to scrape."""
+
+    def __init__(self, metrics, host="127.0.0.1", port=9108):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._server = None
+
+    def start(self):
+        """
+        Start serving in a background thread.
+
+        Returns:
+            True if the server is listening, False if the port could not be bound
+        """
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        except OSError as e:
+            print(f"Metrics endpoint disabled, could not bind {self.host}:{self.port}: {e}")
+            return False
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+        print(f"Metrics available at http://{self.host}:{self._server.server_port}/metrics")
+        return True
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+_shared_metrics = StageMetrics()
+
+
+def get_metrics():
+    """Return the process-wide stage metrics."""
+    return _shared_metrics
@@ -7,29 +7,42 @@ from src.retailers.asus_retailer import ASUSRetailer
 from src.retailers.bhphoto_retailer import BHPhotoRetailer
 from src.retailers.nowinstock_aggregator import NowInStockAggregator
 from src.retailers.reddit_monitor import RedditMonitor
+from src.retailers.driver_pool import DriverPool
+from src.retailers.fetch_profiles import get_fetch_stats
+from src.retailers.readiness import get_readiness_stats
+from src.sweep_engine import SweepEngine
+from src.scheduler import TargetScheduler, time_of_day_profile
+from src.escalation import HotModeEscalator
+from src.state_store import StockStateStore, IN_STOCK, OUT_OF_STOCK, PRICE_DROP
+from src.availability_snapshot import AvailabilitySnapshotStore
+from src.metrics import MetricsServer, get_metrics
 import time
-import random
+import threading
 import os
-from datetime import datetime
+from urllib.parse import urlparse
 import pytz
 
 class GPUMonitor:
     def __init__(self, notification_manager: NotificationManager, ai_agent: MultimodalAgent):
+        init_start = time.time()
         self.notification_manager = notification_manager
         self.ai_agent = ai_agent
         self.pst_timezone = pytz.timezone('US/Pacific')
         
+        # Shared browser pool - retailers borrow a browser only for the duration of a check
+        self.driver_pool = DriverPool(size=int(os.getenv("DRIVER_POOL_SIZE", "2")))
+        
         # Initialize retailers
         self.retailers = {
-            'bestbuy': BestBuyRetailer(ai_agent),
-            'newegg': NeweggRetailer(ai_agent),
-            'msi': MSIRetailer(ai_agent),
-            'asus': ASUSRetailer(ai_agent),
-            'bhphoto': BHPhotoRetailer(ai_agent)
+            'bestbuy': BestBuyRetailer(ai_agent, self.driver_pool),
+            'newegg': NeweggRetailer(ai_agent, self.driver_pool),
+            'msi': MSIRetailer(ai_agent, self.driver_pool),
+            'asus': ASUSRetailer(ai_agent, self.driver_pool),
+            'bhphoto': BHPhotoRetailer(ai_agent, self.driver_pool)
         }
         
         # Add NowInStock aggregator
-        self.aggregator = NowInStockAggregator(ai_agent)
+        self.aggregator = NowInStockAggregator(ai_agent, self.driver_pool)
         
         # Add Reddit monitor
         self.reddit_monitor = RedditMonitor(ai_agent)
@@ -39,52 +52,114 @@ class GPUMonitor:
         self.normal_check_interval = int(os.getenv("NORMAL_CHECK_INTERVAL", "300"))  # 5 minutes
         self.extended_check_interval = int(os.getenv("EXTENDED_CHECK_INTERVAL", "3600"))  # 1 hour
         self.reddit_check_interval = int(os.getenv("REDDIT_CHECK_INTERVAL", "1800"))  # 30 minutes
+        self.reddit_comment_interval = int(os.getenv("REDDIT_COMMENT_INTERVAL", "30"))  # megathread comment stream
+        self.check_jitter = float(os.getenv("CHECK_JITTER", "0.1"))
+        
+        # Time-of-day profile shared by stock checks: quiet overnight, intensive in the afternoon (PST)
+        self.check_profile = time_of_day_profile([
+            (0, 6, self.extended_check_interval),
+            (6, 12, self.normal_check_interval),
+            (12, 24, self.intensive_check_interval)
+        ], self.pst_timezone)
+        
+        # Concurrent sweep engine for one-off sweeps (run_sweep, check_gpu_model); the scheduled
+        # monitor uses the scheduler below, so SWEEP_TIMEOUT does not apply to monitor_stock
+        self.sweep_engine = SweepEngine(
+            max_workers=int(os.getenv("SWEEP_MAX_WORKERS", "4")),
+            check_timeout=int(os.getenv("CHECK_TIMEOUT", "120")),  # 2 minutes per check
+            sweep_timeout=int(os.getenv("SWEEP_TIMEOUT", "900"))  # 15 minutes per sweep
+        )
         
         # Products to monitor - only RTX 5080 and 5090
         self.gpu_models = ["RTX 5080", "RTX 5090"]
         
-        # Results tracking
+        # Results tracking - alerts are only sent when a product's state changes
+        self.state_store = StockStateStore()
         self.last_check_results = {}
-        self.last_reddit_check = 0
+        # Latest in-stock products per source, read by the chatbot
+        self.availability_snapshot = AvailabilitySnapshotStore()
+        
+        # Every retailer/model pair and auxiliary source is scheduled independently
+        self.scheduler = TargetScheduler(
+            max_workers=int(os.getenv("SWEEP_MAX_WORKERS", "4")),
+            check_timeout=int(os.getenv("CHECK_TIMEOUT", "120"))
+        )
+        
+        # Hot mode - tight polling of specific products after a stock signal
+        self.escalator = HotModeEscalator.from_env(self.scheduler, self._on_hot_available)
+        
+        # Stage timings - Prometheus endpoint (METRICS_PORT=0 disables it) and a periodic summary log
+        self.metrics = get_metrics()
+        self.metrics_server = MetricsServer(
+            self.metrics,
+            host=os.getenv("METRICS_HOST", "127.0.0.1"),
+            port=int(os.getenv("METRICS_PORT", "9108"))
+        )
+        self.metrics_summary_interval = int(os.getenv("METRICS_SUMMARY_INTERVAL", "900"))  # 15 minutes
+        
+        print(f"Startup: monitor constructed in {time.time() - init_start:.2f}s (browsers launch on demand)")
+    
+    def start_browsers(self):
+        """
+        Launch browsers for browser-bound retailers in parallel, in the background.
+        
+        Retailers served by the HTTP fetch tier do not need a browser at startup,
+        so only enough browsers for the remaining ones are launched.
+        """
+        sources = list(self.retailers.values()) + [self.aggregator]
+        needed = sum(1 for source in sources if not source.use_http_fetch)
+        if needed:
+            threading.Thread(target=self.driver_pool.prewarm, args=(needed,),
+                             name="browser-prewarm", daemon=True).start()
 
+    def target_interval(self, retailer_name):
+        """
+        Check interval for a retailer: a fixed CHECK_INTERVAL_<RETAILER> override
+        in seconds, or the shared time-of-day profile.
+        """
+        override = os.getenv(f"CHECK_INTERVAL_{retailer_name.upper()}")
+        return int(override) if override else self.check_profile
+    
+    def schedule_targets(self):
+        """Register every retailer/model pair, the aggregator and Reddit with the scheduler."""
+        # NowInStock is less resource intensive, so it goes first
+        self.scheduler.add("nowinstock", self.check_aggregator,
+                           interval=self.target_interval("nowinstock"), jitter=self.check_jitter)
+        # PRAW is not thread-safe, so both Reddit targets share one lane
+        self.scheduler.add("reddit", self.check_reddit,
+                           interval=self.reddit_check_interval, jitter=self.check_jitter, lane="reddit")
+        self.scheduler.add("reddit-comments", self.check_reddit_comments,
+                           interval=self.reddit_comment_interval, jitter=self.check_jitter, lane="reddit")
+        
+        for retailer_name, retailer in self.retailers.items():
+            for gpu_model in self.gpu_models:
+                self.scheduler.add(
+                    (retailer_name, gpu_model), retailer.search_products, gpu_model,
+                    interval=self.target_interval(retailer_name),
+                    jitter=self.check_jitter,
+                    lane=retailer_name,
+                    on_result=self._handle_check_result
+                )
+        
+        if self.metrics_summary_interval:
+            self.scheduler.add("metrics", self.metrics.log_summary, interval=self.metrics_summary_interval,
+                               jitter=0, delay=self.metrics_summary_interval)
+    
     def monitor_stock(self):
-        """Monitor stock across all retailers and Reddit."""
+        """Monitor stock across all retailers and Reddit until interrupted."""
         print(f"Starting multi-retailer GPU monitor for: {', '.join(self.gpu_models)}")
         print(f"Monitoring retailers: {', '.join(self.retailers.keys())}")
+        self.start_browsers()
+        if self.metrics_server.port:
+            self.metrics_server.start()
+        self.schedule_targets()
         
-        while True:
-            try:
-                current_time = datetime.now(self.pst_timezone)
-                current_interval = self.get_check_interval()
-                
-                print(f"\nChecking stock at {current_time.strftime('%Y-%m-%d %H:%M:%S %Z')}")
-                
-                # Check NowInStock aggregator first (less resource intensive)
-                self.check_aggregator()
-                
-                # Check individual retailers
-                for gpu_model in self.gpu_models:
-                    self.check_gpu_model(gpu_model)
-                
-                # Check Reddit periodically (not every loop)
-                if time.time() - self.last_reddit_check >= self.reddit_check_interval:
-                    self.check_reddit()
-                    self.last_reddit_check = time.time()
-                
-                # Add some randomness to the interval to avoid detection
-                jitter = random.uniform(0.9, 1.1)
-                actual_interval = int(current_interval * jitter)
-                
-                print(f"Next check in {actual_interval/60:.1f} minutes")
-                time.sleep(actual_interval)
-                
-            except KeyboardInterrupt:
-                print("\nMonitoring stopped by user")
-                break
-            except Exception as e:
-                print(f"Error during monitoring: {e}")
-                # Wait before retrying
-                time.sleep(60)
+        try:
+            self.scheduler.run()
+        except KeyboardInterrupt:
+            print("\nMonitoring stopped by user")
+        finally:
+            self.scheduler.stop()
     
     def check_reddit(self):
         """Check Reddit for GPU availability and priority access information."""
@@ -101,16 +176,23 @@ class GPUMonitor:
                 for post in relevant_posts:
                     post_message = f"[{post.get('subreddit')}/{post.get('score')}] {post.get('title')}: {post.get('url')}"
                     self.notification_manager.notify(post_message)
+                    
+                    # A post linking straight to a retailer product page is a stock signal
+                    if post.get("link_url") and self._retailer_for(post["link_url"]):
+                        self.escalate_product(post["link_url"], None, f"Reddit r/{post.get('subreddit')}")
             
             # Specifically check for priority access information
             priority_info = self.reddit_monitor.check_nvidia_priority_access()
             
-            if priority_info:
+            # Posts analyzed in earlier checks were already reported; edited ones are re-sent as updates
+            new_priority_info = [info for info in priority_info or [] if info.get("new_analysis", True)]
+            if new_priority_info:
                 message = f"Found information about NVIDIA Priority Access Program!"
                 self.notification_manager.notify(message)
                 
-                for info in priority_info:
-                    priority_message = f"[PRIORITY ACCESS] {info.get('title')}: {info.get('url')}"
+                for info in new_priority_info:
+                    label = "PRIORITY ACCESS UPDATE" if info.get("updated") else "PRIORITY ACCESS"
+                    priority_message = f"[{label}] {info.get('title')}: {info.get('url')}"
                     self.notification_manager.notify(priority_message)
                     
                     # Also notify about the analysis if available
@@ -123,63 +205,195 @@ class GPUMonitor:
         except Exception as e:
             print(f"Error checking Reddit: {e}")
     
+    def check_reddit_comments(self):
+        """Report stock chatter from followed Reddit drop megathreads."""
+        try:
+            for comment in self.reddit_monitor.check_megathreads():
+                self.notification_manager.notify(
+                    f"[r/{comment.get('subreddit')} megathread] {comment.get('body')}: {comment.get('url')}"
+                )
+                
+                # A comment linking straight to a retailer product page is a stock signal
+                if comment.get("link_url") and self._retailer_for(comment["link_url"]):
+                    self.escalate_product(comment["link_url"], None, f"Reddit r/{comment.get('subreddit')} megathread")
+                    
+        except Exception as e:
+            print(f"Error checking Reddit megathreads: {e}")
+    
     def check_aggregator(self):
         """Check the NowInStock aggregator."""
         print("Checking NowInStock aggregator...")
         try:
-            in_stock_products = self.aggregator.search_products()
+            with self.metrics.span("NowInStock", "check"):
+                in_stock_products = self.aggregator.search_products()
             
-            if in_stock_products:
-                message = f"NowInStock reports {len(in_stock_products)} RTX 5080/5090 in stock!"
-                self.notification_manager.notify(message)
+            if self.aggregator.search_errors.get(None):
+                print("NowInStock check failed, keeping previous stock state")
+                return
+            
+            with self.metrics.span("NowInStock", "state"):
+                transitions = self.state_store.record_check("NowInStock", "tracker", in_stock_products)
+                self.availability_snapshot.record("nowinstock", "tracker", in_stock_products)
+            newly_in_stock = [t for t in transitions if t["kind"] == IN_STOCK]
+            with self.metrics.span("NowInStock", "notify"):
+                if newly_in_stock:
+                    message = f"NowInStock reports {len(newly_in_stock)} RTX 5080/5090 newly in stock!"
+                    self.notification_manager.notify(message)
                 
-                for product in in_stock_products:
-                    product_message = f"{product.get('name')} at {product.get('retailer')}: {product.get('url')}"
-                    self.notification_manager.notify(product_message)
-            else:
+                for transition in transitions:
+                    self.notification_manager.notify(self._format_transition(transition, "NowInStock"))
+            
+            # Poll the listed product pages directly until the drop is confirmed or the time box ends
+            listed_retailers = {product.get("url"): product.get("retailer") for product in in_stock_products}
+            for transition in newly_in_stock:
+                if transition["url"]:
+                    self.escalate_product(transition["url"], listed_retailers.get(transition["url"]), "NowInStock")
+            
+            if not in_stock_products:
                 print("No products in stock according to NowInStock")
                 
         except Exception as e:
             print(f"Error checking NowInStock: {e}")
     
-    def check_gpu_model(self, gpu_model):
-        """Check a specific GPU model across all retailers."""
-        print(f"Checking {gpu_model} across all retailers...")
+    def _retailer_for(self, url, retailer_name=None):
+        """Find the retailer a product URL belongs to, by name or by domain."""
+        for retailer in self.retailers.values():
+            if retailer_name and retailer_name.lower() == retailer.name.lower():
+                return retailer
+        domain = urlparse(url).netloc.lower().removeprefix("www.")
+        for retailer in self.retailers.values():
+            retailer_domain = urlparse(retailer.base_url).netloc.lower().removeprefix("www.")
+            if domain == retailer_domain or domain.endswith("." + retailer_domain):
+                return retailer
+        return None
+    
+    def escalate_product(self, url, retailer_name, reason):
+        """
+        Start hot-mode polling of a product URL.
+        
+        Known retailers are checked with their own check_product_availability;
+        other links (e.g. NowInStock redirects to unsupported stores) go
+        through the aggregator's generic page check.
+        """
+        retailer = self._retailer_for(url, retailer_name)
+        source = retailer or self.aggregator
+        # Same lane as the source's scheduled searches, so polls never share its browser session concurrently
+        lane = next((key for key, candidate in self.retailers.items() if candidate is retailer), "nowinstock")
+        return self.escalator.escalate(url, source.check_product_availability,
+                                       retailer.name if retailer else (retailer_name or "NowInStock link"), reason,
+                                       lane=lane)
+    
+    def _on_hot_available(self, escalation, result):
+        """Alert when a hot-mode poll confirms availability."""
+        message = (f"HOT: {escalation['url']} is {result.get('status')} at {escalation['retailer']} "
+                   f"(confirmed {escalation['latency']:.0f}s after {escalation['reason']} signal)")
+        self.notification_manager.notify(message)
+    
+    def run_sweep(self, gpu_models=None):
+        """
+        Check the given GPU models across all retailers concurrently.
+        
+        Results are handled as each check finishes rather than after the slowest site.
         
+        Args:
+            gpu_models: Models to check, defaults to all monitored models
+            
+        Returns:
+            List of sweep result dicts in completion order
+        """
+        gpu_models = gpu_models or self.gpu_models
+        tasks = []
+        
+        # Interleave models per retailer so every retailer lane starts immediately
         for retailer_name, retailer in self.retailers.items():
-            try:
-                print(f"Checking {retailer_name} for {gpu_model}...")
-                
-                # Search for products
-                products = retailer.search_products(gpu_model)
-                
-                if products:
-                    message = f"Found {len(products)} {gpu_model} in stock at {retailer_name}!"
-                    self.notification_manager.notify(message)
-                    
-                    for product in products:
-                        product_message = f"{product.get('name')} at {retailer_name}: {product.get('url')}"
-                        self.notification_manager.notify(product_message)
-                else:
-                    print(f"No {gpu_model} in stock at {retailer_name}")
-                    
-            except Exception as e:
-                print(f"Error checking {retailer_name} for {gpu_model}: {e}")
+            for gpu_model in gpu_models:
+                tasks.append(SweepEngine.make_task(
+                    retailer_name, (retailer_name, gpu_model), retailer.search_products, gpu_model
+                ))
+        
+        print(f"Checking {', '.join(gpu_models)} across {len(self.retailers)} retailers...")
+        sweep_start = time.time()
+        results = []
+        
+        for result in self.sweep_engine.run(tasks):
+            self._handle_check_result(result)
+            results.append(result)
+        
+        print(f"Sweep finished in {time.time() - sweep_start:.1f}s")
+        return results
+    
+    def _handle_check_result(self, result):
+        """Notify about a single finished retailer check."""
+        retailer_name, gpu_model = result["key"]
+        self.metrics.observe(retailer_name, "check", result["elapsed"])
+        
+        search_error = self.retailers[retailer_name].search_errors.get(gpu_model)
+        if result["status"] != "ok" or search_error:
+            # A failed check says nothing about stock, so the stored state is left untouched
+            print(f"Error checking {retailer_name} for {gpu_model} ({result['status']}): {result['error'] or search_error}")
+            return
+        
+        products = result["result"]
+        self.last_check_results[(retailer_name, gpu_model)] = {
+            "checked_at": time.time(),
+            "products": products
+        }
+        
+        with self.metrics.span(retailer_name, "state"):
+            transitions = self.state_store.record_check(retailer_name, gpu_model, products)
+            self.availability_snapshot.record(retailer_name, gpu_model, products)
+        newly_in_stock = [t for t in transitions if t["kind"] == IN_STOCK]
+        with self.metrics.span(retailer_name, "notify"):
+            if newly_in_stock:
+                message = f"Found {len(newly_in_stock)} {gpu_model} newly in stock at {retailer_name}!"
+                self.notification_manager.notify(message)
+            
+            for transition in transitions:
+                self.notification_manager.notify(self._format_transition(transition, retailer_name))
+        
+        if not products:
+            print(f"No {gpu_model} in stock at {retailer_name} ({result['elapsed']:.1f}s)")
+        elif not transitions:
+            print(f"{len(products)} {gpu_model} still in stock at {retailer_name}, no changes")
+        
+        target = self.scheduler.targets.get(result["key"])
+        if target is not None and target.next_due:
+            print(f"Next {gpu_model} check at {retailer_name} in {max(0, target.next_due - time.monotonic()) / 60:.1f} minutes")
+    
+    def _format_transition(self, transition, retailer_name):
+        """Build the notification message for a stock state transition."""
+        name, url = transition["name"], transition["url"]
+        kind = transition["kind"]
+        
+        if kind == IN_STOCK:
+            price = f" for ${transition['new_price']:,.2f}" if transition["new_price"] is not None else ""
+            return f"{name} in stock at {retailer_name}{price}: {url}"
+        if kind == PRICE_DROP:
+            return (f"Price drop: {name} at {retailer_name} "
+                    f"${transition['old_price']:,.2f} -> ${transition['new_price']:,.2f}: {url}")
+        if kind == OUT_OF_STOCK:
+            return f"{name} is no longer in stock at {retailer_name}"
+        return f"{name} at {retailer_name} changed from {transition['old_status']} to {transition['new_status']}: {url}"
+    
+    def check_gpu_model(self, gpu_model):
+        """Check a specific GPU model across all retailers."""
+        return self.run_sweep([gpu_model])
     
     def get_check_interval(self):
         """Determine the current check interval based on time of day."""
-        current_hour = datetime.now(self.pst_timezone).hour
-        
-        if 0 <= current_hour < 6:
-            return self.extended_check_interval
-        elif 6 <= current_hour < 12:
-            return self.normal_check_interval
-        else:
-            return self.intensive_check_interval
+        return self.check_profile()
     
     def cleanup(self):
         """Clean up resources for all retailers."""
         print("Cleaning up resources...")
+        for retailer_name, retailer in self.retailers.items():
+            stats = retailer.browser_stats()
+            peak = f"{stats['peak_rss_mb']:.0f} MB" if stats["peak_rss_mb"] is not None else "n/a"
+            print(f"Browser usage at {retailer_name}: {stats['checks']} checks, peak RSS {peak}, {stats['recycles']} recycles")
+        self.scheduler.shutdown()
+        self.sweep_engine.shutdown()
+        self.metrics_server.close()
+        
         for retailer_name, retailer in self.retailers.items():
             try:
                 if hasattr(retailer, 'cleanup'):
@@ -191,4 +405,19 @@ class GPUMonitor:
             if hasattr(self.aggregator, 'cleanup'):
                 self.aggregator.cleanup()
         except Exception as e:
-            print(f"Error cleaning up aggregator: {e}")
\ No newline at end of file
+            print(f"Error cleaning up aggregator: {e}")
+        
+        self.driver_pool.close()
+        self.state_store.close()
+        self.availability_snapshot.close()
+        self.reddit_monitor.close()
+        
+        for profile, totals in get_fetch_stats().summary().items():
+            print(f"Fetch profile {profile}: {totals['pages']} pages, {totals['bytes'] / 1048576:.1f} MB loaded, "
+                  f"{totals['blocked_requests']} requests blocked (~{totals['bytes_saved'] / 1048576:.1f} MB saved)")
+        
+        for retailer_name, outcomes in get_readiness_stats().summary().items():
+            summary = ", ".join(f"{outcome} {o['count']}x avg {o['average_seconds']:.1f}s" for outcome, o in outcomes.items())
+            print(f"Page outcomes at {retailer_name}: {summary}")
+        
+        self.metrics.log_summary()
\ No newline at end of file
@@ -1,30 +1,310 @@
-class NotificationManager:
-    def notify(self, message: str):
-        # Implement the logic to send notifications
-        print(f"Notification: {message}")
+import os
+import json
+import time
+import smtplib
+import threading
+from collections import deque
+from email.message import EmailMessage
+from queue import Queue, Empty
 
-    def send_notification(self, message, title="Best Buy Stock Alert"):
-        """Send desktop and sound notifications."""
-        # Desktop notification
-        try:
-            notification.notify(
-                title=title,
-                message=message,
-                app_name="Best Buy Monitor",
-                timeout=10,
-            )
-        except Exception as e:
-            print(f"Desktop notification failed: {e}")
+import requests
+
+from src.metrics import get_metrics
+
+DEFAULT_TITLE = "GPU Stock Alert"
+
+
+class ConsoleBackend:
+    """Prints alerts to the terminal."""
+
+    name = "console"
+
+    def send(self, title, message):
+        print("\n" + "!" * 50)
+        print(f"\033[91m{title}: {message}\033[0m")
+        print("!" * 50 + "\n")
+
+    def close(self):
+        pass
+
+
+class DesktopBackend:
+    """
+    Desktop popup via plyer, plus a beep on Windows.
+
+    Only the popup can fail the send (and be retried); a failed beep is logged
+    so a retry never shows the same popup twice. Needs a desktop session, so
+    it is opt-in through NOTIFY_BACKENDS.
+    """
+
+    name = "desktop"
+
+    def __init__(self, app_name="GPU Stock Monitor", beeps=3):
+        self.app_name = app_name
+        self.beeps = beeps
+
+    def send(self, title, message):
+        from plyer import notification
+        notification.notify(title=title, message=message, app_name=self.app_name, timeout=10)
 
-        # Sound alert
         try:
-            for _ in range(3):
+            import winsound
+        except ImportError:
+            return
+        try:
+            for _ in range(self.beeps):
                 winsound.Beep(1000, 500)
-                time_module.sleep(0.5)
+                time.sleep(0.5)
         except Exception as e:
-            print(f"Sound alert failed: {e}")
-        
-        # Console output
-        print("\n" + "!" * 50)
-        print(f"\033[91m{title}: {message}\033[0m")
-        print("!" * 50 + "\n")
\ No newline at end of file
+            print(f"Desktop notification beep failed: {e}")
+
+    def close(self):
+        pass
+
+
+class WebhookBackend:
+    """POSTs alerts as JSON to a webhook URL over a pooled keep-alive session."""
+
+    name = "webhook"
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+
+    def send(self, title, message):
+        payload = {"title": title, "message": message, "text": f"{title}: {message}"}
+        response = self.session.post(self.url, data=json.dumps(payload), timeout=self.timeout)
+        response.raise_for_status()
+
+    def close(self):
+        self.session.close()
+
+
+class SMTPBackend:
+    """
+    Emails alerts, keeping one SMTP connection open between messages.
+
+    A dropped connection is closed and reopened by the next attempt, so the
+    manager's retry covers servers that time out idle clients.
+    """
+
+    name = "smtp"
+
+    def __init__(self, host, port=587, username=None, password=None, sender=None, recipients=None,
+                 starttls=True, timeout=15):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.sender = sender or username
+        self.recipients = recipients or []
+        self.starttls = starttls
+        self.timeout = timeout
+        self._connection = None
+
+    def _connect(self):
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            connection.starttls()
+        if self.username and self.password:
+            connection.login(self.username, self.password)
+        return connection
+
+    def send(self, title, message):
+        email = EmailMessage()
+        email["Subject"] = title
+        email["From"] = self.sender
+        email["To"] = ", ".join(self.recipients)
+        email.set_content(message)
+
+        if self._connection is None:
+            self._connection = self._connect()
+        try:
+            self._connection.send_message(email)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        if self._connection is not None:
+            try:
+                self._connection.quit()
+            except Exception:
+                pass
+            self._connection = None
+
+
+class NotificationManager:
+    """
+    Delivers alerts through pluggable backends without blocking the caller.
+
+    notify() only enqueues. Each backend has its own queue and worker thread,
+    so a slow SMTP server never delays the console or webhook. Failed sends are
+    retried with a growing delay, and per-backend counters and latencies are
+    kept for stats().
+    """
+
+    def __init__(self, backends=None, max_retries=3, retry_delay=1.0, latency_window=200):
+        self.backends = backends if backends is not None else [ConsoleBackend()]
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._queues = {}
+        self._workers = []
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+        for backend in self.backends:
+            self._queues[backend.name] = Queue()
+            self._metrics[backend.name] = {
+                "sent": 0,
+                "failed": 0,
+                "retries": 0,
+                "latencies": deque(maxlen=latency_window)
+            }
+            worker = threading.Thread(target=self._run, args=(backend,), name=f"notify-{backend.name}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a manager from environment variables.
+
+        NOTIFY_BACKENDS is a comma-separated list of console, desktop, webhook
+        and smtp (default "console"; desktop needs a desktop session). The webhook needs WEBHOOK_URL and
+        SMTP needs SMTP_HOST and SMTP_TO.
+        """
+        names = [name.strip().lower() for name in os.getenv("NOTIFY_BACKENDS", "console").split(",") if name.strip()]
+        backends = []
+        for name in names:
+            if name == "console":
+                backends.append(ConsoleBackend())
+            elif name == "desktop":
+                backends.append(DesktopBackend())
+            elif name == "webhook":
+                url = os.getenv("WEBHOOK_URL")
+                if not url:
+                    print("WEBHOOK_URL is not set, skipping webhook notifications")
+                    continue
+                backends.append(WebhookBackend(url))
+            elif name == "smtp":
+                host = os.getenv("SMTP_HOST")
+                recipients = [r.strip() for r in os.getenv("SMTP_TO", "").split(",") if r.strip()]
+                if not host or not recipients:
+                    print("SMTP_HOST or SMTP_TO is not set, skipping email notifications")
+                    continue
+                backends.append(SMTPBackend(
+                    host,
+                    port=int(os.getenv("SMTP_PORT", "587")),
+                    username=os.getenv("SMTP_USER") or None,
+                    password=os.getenv("SMTP_PASSWORD") or None,
+                    sender=os.getenv("SMTP_FROM") or None,
+                    recipients=recipients,
+                    starttls=os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+                ))
+            else:
+                print(f"Unknown notification backend: {name}")
+
+        return cls(
+            backends=backends,
+            max_retries=int(os.getenv("NOTIFY_MAX_RETRIES", "3")),
+            retry_delay=float(os.getenv("NOTIFY_RETRY_DELAY", "1.0"))
+        )
+
+    def notify(self, message: str, title: str = DEFAULT_TITLE):
+        """Queue an alert for every backend and return immediately."""
+        with self._lock:
+            if self._closed:
+                return
+            for queue in self._queues.values():
+                queue.put((title, message))
+
+    def send_notification(self, message, title=DEFAULT_TITLE):
+        """Queue an alert with a custom title."""
+        self.notify(message, title=title)
+
+    def _run(self, backend):
+        queue = self._queues[backend.name]
+        while True:
+            item = queue.get()
+            try:
+                if item is None:
+                    return
+                self._deliver(backend, *item)
+            finally:
+                queue.task_done()
+
+    def _deliver(self, backend, title, message):
+        """Send one alert through a backend, retrying with backoff."""
+        metrics = self._metrics[backend.name]
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                backend.send(title, message)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    with self._lock:
+                        metrics["failed"] += 1
+                    print(f"{backend.name} notification failed after {attempt + 1} attempts: {e}")
+                    return
+                with self._lock:
+                    metrics["retries"] += 1
+                time.sleep(self.retry_delay * (2 ** attempt))
+                continue
+            latency = time.perf_counter() - start
+            with self._lock:
+                metrics["sent"] += 1
+                metrics["latencies"].append(latency)
+            get_metrics().observe(backend.name, "notify_deliver", latency)
+            return
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued alert has been delivered or given up on.
+
+        Returns:
+            True if all queues drained before the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for queue in self._queues.values():
+            while queue.unfinished_tasks:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+                time.sleep(0.01)
+        return True
+
+    def stats(self):
+        """Per-backend delivery counters and latency percentiles in seconds."""
+        result = {}
+        with self._lock:
+            for name, metrics in self._metrics.items():
+                latencies = sorted(metrics["latencies"])
+                result[name] = {
+                    "queued": self._queues[name].qsize(),
+                    "sent": metrics["sent"],
+                    "failed": metrics["failed"],
+                    "retries": metrics["retries"],
+                    "latency_avg": sum(latencies) / len(latencies) if latencies else 0.0,
+                    "latency_p95": latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0
+                }
+        return result
+
+    def close(self, timeout=10):
+        """Deliver what is queued (up to timeout), then stop the workers and close backends."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self.flush(timeout)
+        for queue in self._queues.values():
+            queue.put(None)
+        for worker in self._workers:
+            worker.join(timeout=1)
+        for backend in self.backends:
+            try:
+                backend.close()
+            except Exception as e:
+                print(f"Error closing {backend.name} notifications: {e}")
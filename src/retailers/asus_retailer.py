@@ -2,65 +2,66 @@ import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from src.retailers.base_retailer import BaseRetailer
+from src.retailers.base_retailer import BaseRetailer, uses_browser
+from src.metrics import get_metrics
+from src.retailers.extractors import ASUSExtractor
 
 class ASUSRetailer(BaseRetailer):
     """Implementation for ASUS website."""
     
-    def __init__(self, ai_agent):
-        super().__init__("ASUS", ai_agent)
+    tile_selector = ".product-card"
+    # Zero-results message of the search page
+    empty_selectors = [".search-no-result"]
+    extractor = ASUSExtractor()
+    
+    def __init__(self, ai_agent, driver_pool=None):
+        super().__init__("ASUS", ai_agent, driver_pool)
         self.base_url = "https://www.asus.com/us"
         self.search_url_template = "https://www.asus.com/us/search/{}"
         
+    @uses_browser
     def search_products(self, query):
         """Search for products on ASUS."""
         search_url = self.search_url_template.format(query.replace(' ', '-'))
         
         try:
+            self.search_errors.pop(query, None)
             print(f"Searching ASUS for: {query}")
-            self.driver.get(search_url)
-            
-            # Wait for search results to load
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".product-card"))
-            )
+            # Load search results (plain HTTP when the retailer supports it)
+            page = self.fetch_page(search_url, self.tile_selector)
             
-            # Use AI agent for visual analysis
-            page_content = self.driver.page_source
-            screenshot = self.driver.get_screenshot_as_png()
-            
-            products = self.ai_agent.process_input(
+            # Parse product tiles, with the AI agent as fallback
+            products = self.analyze_search_page(
                 f"Find RTX {query} products on ASUS search results page",
-                {
-                    "screenshot": screenshot,
-                    "html": page_content
-                }
+                page,
+                query
             )
             
             # Filter for available products
-            available_products = []
-            for product in products.get("visual", []):
-                # Look for "Buy" or "Check Availability" indicators
-                if any(text in product.get("button_text", "").lower() for text in ["buy", "check availability", "shop now"]):
-                    product["retailer"] = self.name
-                    available_products.append(product)
+            with get_metrics().span(self.name, "filter"):
+                available_products = []
+                for product in products:
+                    # Look for "Buy" or "Check Availability" indicators
+                    if any(text in product.get("button_text", "").lower() for text in ["buy", "check availability", "shop now"]):
+                        product["retailer"] = self.name
+                        available_products.append(product)
                     
             self.products = available_products
             return available_products
             
         except Exception as e:
             print(f"Error searching ASUS: {e}")
+            self.search_errors[query] = str(e)
             return []
     
+    @uses_browser
     def check_product_availability(self, product_url):
         """Check if a specific product is available on ASUS."""
         try:
-            self.driver.get(product_url)
+            self.open_page(product_url, "screenshot")
             
             # Wait for product page to load
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".product-info"))
-            )
+            self.wait_for_page(".product-info", detect_empty=False)
             
             # Screenshot for AI analysis
             screenshot = self.driver.get_screenshot_as_png()
@@ -72,12 +73,13 @@ class ASUSRetailer(BaseRetailer):
                 "html": page_content
             })
             
-            # ASUS typically uses "Buy" or "Where to buy" buttons
-            buy_buttons = self.driver.find_elements(By.XPATH, 
-                "//a[contains(text(), 'Buy') or contains(@class, 'buy')]")
-                
-            where_to_buy = self.driver.find_elements(By.XPATH, 
-                "//a[contains(text(), 'Where to buy') or contains(@class, 'where-to-buy')]")
+            # ASUS typically uses "Buy" or "Where to buy" buttons - both looked up in one script call
+            buttons = self.extract_bulk({
+                "buy": {"xpath": "//a[contains(text(), 'Buy') or contains(@class, 'buy')]"},
+                "where_to_buy": {"xpath": "//a[contains(text(), 'Where to buy') or contains(@class, 'where-to-buy')]"}
+            })
+            buy_buttons = buttons["buy"]
+            where_to_buy = buttons["where_to_buy"]
                 
             if buy_buttons or is_available:
                 return {"available": True, "status": "AVAILABLE", "retailer": self.name, "url": product_url}
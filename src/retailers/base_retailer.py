@@ -1,66 +1,356 @@
+import os
+import time
+import threading
+import functools
 from abc import ABC, abstractmethod
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from contextlib import contextmanager
+from src.retailers.driver_pool import build_chrome_options, create_chrome_driver
+from src.retailers.browser_recycler import (
+    RecyclePolicy, StandbyBrowser, driver_rss, quit_in_background
+)
+from src.retailers.http_fetcher import get_http_fetcher, parse_html
+from src.retailers.change_detector import TileChangeDetector, tile_html
+from src.retailers.extractors import matches_query
+from src.retailers.fetch_profiles import apply_fetch_profile, drain_performance_log, get_fetch_stats
+from src.retailers.readiness import (
+    RESULTS, EMPTY, CHALLENGE, UNKNOWN, EMPTY_RESULTS_PATTERNS, wait_for_outcome, get_readiness_stats
+)
+from src.metrics import get_metrics
+
+# Collects rows and their fields for several queries in a single WebDriver round trip
+BULK_EXTRACT_SCRIPT = """
+const queries = arguments[0];
+const results = {};
+for (const [name, query] of Object.entries(queries)) {
+    let rows = [];
+    if (query.xpath) {
+        const snapshot = document.evaluate(query.xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (let i = 0; i < snapshot.snapshotLength; i++) rows.push(snapshot.snapshotItem(i));
+    } else {
+        rows = Array.from(document.querySelectorAll(query.css));
+    }
+    const fields = query.fields || {text: [null, "text"]};
+    results[name] = rows.map(row => {
+        const record = {};
+        for (const [field, [selector, attribute]] of Object.entries(fields)) {
+            const element = selector ? row.querySelector(selector) : row;
+            if (!element) {
+                record[field] = null;
+            } else if (attribute === "text") {
+                record[field] = (element.innerText || element.textContent || "").trim();
+            } else if (attribute === "href") {
+                record[field] = element.href || null;
+            } else {
+                record[field] = element.getAttribute(attribute);
+            }
+        }
+        return record;
+    });
+}
+return results;
+"""
+
+
+def uses_browser(method):
+    """Run a retailer method inside a browser session so pooled drivers are borrowed lazily."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.browser_session():
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class BaseRetailer(ABC):
     """Base class for all retailer implementations."""
     
-    def __init__(self, name, ai_agent):
+    # Retailers whose pages render server-side can opt into the HTTP fetch tier
+    use_http_fetch = False
+    
+    # Markers of a search with no results, checked alongside the ready selector
+    empty_selectors = []
+    empty_patterns = EMPTY_RESULTS_PATTERNS
+    
+    # CSS selector of a single product tile on the search results page
+    tile_selector = None
+    
+    # Deterministic parser for the product tiles; the AI agent is only a fallback
+    extractor = None
+    
+    def __init__(self, name, ai_agent, driver_pool=None):
         self.name = name
         self.ai_agent = ai_agent
+        self.driver_pool = driver_pool
         self.options = self._configure_chrome_options()
-        self.driver = self._setup_driver()
+        # Without a shared pool the retailer owns a dedicated browser, launched on first use
+        self._owned_driver = None
+        self._owned_driver_lock = threading.Lock()
+        self._session = threading.local()
+        self.change_detector = TileChangeDetector()
+        self.min_extractor_confidence = float(os.getenv("EXTRACTOR_MIN_CONFIDENCE", "0.8"))
+        # Browser recycling by check count and Chrome process-tree RSS (pooled browsers are recycled by the pool)
+        self.recycle_policy = RecyclePolicy.from_env()
         self.check_count = 0
-        self.max_checks_before_restart = 20
+        self.max_checks_before_restart = self.recycle_policy.max_checks
+        self.recycles = 0
+        self.last_rss_mb = None
+        self.peak_rss_mb = None
+        self._standby = StandbyBrowser(self._setup_driver) if driver_pool is None else None
         self.products = []
+        # Last search error per query, so an empty result can be told apart from a failed check
+        self.search_errors = {}
         
     def _configure_chrome_options(self):
         """Configure Chrome options with error suppression settings."""
-        options = Options()
+        return build_chrome_options()
         
-        # Basic headless mode settings
-        options.add_argument("--headless=new")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
+    def _setup_driver(self):
+        """Initialize and configure Chrome WebDriver."""
+        try:
+            return create_chrome_driver(self.options)
+        except Exception as e:
+            print(f"Error setting up Chrome driver for {self.name}: {e}")
+            raise
+    
+    @property
+    def driver(self):
+        """
+        The browser for the current check.
         
-        # Memory and performance optimization
-        options.add_argument("--js-flags=--expose-gc")
-        options.add_argument("--disable-renderer-backgrounding")
-        options.add_argument("--memory-pressure-off")
+        Without a pool this is the retailer's own driver, launched lazily. With a pool, a driver
+        is checked out on first use inside browser_session() and returned when
+        the session ends, so checks served over plain HTTP never hold a browser.
+        """
+        if self.driver_pool is None:
+            with self._owned_driver_lock:
+                if self._owned_driver is None:
+                    with get_metrics().span(self.name, "driver_acquire"):
+                        self._owned_driver = self._setup_driver()
+            return self._owned_driver
         
-        # WebGL settings
-        options.add_argument("--disable-webgl")
-        options.add_argument("--enable-unsafe-swiftshader")
+        session = self._session
+        if getattr(session, "depth", 0) == 0:
+            raise RuntimeError(f"{self.name} used the browser outside of browser_session()")
+        if session.driver is None:
+            with get_metrics().span(self.name, "driver_acquire"):
+                session.driver = self.driver_pool.checkout(self.name)
+        return session.driver
+    
+    @contextmanager
+    def browser_session(self):
+        """Scope during which a pooled driver, once borrowed, stays with this retailer."""
+        if self.driver_pool is None:
+            session = self._session
+            session.depth = getattr(session, "depth", 0) + 1
+            try:
+                yield
+            finally:
+                session.depth -= 1
+                if session.depth == 0 and self._owned_driver is not None:
+                    self.check_count += 1
+                    self._maybe_recycle_owned()
+            return
         
-        # Logging and notification settings
-        options.add_argument("--disable-notifications")
-        options.add_argument("--log-level=3")
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
+        session = self._session
+        session.depth = getattr(session, "depth", 0) + 1
+        if session.depth == 1:
+            session.driver = None
+        try:
+            yield
+        finally:
+            session.depth -= 1
+            if session.depth == 0 and session.driver is not None:
+                driver, session.driver = session.driver, None
+                self.driver_pool.checkin(self.name, driver)
+    
+    def open_page(self, url, profile="probe"):
+        """
+        Navigate the browser to a page with a fetch profile applied.
         
-        # Disable UI elements and automation flags
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
+        The "probe" profile blocks images, fonts, media, stylesheets and
+        trackers for text-only DOM checks; "screenshot" keeps images and
+        styles; "full" blocks nothing.
+        """
+        try:
+            apply_fetch_profile(self.driver, profile)
+        except Exception as e:
+            print(f"Could not apply {profile} fetch profile for {self.name}: {e}")
+        # Discard network events of earlier pages so only this load is counted
+        drain_performance_log(self.driver)
+        with get_metrics().span(self.name, "page_load"):
+            self.driver.get(url)
+    
+    def wait_for_page(self, ready_selector, timeout=20, detect_empty=True):
+        """
+        Wait for the current page to show results, no results or a challenge.
         
-        # User agent
-        options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36")
+        Returns as soon as one outcome is decided, records it, and raises on a
+        challenge page so the check is reported as failed rather than as no stock.
         
-        return options
+        Returns:
+            Outcome: "results", "empty" or "unknown"
+        """
+        outcome, elapsed = wait_for_outcome(
+            self.driver,
+            ready_selector,
+            self.empty_selectors if detect_empty else (),
+            self.empty_patterns if detect_empty else (),
+            timeout=timeout
+        )
+        get_readiness_stats().record(self.name, outcome, elapsed)
+        get_metrics().observe(self.name, "readiness", elapsed)
+        if outcome != RESULTS:
+            print(f"{self.name} page outcome: {outcome} after {elapsed:.1f}s")
+        if outcome == CHALLENGE:
+            raise RuntimeError(f"{self.name} served a challenge page")
+        return outcome
+    
+    def fetch_page(self, url, ready_selector, capture_screenshot=True, timeout=20, profile=None):
+        """
+        Load a page, preferring plain HTTP and falling back to the browser.
         
-    def _setup_driver(self):
-        """Initialize and configure Chrome WebDriver."""
-        try:
-            driver = webdriver.Chrome(
-                service=Service(ChromeDriverManager().install()),
-                options=self.options
-            )
-            driver.set_page_load_timeout(90)
-            return driver
-        except Exception as e:
-            print(f"Error setting up Chrome driver for {self.name}: {e}")
-            raise
+        Args:
+            url: Page URL
+            ready_selector: CSS selector marking the page content as loaded
+            capture_screenshot: Whether to take a screenshot when the browser is used
+            timeout: Seconds to wait for ready_selector in the browser
+            profile: Fetch profile for the browser, defaults to "screenshot"
+                when a screenshot is captured and "probe" otherwise
+            
+        Returns:
+            Page dict with 'url', 'html', 'tree', 'screenshot', 'source',
+            'outcome' ("results", "empty" or "unknown") and, for browser
+            loads, 'resources' (requests and bytes loaded and saved)
+        """
+        metrics = get_metrics()
+        if self.use_http_fetch:
+            with metrics.span(self.name, "http_fetch"):
+                page = get_http_fetcher().fetch(url, ready_selector)
+            if page:
+                page["outcome"] = RESULTS
+                return page
+            print(f"Lightweight fetch unusable for {self.name}, falling back to browser")
+        
+        profile = profile or ("screenshot" if capture_screenshot else "probe")
+        start = time.time()
+        self.open_page(url, profile)
+        outcome = self.wait_for_page(ready_selector, timeout)
+        with metrics.span(self.name, "page_source"):
+            html = self.driver.page_source
+        screenshot = None
+        if capture_screenshot and outcome != EMPTY:
+            with metrics.span(self.name, "screenshot"):
+                screenshot = self.driver.get_screenshot_as_png()
+        
+        resources = get_fetch_stats().record(profile, drain_performance_log(self.driver))
+        print(f"{self.name} {profile} load: {resources['requests']} requests, {resources['bytes'] / 1024:.0f} KB, "
+              f"{resources['blocked_requests']} blocked (~{resources['bytes_saved'] / 1024:.0f} KB saved)")
+        
+        return {
+            "url": url,
+            "html": html,
+            "tree": parse_html(html),
+            "screenshot": screenshot,
+            "source": "browser",
+            "status_code": None,
+            "not_modified": False,
+            "outcome": outcome,
+            "resources": resources,
+            "elapsed": time.time() - start
+        }
+    
+    def extract_bulk(self, queries):
+        """
+        Extract rows and their fields from the current browser page in one script call.
+        
+        Args:
+            queries: Dict mapping a result name to a query dict with either a
+                'css' or an 'xpath' key selecting rows, and an optional 'fields'
+                dict mapping field names to (css_selector, attribute) pairs.
+                The selector is relative to the row (None for the row itself);
+                the attribute is 'text', 'href' or any HTML attribute name.
+                Without 'fields' each row yields its visible text.
+                
+        Returns:
+            Dict mapping each result name to a list of row dicts
+        """
+        return self.driver.execute_script(BULK_EXTRACT_SCRIPT, queries)
+    
+    def page_visual_input(self, page):
+        """Build the visual input for the AI agent from a fetched page."""
+        visual_input = {"html": page["html"]}
+        if page.get("screenshot") is not None:
+            visual_input["screenshot"] = page["screenshot"]
+        return visual_input
+    
+    def analyze_search_page(self, instruction, page, query):
+        """
+        Extract products from a search results page.
+        
+        Tiles are parsed by the retailer's extractor first, keeping only records
+        of the queried model. The AI agent is only consulted when the extractor
+        is unsure or the layout is unrecognised;
+        then unchanged result grids are answered from the previous analysis and
+        partially changed grids only forward the new or changed tiles.
+        
+        Args:
+            instruction: Text instruction for the AI agent
+            page: Page dict returned by fetch_page
+            query: Search query, used to key the stored tile fingerprints
+            
+        Returns:
+            List of product dicts
+        """
+        tiles = page["tree"].cssselect(self.tile_selector) if self.tile_selector else []
+        # Eager loads can show a results header before the tiles; tiles in the final source win
+        if page.get("outcome") == EMPTY and not tiles:
+            print(f"No results at {self.name} for {query}")
+            return []
+        
+        metrics = get_metrics()
+        if self.extractor is not None:
+            with metrics.span(self.name, "extract"):
+                records, confidence = self.extractor.extract(tiles, page["url"])
+            if records and confidence >= self.min_extractor_confidence:
+                # The results page also lists other models, prebuilts and accessories
+                return [record for record in records if matches_query(record, query)]
+            print(f"Extractor confidence {confidence:.2f} at {self.name} for {query}, falling back to AI analysis")
+        
+        if not tiles:
+            with metrics.span(self.name, "ai_inference"):
+                result = self.ai_agent.process_input(instruction, self.page_visual_input(page))
+            products = self._visual_products(result)
+            if not products and page.get("outcome") == UNKNOWN:
+                # An unrecognised page without products says nothing about stock; report
+                # the check as failed so the state store keeps the previous state
+                self.search_errors[query] = f"Unrecognised page layout at {self.name}"
+            return products
+        
+        changes = self.change_detector.diff(query, tiles)
+        if not changes["changed"]:
+            print(f"No tile changes at {self.name} for {query}, skipping AI analysis")
+            if self.change_detector.is_unchanged(changes):
+                return self.change_detector.previous_products(query)
+            products = self.change_detector.carry_forward(query, changes["unchanged"])
+            self.change_detector.remember(query, changes, products)
+            return products
+        
+        print(f"{len(changes['changed'])}/{len(tiles)} tiles changed at {self.name} for {query}")
+        # Only the changed tiles' HTML: the full-page screenshot would show the
+        # unchanged tiles too, and their carried-forward products would be counted twice
+        visual_input = {"html": "\n".join(tile_html(tile) for _, tile in changes["changed"])}
+        
+        with metrics.span(self.name, "ai_inference"):
+            result = self.ai_agent.process_input(instruction, visual_input)
+        products = self._visual_products(result)
+        products.extend(self.change_detector.carry_forward(query, changes["unchanged"]))
+        self.change_detector.remember(query, changes, products)
+        return products
+    
+    def _visual_products(self, result):
+        """Product dicts from the visual part of an AI agent response."""
+        visual = result.get("visual", [])
+        if not isinstance(visual, list):
+            return []
+        return [product for product in visual if isinstance(product, dict)]
     
     @abstractmethod
     def search_products(self, query):
@@ -77,23 +367,60 @@ class BaseRetailer(ABC):
         """Get list of tracked products."""
         pass
         
+    def _maybe_recycle_owned(self):
+        """Apply the recycle policy to the retailer's own browser after a check."""
+        rss = driver_rss(self._owned_driver)
+        if rss is not None:
+            self.last_rss_mb = rss / 1048576
+            self.peak_rss_mb = max(self.peak_rss_mb or 0, self.last_rss_mb)
+        
+        decision = self.recycle_policy.evaluate(rss, self.check_count)
+        if decision == RecyclePolicy.RECYCLE:
+            self.restart_browser()
+        elif decision == RecyclePolicy.PREPARE:
+            self._standby.prepare()
+    
+    def browser_stats(self):
+        """Checks, last/peak browser RSS in MB and recycle count for this retailer."""
+        if self.driver_pool is not None:
+            return self.driver_pool.owner_stats(self.name)
+        return {
+            "checks": self.check_count,
+            "last_rss_mb": self.last_rss_mb,
+            "peak_rss_mb": self.peak_rss_mb,
+            "recycles": self.recycles
+        }
+    
     def restart_browser(self):
         """Safely restart the Chrome browser."""
         print(f"Restarting Chrome browser for {self.name}...")
-        try:
-            self.driver.quit()
-        except Exception as e:
-            print(f"Error closing browser: {e}")
+        if self.driver_pool is not None:
+            # Drop the borrowed browser; the next access checks out a fresh one
+            session = self._session
+            if getattr(session, "driver", None) is not None:
+                driver, session.driver = session.driver, None
+                self.driver_pool.discard(driver)
+            self.check_count = 0
+            return
         
-        import time
-        time.sleep(10)
-        self.driver = self._setup_driver()
+        # Swap in the warm standby when it is ready; the old browser exits in the background
+        replacement = self._standby.take() or self._setup_driver()
+        with self._owned_driver_lock:
+            old_driver, self._owned_driver = self._owned_driver, replacement
+        if old_driver is not None:
+            quit_in_background(old_driver)
         self.check_count = 0
+        self.recycles += 1
         print(f"Browser for {self.name} restarted successfully")
         
     def cleanup(self):
         """Clean up resources."""
+        if self._standby is not None:
+            self._standby.close()
+        if self._owned_driver is None:
+            # Never launched, or pooled browsers closed by the pool owner
+            return
         try:
-            self.driver.quit()
+            self._owned_driver.quit()
         except Exception as e:
             print(f"Error during cleanup for {self.name}: {e}")
\ No newline at end of file
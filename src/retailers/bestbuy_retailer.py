@@ -4,50 +4,50 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
-from src.retailers.base_retailer import BaseRetailer
+from src.retailers.base_retailer import BaseRetailer, uses_browser
+from src.metrics import get_metrics
+from src.retailers.extractors import BestBuyExtractor
 
 class BestBuyRetailer(BaseRetailer):
     """Implementation for Best Buy website."""
     
-    def __init__(self, ai_agent):
-        super().__init__("Best Buy", ai_agent)
+    tile_selector = ".sku-item"
+    # Zero-results message of the search page
+    empty_selectors = [".no-results-message"]
+    extractor = BestBuyExtractor()
+    
+    def __init__(self, ai_agent, driver_pool=None):
+        super().__init__("Best Buy", ai_agent, driver_pool)
         self.base_url = "https://www.bestbuy.com"
         self.search_url_template = "https://www.bestbuy.com/site/searchpage.jsp?st={}"
         
+    @uses_browser
     def search_products(self, query):
         """Search for products on Best Buy."""
         search_url = self.search_url_template.format(query.replace(' ', '+'))
         
         try:
+            self.search_errors.pop(query, None)
             print(f"Searching Best Buy for: {query}")
-            self.driver.get(search_url)
-            
-            # Wait for search results to load
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".sku-item"))
-            )
+            # Load search results (plain HTTP when the retailer supports it)
+            page = self.fetch_page(search_url, self.tile_selector)
             
             # Use AI agent to analyze the page and extract product information
             # focusing on "See Details" vs "Add to Cart" buttons
-            page_content = self.driver.page_source
-            screenshot = self.driver.get_screenshot_as_png()
-            
-            # Use visual language model to analyze products
-            products = self.ai_agent.process_input(
+            products = self.analyze_search_page(
                 f"Find RTX {query} products on Best Buy search results page",
-                {
-                    "screenshot": screenshot,
-                    "html": page_content
-                }
+                page,
+                query
             )
             
             # Filter products based on availability using "See Details" indicator
             # which is specific to high-demand Best Buy products
-            available_products = []
-            for product in products.get("visual", []):
-                if product.get("button_text") == "See Details":
-                    product["retailer"] = self.name
-                    available_products.append(product)
+            with get_metrics().span(self.name, "filter"):
+                available_products = []
+                for product in products:
+                    if "SEE DETAILS" in (product.get("button_text") or "").upper():
+                        product["retailer"] = self.name
+                        available_products.append(product)
                     
             # Save products to instance
             self.products = available_products
@@ -55,17 +55,17 @@ class BestBuyRetailer(BaseRetailer):
             
         except Exception as e:
             print(f"Error searching Best Buy: {e}")
+            self.search_errors[query] = str(e)
             return []
     
+    @uses_browser
     def check_product_availability(self, product_url):
         """Check if a specific product is available on Best Buy."""
         try:
-            self.driver.get(product_url)
+            self.open_page(product_url, "probe")
             
             # Wait for button to load
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".add-to-cart-button"))
-            )
+            self.wait_for_page(".add-to-cart-button", detect_empty=False)
             
             # Get button text
             button = self.driver.find_element(By.CSS_SELECTOR, ".add-to-cart-button")
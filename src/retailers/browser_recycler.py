@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:  # RSS-based recycling is disabled, check counts still apply
+    psutil = None
+
+
+def process_tree_rss(pid):
+    """Resident memory in bytes of a process and all of its descendants, or None."""
+    if psutil is None or pid is None:
+        return None
+    try:
+        root = psutil.Process(pid)
+        processes = [root] + root.children(recursive=True)
+    except psutil.Error:
+        return None
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            continue  # renderer exited while we were measuring
+    return total
+
+
+def driver_rss(driver):
+    """Resident memory of a Chrome WebDriver: chromedriver, the browser and its renderers."""
+    try:
+        pid = driver.service.process.pid
+    except AttributeError:
+        return None
+    return process_tree_rss(pid)
+
+
+class RecyclePolicy:
+    """
+    Decides when a browser should be replaced.
+
+    A browser is recycled once its process tree exceeds max_rss_mb or it has
+    served max_checks checks. Past standby_ratio of either limit a standby
+    browser is prepared so the swap does not wait for a Chrome launch.
+    """
+
+    RECYCLE = "recycle"
+    PREPARE = "prepare"
+
+    def __init__(self, max_rss_mb=1024, max_checks=20, standby_ratio=0.8):
+        self.max_rss_mb = max_rss_mb
+        self.max_checks = max_checks
+        self.standby_ratio = standby_ratio
+
+    @classmethod
+    def from_env(cls):
+        """Build a policy configured from environment variables."""
+        return cls(
+            max_rss_mb=float(os.getenv("BROWSER_MAX_RSS_MB", "1024")),
+            max_checks=int(os.getenv("BROWSER_MAX_CHECKS", "20")),
+            standby_ratio=float(os.getenv("BROWSER_STANDBY_RATIO", "0.8"))
+        )
+
+    def evaluate(self, rss, checks):
+        """
+        Args:
+            rss: Process tree RSS in bytes, or None when it cannot be measured
+            checks: Checks served since the browser was launched
+
+        Returns:
+            RECYCLE, PREPARE or None
+        """
+        usage = checks / self.max_checks if self.max_checks else 0.0
+        if rss is not None and self.max_rss_mb:
+            usage = max(usage, rss / (self.max_rss_mb * 1048576))
+        if usage >= 1.0:
+            return self.RECYCLE
+        if usage >= self.standby_ratio:
+            return self.PREPARE
+        return None
+
+
+class StandbyBrowser:
+    """Launches one spare browser in the background so a recycle can swap it in immediately."""
+
+    def __init__(self, driver_factory):
+        self.driver_factory = driver_factory
+        self._driver = None
+        self._launching = False
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def prepare(self):
+        """Start launching a standby browser unless one is ready or on its way."""
+        with self._lock:
+            if self._closed or self._driver is not None or self._launching:
+                return
+            self._launching = True
+        threading.Thread(target=self._launch, name="standby-browser", daemon=True).start()
+
+    def _launch(self):
+        start = time.time()
+        try:
+            driver = self.driver_factory()
+        except Exception as e:
+            print(f"Error launching standby browser: {e}")
+            driver = None
+        with self._lock:
+            self._launching = False
+            if self._closed and driver is not None:
+                quit_quietly(driver)
+                return
+            self._driver = driver
+        if driver is not None:
+            print(f"Standby browser ready in {time.time() - start:.2f}s")
+
+    def take(self):
+        """Hand over the standby browser, or None if it is not ready yet."""
+        with self._lock:
+            driver, self._driver = self._driver, None
+            return driver
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            driver, self._driver = self._driver, None
+        if driver is not None:
+            quit_quietly(driver)
+
+
+def quit_quietly(driver):
+    try:
+        driver.quit()
+    except Exception as e:
+        print(f"Error closing browser: {e}")
+
+
+def quit_in_background(driver):
+    """Quit a retired browser without making the caller wait for Chrome to exit."""
+    threading.Thread(target=quit_quietly, args=(driver,), name="browser-quit", daemon=True).start()
@@ -0,0 +1,139 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from lxml import html as lxml_html
+
+# Attributes that carry availability state on buttons and links
+STATE_ATTRIBUTES = ("disabled", "aria-disabled", "data-button-state", "class")
+
+
+def tile_text(tile):
+    """Whitespace-normalised visible text of a product tile."""
+    return re.sub(r"\s+", " ", tile.text_content()).strip()
+
+
+def tile_html(tile):
+    """Serialise a product tile back to HTML."""
+    return lxml_html.tostring(tile, encoding="unicode")
+
+
+def fingerprint_tile(tile):
+    """
+    Fingerprint the parts of a product tile that reflect its stock state.
+
+    Text (name, price, button label), product links and button state attributes
+    are hashed; volatile markup such as image sources and tracking attributes
+    is ignored so re-rendered but otherwise identical tiles match.
+    """
+    parts = [tile_text(tile)]
+    parts.extend(sorted(link.get("href", "") for link in tile.iter("a")))
+    for element in tile.iter("button", "input"):
+        parts.append("|".join(f"{name}={element.get(name, '')}" for name in STATE_ATTRIBUTES))
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+class TileChangeDetector:
+    """
+    Remembers product-tile fingerprints per query so unchanged result grids skip AI analysis.
+
+    Products found by the previous analysis are kept per tile, which lets a
+    partial change re-analyse only the new or changed tiles and carry the rest over.
+    Products that cannot be attributed to a single tile are kept with the set of
+    tiles they were found in, and carried over while that whole set is unchanged.
+    """
+
+    def __init__(self, max_queries=64):
+        self.max_queries = max_queries
+        # query -> {"tiles": {fp: text}, "products": [...], "tile_products": {fp: [...]}, "groups": [(fps, [...])]}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def diff(self, query, tiles):
+        """
+        Compare tiles against the previous check for the same query.
+
+        Args:
+            query: Search query the tiles belong to
+            tiles: lxml elements for each product tile on the page
+
+        Returns:
+            Dict with 'changed' and 'unchanged' lists of (fingerprint, tile)
+            pairs and the number of 'removed' tiles
+        """
+        with self._lock:
+            previous = self._entries.get(query, {}).get("tiles", {})
+
+        changed, unchanged, seen = [], [], set()
+        for tile in tiles:
+            fingerprint = fingerprint_tile(tile)
+            seen.add(fingerprint)
+            (unchanged if fingerprint in previous else changed).append((fingerprint, tile))
+
+        return {
+            "changed": changed,
+            "unchanged": unchanged,
+            "removed": len(set(previous) - seen)
+        }
+
+    def is_unchanged(self, changes):
+        """Whether a diff shows the grid exactly as it was last time."""
+        return not changes["changed"] and not changes["removed"]
+
+    def previous_products(self, query):
+        """Products found by the last analysis of this query."""
+        with self._lock:
+            entry = self._entries.get(query)
+            return list(entry["products"]) if entry else []
+
+    def carry_forward(self, query, unchanged):
+        """Products previously found in tiles that have not changed."""
+        with self._lock:
+            entry = self._entries.get(query, {})
+            tile_products = entry.get("tile_products", {})
+            carried = []
+            for fingerprint, _ in unchanged:
+                carried.extend(tile_products.get(fingerprint, []))
+            unchanged_fingerprints = {fingerprint for fingerprint, _ in unchanged}
+            for fingerprints, products in entry.get("groups", []):
+                if fingerprints <= unchanged_fingerprints:
+                    carried.extend(products)
+            return carried
+
+    def remember(self, query, changes, products):
+        """
+        Store the tiles and analysed products for the next comparison.
+
+        Products are attributed to the tile whose text contains their name or
+        whose links contain their URL so they can be carried forward later.
+        Unattributed products stay with the tiles analysed to find them: the
+        changed tiles for new products, or their original set if carried forward.
+        """
+        tiles = changes["changed"] + changes["unchanged"]
+        texts = {fingerprint: tile_text(tile) for fingerprint, tile in tiles}
+        hrefs = {fingerprint: {link.get("href", "") for link in tile.iter("a")} for fingerprint, tile in tiles}
+        analysed = frozenset(fingerprint for fingerprint, _ in changes["changed"])
+
+        with self._lock:
+            previous_groups = self._entries.get(query, {}).get("groups", [])
+        group_of = {id(product): fingerprints for fingerprints, group in previous_groups for product in group}
+
+        tile_products = {}
+        groups = {}
+        for product in products:
+            name, url = product.get("name"), product.get("url")
+            for fingerprint in texts:
+                if (name and name in texts[fingerprint]) or (url and url in hrefs[fingerprint]):
+                    tile_products.setdefault(fingerprint, []).append(product)
+                    break
+            else:
+                groups.setdefault(group_of.get(id(product), analysed), []).append(product)
+
+        with self._lock:
+            self._entries[query] = {
+                "tiles": texts, "products": list(products), "tile_products": tile_products,
+                "groups": list(groups.items())
+            }
+            self._entries.move_to_end(query)
+            while len(self._entries) > self.max_queries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,343 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from src.retailers.http_fetcher import DEFAULT_USER_AGENT
+from src.retailers.browser_recycler import (
+    RecyclePolicy, StandbyBrowser, driver_rss, quit_in_background
+)
+
+# Fields accepted by the DevTools Network.setCookies command
+COOKIE_PARAM_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+
+
+def build_chrome_options():
+    """Configure Chrome options with error suppression settings."""
+    # Selenium is imported on first use, so processes that never launch a browser start faster
+    from selenium.webdriver.chrome.options import Options
+    options = Options()
+
+    # Return from get() at DOMContentLoaded; readiness checks decide when a page is usable
+    options.page_load_strategy = "eager"
+
+    # Basic headless mode settings
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+
+    # Memory and performance optimization
+    options.add_argument("--js-flags=--expose-gc")
+    options.add_argument("--disable-renderer-backgrounding")
+    options.add_argument("--memory-pressure-off")
+
+    # WebGL settings
+    options.add_argument("--disable-webgl")
+    options.add_argument("--enable-unsafe-swiftshader")
+
+    # Logging and notification settings
+    options.add_argument("--disable-notifications")
+    options.add_argument("--log-level=3")
+    options.add_experimental_option('excludeSwitches', ['enable-logging'])
+
+    # Disable UI elements and automation flags
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+
+    # User agent
+    options.add_argument(f"user-agent={DEFAULT_USER_AGENT}")
+
+    # DevTools network events, used to account for what fetch profiles load and block
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    return options
+
+
+_chromedriver_path = None
+_chromedriver_lock = threading.Lock()
+
+
+def get_chromedriver_path():
+    """Resolve the chromedriver binary once per process."""
+    global _chromedriver_path
+    with _chromedriver_lock:
+        if _chromedriver_path is None:
+            from webdriver_manager.chrome import ChromeDriverManager
+            start = time.time()
+            _chromedriver_path = ChromeDriverManager().install()
+            print(f"Startup: chromedriver resolved in {time.time() - start:.2f}s")
+        return _chromedriver_path
+
+
+def create_chrome_driver(options=None):
+    """Launch a headless Chrome WebDriver."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    driver_path = get_chromedriver_path()
+    start = time.time()
+    driver = webdriver.Chrome(
+        service=Service(driver_path),
+        options=options or build_chrome_options()
+    )
+    driver.set_page_load_timeout(90)
+    print(f"Startup: Chrome launched in {time.time() - start:.2f}s")
+    return driver
+
+
+class DriverPool:
+    """
+    Shared pool of Chrome WebDrivers that retailers borrow for the duration of a check.
+
+    Browsers are launched on demand up to the pool size. Cookies are saved per
+    owner on checkin and restored on checkout, so retailers sharing a browser
+    never see each other's sessions.
+
+    On checkin each browser's process-tree RSS and check count are measured
+    against the recycle policy. A browser nearing its limits gets a standby
+    launched in the background; one past them is swapped for the standby and
+    quit off the caller's thread.
+    """
+
+    def __init__(self, size=2, driver_factory=create_chrome_driver, checkout_timeout=120, policy=None, standby=True):
+        self.size = size
+        self.driver_factory = driver_factory
+        self.checkout_timeout = checkout_timeout
+        self.policy = policy or RecyclePolicy.from_env()
+        self.recycles = 0
+        self._standby = StandbyBrowser(driver_factory) if standby else None
+        self._idle = []
+        self._drivers = []
+        self._pending = 0
+        self._sessions = {}
+        self._checks = {}  # driver -> checks served since launch
+        self._owner_stats = {}
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def checkout(self, owner, timeout=None):
+        """
+        Borrow a browser for the given owner.
+
+        Args:
+            owner: Name of the borrowing retailer, used for session isolation
+            timeout: Seconds to wait for a free browser, defaults to checkout_timeout
+
+        Returns:
+            WebDriver instance loaded with the owner's cookies
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Driver pool is closed")
+                if self._idle:
+                    driver = self._idle.pop()
+                    break
+                if len(self._drivers) + self._pending < self.size:
+                    self._pending += 1
+                    driver = None
+                    break
+                if not self._condition.wait(timeout):
+                    raise TimeoutError(f"No browser available for {owner} after {timeout}s")
+
+        if driver is None:
+            # Launch outside the lock so other checkouts are not blocked
+            try:
+                driver = self.driver_factory()
+            except Exception:
+                with self._condition:
+                    self._pending -= 1
+                    self._condition.notify()
+                raise
+            with self._condition:
+                self._pending -= 1
+                self._drivers.append(driver)
+
+        self._restore_session(owner, driver)
+        return driver
+
+    def checkin(self, owner, driver):
+        """Return a borrowed browser, saving the owner's cookies first."""
+        try:
+            self._save_session(owner, driver)
+        except Exception as e:
+            # A browser that cannot answer DevTools commands is not worth reusing
+            print(f"Discarding broken browser returned by {owner}: {e}")
+            self.discard(driver)
+            return
+
+        rss = driver_rss(driver)
+        with self._condition:
+            checks = self._checks.get(driver, 0) + 1
+            self._checks[driver] = checks
+            stats = self._owner_stats.setdefault(owner, {"checks": 0, "last_rss_mb": None, "peak_rss_mb": None, "recycles": 0})
+            stats["checks"] += 1
+            if rss is not None:
+                stats["last_rss_mb"] = rss / 1048576
+                stats["peak_rss_mb"] = max(stats["peak_rss_mb"] or 0, stats["last_rss_mb"])
+
+        decision = self.policy.evaluate(rss, checks)
+        if decision == RecyclePolicy.RECYCLE:
+            self._recycle(owner, driver, rss, checks)
+            return
+        if decision == RecyclePolicy.PREPARE and self._standby is not None:
+            self._standby.prepare()
+
+        with self._condition:
+            if self._closed:
+                self._quit(driver)
+                return
+            self._idle.append(driver)
+            self._condition.notify()
+
+    def _recycle(self, owner, driver, rss, checks):
+        """Replace a browser that reached its limits, preferring the warm standby."""
+        memory = f", {rss / 1048576:.0f} MB" if rss is not None else ""
+        print(f"Recycling browser after {checks} checks{memory} (last used by {owner})")
+        replacement = self._standby.take() if self._standby is not None else None
+
+        with self._condition:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+            self._checks.pop(driver, None)
+            self.recycles += 1
+            self._owner_stats[owner]["recycles"] += 1
+            launch = False
+            if replacement is not None and not self._closed:
+                self._drivers.append(replacement)
+                self._idle.append(replacement)
+            elif not self._closed:
+                # No standby ready: reserve the slot and launch a replacement in the background
+                self._pending += 1
+                launch = True
+            self._condition.notify()
+
+        if replacement is not None and self._closed:
+            self._quit(replacement)
+        if launch:
+            threading.Thread(target=self._launch_idle, name="browser-replace", daemon=True).start()
+        quit_in_background(driver)
+
+    def discard(self, driver):
+        """Quit a browser and free its slot in the pool."""
+        with self._condition:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+            if driver in self._idle:
+                self._idle.remove(driver)
+            self._checks.pop(driver, None)
+            self._condition.notify()
+        self._quit(driver)
+
+    def prewarm(self, count=None):
+        """
+        Launch browsers in parallel ahead of the first check.
+
+        Args:
+            count: Number of browsers that should be running, capped at the pool size
+
+        Returns:
+            Number of browsers launched
+        """
+        count = self.size if count is None else min(count, self.size)
+        with self._condition:
+            to_launch = max(0, count - len(self._drivers) - self._pending)
+            self._pending += to_launch
+        if not to_launch:
+            return 0
+
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=to_launch, thread_name_prefix="prewarm") as executor:
+            launched = sum(executor.map(lambda _: self._launch_idle(), range(to_launch)))
+        print(f"Startup: {launched}/{to_launch} browsers ready in {time.time() - start:.2f}s")
+        return launched
+
+    def _launch_idle(self):
+        """Launch a browser for a reserved slot and park it in the idle list."""
+        try:
+            driver = self.driver_factory()
+        except Exception as e:
+            print(f"Error launching pooled browser: {e}")
+            with self._condition:
+                self._pending -= 1
+                self._condition.notify()
+            return False
+
+        with self._condition:
+            self._pending -= 1
+            if self._closed:
+                self._quit(driver)
+                return False
+            self._drivers.append(driver)
+            self._idle.append(driver)
+            self._condition.notify()
+        return True
+
+    @contextmanager
+    def borrow(self, owner):
+        """Context manager wrapping checkout() and checkin()."""
+        driver = self.checkout(owner)
+        try:
+            yield driver
+        finally:
+            self.checkin(owner, driver)
+
+    def _save_session(self, owner, driver):
+        """Store the owner's cookies and wipe them from the browser."""
+        cookies = driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+        self._sessions[owner] = [self._to_cookie_param(cookie) for cookie in cookies]
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+
+    def _restore_session(self, owner, driver):
+        """Load the owner's saved cookies into the browser."""
+        cookies = self._sessions.get(owner)
+        if not cookies:
+            return
+        try:
+            driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+        except Exception as e:
+            print(f"Error restoring session for {owner}: {e}")
+
+    def _to_cookie_param(self, cookie):
+        """Convert a DevTools cookie into a Network.setCookies parameter."""
+        param = {key: cookie[key] for key in COOKIE_PARAM_FIELDS if key in cookie}
+        if cookie.get("session"):
+            param.pop("expires", None)
+        return param
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Error closing pooled browser: {e}")
+
+    def stats(self):
+        """Return counts of launched, idle and recycled browsers."""
+        with self._condition:
+            return {
+                "size": self.size,
+                "launched": len(self._drivers),
+                "idle": len(self._idle),
+                "recycles": self.recycles
+            }
+
+    def owner_stats(self, owner):
+        """Checks, last/peak browser RSS (MB) and recycles attributed to one retailer."""
+        with self._condition:
+            stats = self._owner_stats.get(owner)
+            return dict(stats) if stats else {"checks": 0, "last_rss_mb": None, "peak_rss_mb": None, "recycles": 0}
+
+    def close(self):
+        """Quit every browser in the pool."""
+        with self._condition:
+            self._closed = True
+            drivers = list(self._drivers)
+            self._drivers.clear()
+            self._idle.clear()
+            self._checks.clear()
+            self._condition.notify_all()
+        if self._standby is not None:
+            self._standby.close()
+        for driver in drivers:
+            self._quit(driver)
@@ -0,0 +1,153 @@
+import re
+from urllib.parse import urljoin
+
+
+# Listings that mention a GPU model without being the card itself
+NON_CARD_TERMS = re.compile(
+    r"\b(?:desktop|gaming pc|laptop|notebook|pre-?built|workstation|water ?block|backplate|bracket|cable|riser)s?\b"
+)
+
+
+def _clean(text):
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def _tokens(text):
+    return set(re.findall(r"[a-z0-9]+", (text or "").lower()))
+
+
+def matches_query(record, query):
+    """
+    Whether an extracted record is the queried GPU model.
+
+    Every token of the query (e.g. "rtx" and "5090") must appear as a whole
+    token of the product name, or of the SKU and URL when the name is missing,
+    and the name must not describe a prebuilt system or an accessory. Other
+    cards on the same results page, such as an RTX 5070, are rejected.
+    """
+    name = (record.get("name") or "").lower()
+    text = name or f"{record.get('sku') or ''} {record.get('url') or ''}".replace("-", " ").replace("_", " ")
+    if not _tokens(query) <= _tokens(text):
+        return False
+    return not NON_CARD_TERMS.search(name)
+
+
+class ProductTileExtractor:
+    """
+    Parses a retailer's product tiles into product records in one pass.
+
+    Subclasses list CSS selectors for each field, most specific first. Records
+    are dicts with 'name', 'sku', 'price', 'button_text' and 'url', matching
+    the product dicts the AI agent returns, so retailer filters work on both.
+    """
+
+    name_selectors = []
+    price_selectors = []
+    button_selectors = []
+    link_selectors = ["a[href]"]
+    sku_selectors = []
+    sku_attributes = []
+    sku_url_pattern = None
+
+    def extract(self, tiles, page_url):
+        """
+        Extract records from product tile elements.
+
+        Args:
+            tiles: lxml elements, one per product tile
+            page_url: URL of the page, used to resolve relative links
+
+        Returns:
+            Tuple of (records, confidence) where confidence is the share of
+            tiles for which both a name and a button state were found
+        """
+        if not tiles:
+            return [], 0.0
+
+        records = [self.extract_tile(tile, page_url) for tile in tiles]
+        complete = sum(1 for record in records if record["name"] and record["button_text"])
+        return records, complete / len(records)
+
+    def extract_tile(self, tile, page_url):
+        """Extract a single product record from a tile."""
+        link = self._first(tile, self.link_selectors)
+        url = urljoin(page_url, link.get("href")) if link is not None and link.get("href") else None
+        return {
+            "name": self._text(tile, self.name_selectors),
+            "sku": self._sku(tile, url),
+            "price": self._text(tile, self.price_selectors),
+            "button_text": self._text(tile, self.button_selectors) or "",
+            "url": url,
+            "source": "extractor"
+        }
+
+    def _first(self, tile, selectors):
+        for selector in selectors:
+            found = tile.cssselect(selector)
+            if found:
+                return found[0]
+        return None
+
+    def _text(self, tile, selectors):
+        for selector in selectors:
+            for element in tile.cssselect(selector):
+                text = _clean(element.text_content()) or _clean(element.get("value")) or _clean(element.get("aria-label"))
+                if text:
+                    return text
+        return None
+
+    def _sku(self, tile, url):
+        for attribute in self.sku_attributes:
+            for element in [tile] + tile.cssselect(f"[{attribute}]"):
+                if element.get(attribute):
+                    return element.get(attribute)
+        text = self._text(tile, self.sku_selectors)
+        if text:
+            return re.sub(r"^(SKU|Item #|B&H #|Model)\s*:?\s*", "", text, flags=re.I)
+        if url and self.sku_url_pattern:
+            match = re.search(self.sku_url_pattern, url)
+            if match:
+                return match.group(1)
+        return None
+
+
+class BestBuyExtractor(ProductTileExtractor):
+    name_selectors = [".sku-title a", ".sku-header a", "h4 a"]
+    price_selectors = [".priceView-customer-price span[aria-hidden='true']", ".priceView-customer-price span"]
+    button_selectors = [".add-to-cart-button", ".fulfillment-add-to-cart-button button"]
+    link_selectors = [".sku-title a", ".sku-header a", "a[href]"]
+    sku_attributes = ["data-sku-id"]
+    sku_url_pattern = r"skuId=(\d+)"
+
+
+class NeweggExtractor(ProductTileExtractor):
+    name_selectors = [".item-title"]
+    price_selectors = [".price-current"]
+    button_selectors = [".item-button-area button", ".item-button-area .btn"]
+    link_selectors = [".item-title", "a[href]"]
+    sku_url_pattern = r"/p/([A-Z0-9-]+)"
+
+
+class MSIExtractor(ProductTileExtractor):
+    name_selectors = [".product-item__title", ".product-title", ".title", "h3", "h2"]
+    price_selectors = [".price", ".product-price"]
+    button_selectors = [".btn-buy"]
+    link_selectors = [".product-item__title a", "a[href]"]
+    sku_url_pattern = r"/Graphics-Card/([^/?#]+)"
+
+
+class ASUSExtractor(ProductTileExtractor):
+    name_selectors = [".product-card__title", ".productTitle", ".product-title", "h2", "h3"]
+    price_selectors = [".product-card__price", ".price"]
+    button_selectors = [".buy-button", ".product-card__buy"]
+    link_selectors = [".product-card__title a", "a[href]"]
+    sku_attributes = ["data-sku", "data-product-id"]
+
+
+class BHPhotoExtractor(ProductTileExtractor):
+    name_selectors = ["[data-selenium='miniProductPageProductName']", "h3 a", "h3"]
+    price_selectors = ["[data-selenium='uppedDecimalPriceFirst']", "[data-selenium='pricingPrice']"]
+    button_selectors = ["[data-selenium='addToCartButton']", "[data-selenium='notifyAvailabilityButton']"]
+    link_selectors = ["[data-selenium='miniProductPageProductNameLink']", "h3 a", "a[href]"]
+    sku_selectors = ["[data-selenium='miniProductPageProductSkuInfo']"]
+    sku_url_pattern = r"/c/product/(\d+-REG)"
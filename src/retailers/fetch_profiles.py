@@ -0,0 +1,136 @@
+import json
+import threading
+
+# URL patterns for each blockable resource class (Network.setBlockedURLs wildcards)
+RESOURCE_PATTERNS = {
+    "images": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*"],
+    "fonts": ["*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*"],
+    "media": ["*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*"],
+    "stylesheets": ["*.css*"],
+    "trackers": [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+        "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*optimizely.com*", "*criteo.com*",
+        "*adsrvr.org*", "*scorecardresearch.com*", "*quantserve.com*", "*taboola.com*", "*outbrain.com*",
+        "*bing.com/bat*", "*tiktok.com*", "*pinterest.com/ct*", "*clarity.ms*", "*demdex.net*",
+        "*omtrdc.net*", "*adobedtm.com*", "*qualtrics.com*", "*newrelic.com*", "*nr-data.net*"
+    ]
+}
+
+# Profiles map to the resource classes they block
+FETCH_PROFILES = {
+    # Everything loads, as before
+    "full": [],
+    # Keeps images and styles so screenshots look right for the visual model
+    "screenshot": ["fonts", "media", "trackers"],
+    # Text-only load for DOM extraction
+    "probe": ["images", "fonts", "media", "stylesheets", "trackers"]
+}
+
+# Fallback transfer sizes (bytes) for estimating what a blocked request would have cost
+DEFAULT_RESOURCE_SIZES = {
+    "Image": 30000, "Font": 40000, "Media": 250000, "Stylesheet": 30000,
+    "Script": 50000, "XHR": 5000, "Fetch": 5000, "Other": 10000
+}
+
+
+def blocked_url_patterns(profile):
+    """URL patterns blocked by a fetch profile."""
+    if profile not in FETCH_PROFILES:
+        raise ValueError(f"Unknown fetch profile: {profile}")
+    patterns = []
+    for resource_class in FETCH_PROFILES[profile]:
+        patterns.extend(RESOURCE_PATTERNS[resource_class])
+    return patterns
+
+
+def apply_fetch_profile(driver, profile):
+    """Block the profile's resources for subsequent page loads of a browser via DevTools."""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_url_patterns(profile)})
+
+
+def drain_performance_log(driver):
+    """Read and clear the browser's DevTools performance log."""
+    try:
+        return driver.get_log("performance")
+    except Exception:
+        return []
+
+
+class FetchProfileStats:
+    """
+    Per-profile accounting of requests and bytes loaded and blocked.
+
+    Bytes a blocked request would have cost are estimated from the average
+    size of the same resource type when it was loaded on other pages, falling
+    back to typical sizes until such samples exist.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profiles = {}
+        self._type_sizes = {}  # resource type -> [total bytes, count]
+
+    def record(self, profile, log_entries):
+        """
+        Account for one page load from its performance log entries.
+
+        Returns:
+            Dict with 'requests', 'bytes', 'blocked_requests' and 'bytes_saved'
+        """
+        types, sizes, blocked = {}, {}, []
+        for entry in log_entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError, TypeError):
+                continue
+            method, params = message.get("method"), message.get("params", {})
+            request_id = params.get("requestId")
+            if method == "Network.requestWillBeSent":
+                types[request_id] = params.get("type", "Other")
+            elif method == "Network.loadingFinished":
+                sizes[request_id] = params.get("encodedDataLength", 0)
+            elif method == "Network.loadingFailed" and params.get("blockedReason"):
+                blocked.append(request_id)
+
+        with self._lock:
+            for request_id, size in sizes.items():
+                totals = self._type_sizes.setdefault(types.get(request_id, "Other"), [0, 0])
+                totals[0] += size
+                totals[1] += 1
+
+            bytes_saved = sum(self._estimated_size(types.get(request_id, "Other")) for request_id in blocked)
+            page = {
+                "requests": len(sizes),
+                "bytes": int(sum(sizes.values())),
+                "blocked_requests": len(blocked),
+                "bytes_saved": int(bytes_saved)
+            }
+
+            totals = self._profiles.setdefault(profile, {
+                "pages": 0, "requests": 0, "bytes": 0, "blocked_requests": 0, "bytes_saved": 0
+            })
+            totals["pages"] += 1
+            for key, value in page.items():
+                totals[key] += value
+        return page
+
+    def _estimated_size(self, resource_type):
+        """Average observed size of a resource type. Caller holds the lock."""
+        total, count = self._type_sizes.get(resource_type, (0, 0))
+        if count:
+            return total / count
+        return DEFAULT_RESOURCE_SIZES.get(resource_type, DEFAULT_RESOURCE_SIZES["Other"])
+
+    def summary(self):
+        """Totals per profile."""
+        with self._lock:
+            return {profile: dict(totals) for profile, totals in self._profiles.items()}
+
+
+_shared_stats = FetchProfileStats()
+
+
+def get_fetch_stats():
+    """Return the process-wide fetch profile statistics."""
+    return _shared_stats
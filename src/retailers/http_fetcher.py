@@ -0,0 +1,158 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from lxml import html as lxml_html
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36"
+)
+
+# Status codes that mean the site refused a non-browser client
+BLOCKED_STATUS_CODES = {401, 403, 407, 429, 503}
+
+# Markers of bot walls / challenge pages served with a 200 status
+CHALLENGE_MARKERS = [
+    "captcha", "verify you are human", "are you a robot", "access denied",
+    "px-captcha", "cf-challenge", "please enable javascript"
+]
+
+# Elements only bot walls render. A reCAPTCHA script or widget alone is not one:
+# ordinary pages load them for login and newsletter forms
+CHALLENGE_SELECTORS = "iframe[src*='captcha'], #px-captcha, #challenge-form"
+
+
+def parse_html(html):
+    """Parse an HTML string into an lxml element tree."""
+    return lxml_html.fromstring(html or "<html></html>")
+
+
+class HttpFetcher:
+    """
+    Lightweight HTTP fetch tier for pages that render server-side.
+
+    Uses a pooled keep-alive session so repeated checks against the same
+    sites reuse connections, and lxml to validate and parse the result.
+    """
+
+    def __init__(self, pool_size=10, timeout=15, user_agent=DEFAULT_USER_AGENT):
+        self.timeout = timeout
+        self._validators = {}  # url -> {"ETag": ..., "Last-Modified": ...}
+        self._validators_lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": user_agent,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive"
+        })
+
+    def fetch(self, url, ready_selector=None, conditional=False):
+        """
+        Fetch a page over plain HTTP.
+
+        Args:
+            url: Page URL
+            ready_selector: CSS selector that must be present in the raw HTML
+                for the page to be usable without JavaScript
+            conditional: Revalidate with the ETag/Last-Modified of the previous
+                response so an unchanged page costs a bodiless 304
+
+        Returns:
+            Page dict with 'url', 'html', 'tree', 'screenshot', 'source',
+            'status_code', 'not_modified' and 'elapsed', or None if the request
+            was blocked or the page needs JavaScript to render its content.
+            A 304 response has 'not_modified' set and no 'html' or 'tree'.
+        """
+        start = time.time()
+        headers = {}
+        if conditional:
+            with self._validators_lock:
+                validators = self._validators.get(url, {})
+            if validators.get("ETag"):
+                headers["If-None-Match"] = validators["ETag"]
+            if validators.get("Last-Modified"):
+                headers["If-Modified-Since"] = validators["Last-Modified"]
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f"HTTP fetch failed for {url}: {e}")
+            return None
+
+        if response.status_code == 304 and headers:
+            return {
+                "url": url,
+                "html": None,
+                "tree": None,
+                "screenshot": None,
+                "source": "http",
+                "status_code": 304,
+                "not_modified": True,
+                "elapsed": time.time() - start
+            }
+
+        if response.status_code in BLOCKED_STATUS_CODES or response.status_code >= 500:
+            return None
+
+        html = response.text
+        tree = parse_html(html)
+
+        if ready_selector and not tree.cssselect(ready_selector):
+            # Either the content is rendered client-side or we got a challenge page
+            return None
+
+        if not ready_selector and self._looks_like_challenge(tree):
+            return None
+
+        if conditional:
+            validators = {name: response.headers[name] for name in ("ETag", "Last-Modified") if response.headers.get(name)}
+            with self._validators_lock:
+                self._validators[url] = validators
+
+        return {
+            "url": response.url,
+            "html": html,
+            "tree": tree,
+            "screenshot": None,
+            "source": "http",
+            "status_code": response.status_code,
+            "not_modified": False,
+            "elapsed": time.time() - start
+        }
+
+    def _looks_like_challenge(self, tree):
+        """
+        Check whether a parsed page looks like a bot wall rather than real content.
+
+        Markers are looked for in the title and visible text only, so script
+        URLs and inline code (e.g. a page loading reCAPTCHA for its login form)
+        do not count.
+        """
+        if tree.cssselect(CHALLENGE_SELECTORS):
+            return True
+        text = " ".join(tree.xpath("//title//text() | //body//text()[not(ancestor::script) and not(ancestor::style)]"))
+        head = text[:20000].lower()
+        return any(marker in head for marker in CHALLENGE_MARKERS)
+
+    def close(self):
+        """Close pooled connections."""
+        self.session.close()
+
+
+_shared_fetcher = None
+_shared_fetcher_lock = threading.Lock()
+
+
+def get_http_fetcher():
+    """Return the process-wide HttpFetcher so all retailers share one connection pool."""
+    global _shared_fetcher
+    with _shared_fetcher_lock:
+        if _shared_fetcher is None:
+            _shared_fetcher = HttpFetcher()
+        return _shared_fetcher
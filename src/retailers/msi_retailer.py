@@ -2,65 +2,66 @@ import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from src.retailers.base_retailer import BaseRetailer
+from src.retailers.base_retailer import BaseRetailer, uses_browser
+from src.metrics import get_metrics
+from src.retailers.extractors import MSIExtractor
 
 class MSIRetailer(BaseRetailer):
     """Implementation for MSI website."""
     
-    def __init__(self, ai_agent):
-        super().__init__("MSI", ai_agent)
+    tile_selector = ".product-item"
+    # Zero-results message of the search page
+    empty_selectors = [".search-empty"]
+    extractor = MSIExtractor()
+    
+    def __init__(self, ai_agent, driver_pool=None):
+        super().__init__("MSI", ai_agent, driver_pool)
         self.base_url = "https://us.msi.com"
         self.search_url_template = "https://us.msi.com/search/{}"
         
+    @uses_browser
     def search_products(self, query):
         """Search for products on MSI."""
         search_url = self.search_url_template.format(query.replace(' ', '%20'))
         
         try:
+            self.search_errors.pop(query, None)
             print(f"Searching MSI for: {query}")
-            self.driver.get(search_url)
-            
-            # Wait for search results to load
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".product-item"))
-            )
-            
-            # Use AI agent for visual analysis
-            page_content = self.driver.page_source
-            screenshot = self.driver.get_screenshot_as_png()
+            # Load search results (plain HTTP when the retailer supports it)
+            page = self.fetch_page(search_url, self.tile_selector)
             
-            products = self.ai_agent.process_input(
+            # Parse product tiles, with the AI agent as fallback
+            products = self.analyze_search_page(
                 f"Find RTX {query} products on MSI search results page",
-                {
-                    "screenshot": screenshot,
-                    "html": page_content
-                }
+                page,
+                query
             )
             
             # Filter for available products
-            available_products = []
-            for product in products.get("visual", []):
-                # Check for "Buy Now", "Add to Cart", "Check Retailers" indicators
-                if any(text in product.get("button_text", "").lower() for text in ["buy now", "add to cart", "check retailers"]):
-                    product["retailer"] = self.name
-                    available_products.append(product)
+            with get_metrics().span(self.name, "filter"):
+                available_products = []
+                for product in products:
+                    # Check for "Buy Now", "Add to Cart", "Check Retailers" indicators
+                    if any(text in product.get("button_text", "").lower() for text in ["buy now", "add to cart", "check retailers"]):
+                        product["retailer"] = self.name
+                        available_products.append(product)
                     
             self.products = available_products
             return available_products
             
         except Exception as e:
             print(f"Error searching MSI: {e}")
+            self.search_errors[query] = str(e)
             return []
     
+    @uses_browser
     def check_product_availability(self, product_url):
         """Check if a specific product is available on MSI."""
         try:
-            self.driver.get(product_url)
+            self.open_page(product_url, "screenshot")
             
             # Wait for product page to load
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".product-detail"))
-            )
+            self.wait_for_page(".product-detail", detect_empty=False)
             
             # Use AI agent to analyze the page
             screenshot = self.driver.get_screenshot_as_png()
@@ -75,9 +76,13 @@ class MSIRetailer(BaseRetailer):
             )
             
             # MSI often directs to retailers rather than direct sales
-            # Look for "Buy Now" or "Where to Buy" buttons
-            buy_buttons = self.driver.find_elements(By.XPATH, 
-                "//a[contains(text(), 'Buy Now') or contains(text(), 'Where to Buy')]")
+            # Look for "Buy Now" or "Where to Buy" buttons, with their links, in one script call
+            buy_buttons = self.extract_bulk({
+                "buy": {
+                    "xpath": "//a[contains(text(), 'Buy Now') or contains(text(), 'Where to Buy')]",
+                    "fields": {"text": (None, "text"), "url": (None, "href")}
+                }
+            })["buy"]
                 
             if buy_buttons:
                 return {"available": True, "status": "RETAILER_AVAILABLE", "retailer": self.name, "url": product_url}
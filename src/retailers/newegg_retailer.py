@@ -1,78 +1,77 @@
 import time
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from src.retailers.base_retailer import BaseRetailer
+from src.retailers.base_retailer import BaseRetailer, uses_browser
+from src.metrics import get_metrics
+from src.retailers.extractors import NeweggExtractor
 
 class NeweggRetailer(BaseRetailer):
     """Implementation for Newegg website."""
     
-    def __init__(self, ai_agent):
-        super().__init__("Newegg", ai_agent)
+    tile_selector = ".item-cell"
+    # Zero-results message of the search page
+    empty_selectors = [".result-message-error"]
+    extractor = NeweggExtractor()
+    
+    # Newegg search and product pages render server-side
+    use_http_fetch = True
+    
+    def __init__(self, ai_agent, driver_pool=None):
+        super().__init__("Newegg", ai_agent, driver_pool)
         self.base_url = "https://www.newegg.com"
         self.search_url_template = "https://www.newegg.com/p/pl?d={}"
         
+    @uses_browser
     def search_products(self, query):
         """Search for products on Newegg."""
         search_url = self.search_url_template.format(query.replace(' ', '+'))
         
         try:
+            self.search_errors.pop(query, None)
             print(f"Searching Newegg for: {query}")
-            self.driver.get(search_url)
-            
-            # Wait for search results to load
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".item-cell"))
-            )
+            # Load search results (plain HTTP when the retailer supports it)
+            page = self.fetch_page(search_url, self.tile_selector)
             
-            # Use AI agent for visual analysis
-            page_content = self.driver.page_source
-            screenshot = self.driver.get_screenshot_as_png()
-            
-            products = self.ai_agent.process_input(
+            # Parse product tiles, with the AI agent as fallback
+            products = self.analyze_search_page(
                 f"Find RTX {query} products on Newegg search results page",
-                {
-                    "screenshot": screenshot,
-                    "html": page_content
-                }
+                page,
+                query
             )
             
-            available_products = []
-            for product in products.get("visual", []):
-                # For Newegg, check for "Add to cart" vs "Auto Notify" buttons
-                if product.get("button_text") == "Add to cart":
-                    product["retailer"] = self.name
-                    available_products.append(product)
+            with get_metrics().span(self.name, "filter"):
+                available_products = []
+                for product in products:
+                    # For Newegg, check for "Add to cart" vs "Auto Notify" buttons
+                    if "ADD TO CART" in (product.get("button_text") or "").upper():
+                        product["retailer"] = self.name
+                        available_products.append(product)
                     
             self.products = available_products
             return available_products
             
         except Exception as e:
             print(f"Error searching Newegg: {e}")
+            self.search_errors[query] = str(e)
             return []
     
+    @uses_browser
     def check_product_availability(self, product_url):
         """Check if a specific product is available on Newegg."""
         try:
-            self.driver.get(product_url)
-            
             # Wait for button to load
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".product-buy"))
-            )
+            page = self.fetch_page(product_url, ".product-buy", capture_screenshot=False)
             
             # Check if "Add to cart" button exists vs "Auto Notify" button
-            buy_buttons = self.driver.find_elements(By.CSS_SELECTOR, ".btn-primary")
+            buy_buttons = page["tree"].cssselect(".btn-primary")
             
             for button in buy_buttons:
-                button_text = button.text.strip().upper()
+                button_text = button.text_content().strip().upper()
                 if "ADD TO CART" in button_text:
                     return {"available": True, "status": "AVAILABLE", "retailer": self.name, "url": product_url}
             
             # If we didn't find "Add to cart", check for "Auto Notify" indicating out of stock
-            auto_notify_buttons = self.driver.find_elements(By.CSS_SELECTOR, ".btn-secondary")
+            auto_notify_buttons = page["tree"].cssselect(".btn-secondary")
             for button in auto_notify_buttons:
-                if "AUTO NOTIFY" in button.text.strip().upper():
+                if "AUTO NOTIFY" in button.text_content().strip().upper():
                     return {"available": False, "status": "OUT_OF_STOCK", "retailer": self.name, "url": product_url}
                     
             return {"available": False, "status": "UNKNOWN", "retailer": self.name, "url": product_url}
@@ -1,48 +1,83 @@
+import os
 import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from src.retailers.base_retailer import BaseRetailer
+from src.retailers.base_retailer import BaseRetailer, uses_browser
+from src.retailers.tracker_engine import TrackerPageEngine
+from src.metrics import get_metrics
 
 class NowInStockAggregator(BaseRetailer):
     """Implementation for NowInStock tracking website."""
     
-    def __init__(self, ai_agent):
-        super().__init__("NowInStock", ai_agent)
+    use_http_fetch = True
+    
+    def __init__(self, ai_agent, driver_pool=None):
+        super().__init__("NowInStock", ai_agent, driver_pool)
         self.base_url = "https://www.nowinstock.net"
-        # URL for RTX 5080/5090 tracking page - this would need to be updated when these pages exist
-        self.tracking_url = "https://www.nowinstock.net/computers/videocards/nvidia/rtx5080/"
-        self.alt_tracking_url = "https://www.nowinstock.net/computers/videocards/nvidia/rtx5090/"
+        # Tracker pages to poll - NOWINSTOCK_TRACKER_URLS adds other SKUs or regions (comma-separated)
+        self.tracker_urls = [
+            url.strip() for url in os.getenv(
+                "NOWINSTOCK_TRACKER_URLS",
+                "https://www.nowinstock.net/computers/videocards/nvidia/rtx5080/,"
+                "https://www.nowinstock.net/computers/videocards/nvidia/rtx5090/"
+            ).split(",") if url.strip()
+        ]
+        self.tracker_engine = TrackerPageEngine()
         
+    @uses_browser
     def search_products(self, query=None):
-        """Search for available GPU products on NowInStock."""
+        """
+        Search for available GPU products on NowInStock.
+        
+        Tracker pages are polled over HTTP with conditional requests; only pages
+        that cannot be read without a browser fall back to Selenium and the AI agent.
+        """
         products = []
+        self.search_errors.pop(query, None)
         
         try:
-            # Check RTX 5080 page
-            print("Checking NowInStock for RTX 5080...")
-            self.driver.get(self.tracking_url)
-            products.extend(self._extract_available_products())
+            with get_metrics().span(self.name, "tracker_poll"):
+                polls = self.tracker_engine.poll_all(self.tracker_urls)
             
-            # Check RTX 5090 page if different
-            print("Checking NowInStock for RTX 5090...")
-            self.driver.get(self.alt_tracking_url)
-            products.extend(self._extract_available_products())
+            for url in self.tracker_urls:
+                poll = polls[url]
+                if poll is None:
+                    print(f"Checking NowInStock in browser: {url}")
+                    self.open_page(url, "screenshot")
+                    products.extend(self._extract_available_products())
+                    continue
+                
+                if poll["not_modified"]:
+                    print(f"NowInStock unchanged: {url}")
+                elif poll["added"] or poll["removed"] or poll["changed"]:
+                    print(f"NowInStock changed: {url} (+{len(poll['added'])} "
+                          f"-{len(poll['removed'])} ~{len(poll['changed'])} rows)")
+                
+                for row in poll["rows"]:
+                    if row["in_stock"] and row["url"]:
+                        products.append({
+                            "name": row["name"],
+                            "retailer": row["retailer"],
+                            "price": row["price"],
+                            "url": row["url"],
+                            "status": "AVAILABLE",
+                            "source": "NowInStock"
+                        })
             
             self.products = products
             return products
             
         except Exception as e:
             print(f"Error searching NowInStock: {e}")
+            self.search_errors[query] = str(e)
             return []
     
     def _extract_available_products(self):
         """Extract available products from current page."""
         try:
             # Wait for tracker table to load
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.ID, "tracker-table"))
-            )
+            self.wait_for_page("#tracker-table", detect_empty=False)
             
             # Use AI agent for visual analysis
             page_content = self.driver.page_source
@@ -58,33 +93,37 @@ class NowInStockAggregator(BaseRetailer):
             )
             
             # Also perform direct DOM inspection for in-stock items
-            # NowInStock typically uses green text and "IN STOCK" label
-            in_stock_rows = self.driver.find_elements(By.XPATH, 
-                "//tr[contains(@class, 'inStock') or .//td[contains(@class, 'stockStatus')][contains(text(), 'In Stock')]]")
+            # NowInStock typically uses green text and "IN STOCK" label.
+            # All rows and their columns come back from a single script call.
+            in_stock_rows = self.extract_bulk({
+                "rows": {
+                    "xpath": "//tr[contains(@class, 'inStock') or .//td[contains(@class, 'stockStatus')][contains(text(), 'In Stock')]]",
+                    "fields": {
+                        "name": ("td.product", "text"),
+                        "retailer": ("td.merchant", "text"),
+                        "price": ("td.price", "text"),
+                        "url": ("td.product a", "href")
+                    }
+                }
+            })["rows"]
             
             available_products = []
             
             # Process DOM-extracted items
             for row in in_stock_rows:
-                try:
-                    product_name = row.find_element(By.CSS_SELECTOR, "td.product").text
-                    retailer_name = row.find_element(By.CSS_SELECTOR, "td.merchant").text
-                    price_text = row.find_element(By.CSS_SELECTOR, "td.price").text
-                    
-                    # Get link to product
-                    link_elem = row.find_element(By.CSS_SELECTOR, "td.product a")
-                    product_url = link_elem.get_attribute("href")
+                if None in row.values():
+                    missing = ", ".join(field for field, value in row.items() if value is None)
+                    print(f"Error extracting product from row: missing {missing}")
+                    continue
                     
-                    available_products.append({
-                        "name": product_name,
-                        "retailer": retailer_name,
-                        "price": price_text,
-                        "url": product_url,
-                        "status": "AVAILABLE",
-                        "source": "NowInStock"
-                    })
-                except Exception as e:
-                    print(f"Error extracting product from row: {e}")
+                available_products.append({
+                    "name": row["name"],
+                    "retailer": row["retailer"],
+                    "price": row["price"],
+                    "url": row["url"],
+                    "status": "AVAILABLE",
+                    "source": "NowInStock"
+                })
             
             # Combine with AI-detected products
             for product in result.get("visual", []):
@@ -96,13 +135,15 @@ class NowInStockAggregator(BaseRetailer):
             
         except Exception as e:
             print(f"Error extracting products: {e}")
+            self.search_errors[None] = str(e)
             return []
     
+    @uses_browser
     def check_product_availability(self, product_url):
         """Check if a specific product is available via NowInStock."""
         # For NowInStock, we redirect to the actual retailer page
         try:
-            self.driver.get(product_url)
+            self.open_page(product_url, "screenshot")
             
             # Wait for page to load
             WebDriverWait(self.driver, 20).until(
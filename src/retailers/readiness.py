@@ -0,0 +1,115 @@
+import re
+import threading
+import time
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+from src.retailers.http_fetcher import CHALLENGE_MARKERS, CHALLENGE_SELECTORS
+
+# Page outcomes, decided by whichever condition is met first
+RESULTS = "results"
+EMPTY = "empty"
+CHALLENGE = "challenge"
+UNKNOWN = "unknown"
+
+# Wording of "no results" pages shared by most retailers, as regular expressions matched
+# case-insensitively line by line against the page text. Whole phrases only: a bare
+# substring such as "0 results" would also match "Showing 1-24 of 120 results".
+EMPTY_RESULTS_PATTERNS = [
+    r"^\s*(sorry,?\s+)?no results( found| for .*| match.*)?[.!]?\s*$",
+    r"(^|[^\d,.])0 (results|items found|products found)\b",
+    r"\bdid not match any (products|results|items)\b",
+    r"\bdid(n['’]t| not) find anything\b",
+    r"\bwe (couldn['’]t|could not) find any (products|results|items|matches)\b",
+    r"^\s*no (matching )?products (found|match)"
+]
+
+# Decides the outcome of the current page in one round trip, or returns null while undecided
+READINESS_SCRIPT = """
+const [readySelector, emptySelectors, emptyPatterns, challengeMarkers, challengeSelectors] = arguments;
+if (readySelector && document.querySelector(readySelector)) return "results";
+const body = document.body ? (document.body.innerText || "") : "";
+const head = (document.title + " " + body.slice(0, 20000)).toLowerCase();
+if (challengeMarkers.some(marker => head.includes(marker))
+        || document.querySelector(challengeSelectors)) {
+    return "challenge";
+}
+if (emptySelectors.some(selector => document.querySelector(selector))
+        || emptyPatterns.some(pattern => new RegExp(pattern, "im").test(body))) {
+    return "empty";
+}
+return document.readyState === "complete" ? "loaded" : null;
+"""
+
+
+def matches_empty_text(text, empty_patterns=EMPTY_RESULTS_PATTERNS):
+    """Whether page text reads as a "no results" message; the Python counterpart of the in-page check."""
+    return any(re.search(pattern, text, re.IGNORECASE | re.MULTILINE) for pattern in empty_patterns)
+
+
+def wait_for_outcome(driver, ready_selector, empty_selectors=(), empty_patterns=EMPTY_RESULTS_PATTERNS,
+                     timeout=20, unknown_grace=3.0, poll_frequency=0.2):
+    """
+    Wait until a page shows results, an empty result set or a challenge, or settles on an unknown layout.
+
+    Every poll checks all outcomes at once, so a no-results page or bot wall
+    returns as soon as it renders instead of after the full timeout. A page
+    that finished loading without any known marker is given unknown_grace
+    seconds for client-side rendering before it counts as an unknown layout.
+
+    Args:
+        driver: WebDriver with the page loading
+        ready_selector: CSS selector present when results are shown
+        empty_selectors: CSS selectors of "no results" messages
+        empty_patterns: Regular expressions of "no results" messages, matched per line ignoring case
+        timeout: Seconds before giving up with an unknown outcome
+
+    Returns:
+        Tuple of (outcome, elapsed_seconds)
+    """
+    start = time.time()
+    loaded_at = None
+    arguments = (ready_selector, list(empty_selectors), list(empty_patterns), CHALLENGE_MARKERS, CHALLENGE_SELECTORS)
+
+    def decided(driver):
+        nonlocal loaded_at
+        state = driver.execute_script(READINESS_SCRIPT, *arguments)
+        if state == "loaded":
+            loaded_at = loaded_at or time.time()
+            return UNKNOWN if time.time() - loaded_at >= unknown_grace else None
+        return state
+
+    try:
+        outcome = WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(decided)
+    except TimeoutException:
+        outcome = UNKNOWN
+    return outcome, time.time() - start
+
+
+class ReadinessStats:
+    """Counts and total wait time of page outcomes per retailer."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._outcomes = {}  # (retailer, outcome) -> [count, total seconds]
+
+    def record(self, retailer, outcome, elapsed):
+        with self._lock:
+            totals = self._outcomes.setdefault((retailer, outcome), [0, 0.0])
+            totals[0] += 1
+            totals[1] += elapsed
+
+    def summary(self):
+        """Dict mapping retailer -> outcome -> {'count', 'average_seconds'}."""
+        with self._lock:
+            result = {}
+            for (retailer, outcome), (count, total) in self._outcomes.items():
+                result.setdefault(retailer, {})[outcome] = {"count": count, "average_seconds": total / count}
+            return result
+
+
+_shared_stats = ReadinessStats()
+
+
+def get_readiness_stats():
+    """Return the process-wide page readiness statistics."""
+    return _shared_stats
@@ -1,26 +1,71 @@
-import praw
+import os
 import time
 import re
 from datetime import datetime, timedelta
+from src.retailers.reddit_state import RedditStateStore
+from src.keywords import get_keyword_matcher
+
+# Listing endpoints for one or more subreddits joined with "+" (a multireddit)
+NEW_LISTING_PATH = "r/{}/new"
+COMMENTS_LISTING_PATH = "r/{}/comments"
+
+# Comment stream cursors are kept per subreddit next to the post cursors
+COMMENT_CURSOR_SUFFIX = "/comments"
+
+# Keyword categories that make a post title worth a closer look
+RELEVANT_CATEGORIES = frozenset({"priority_access", "drop_signal", "rtx_5080", "rtx_5090"})
+
+# A "megathread" title about one of these is followed as a drop megathread
+MEGATHREAD_TOPICS = frozenset({"rtx_5080", "rtx_5090", "gpu", "drop_signal"})
+
+LINK_PATTERN = re.compile(r"https?://[^\s)\]>]+")
 
 class RedditMonitor:
-    """Monitor Reddit for GPU availability information."""
+    """
+    Monitor Reddit for GPU availability information.
+    
+    New posts from all subreddits are read in one multireddit listing request,
+    paged forward from a persisted `before` cursor, and every post is checked
+    against a persisted seen-set, so restarts neither re-evaluate nor
+    re-alert old posts. The Reddit client can be injected (e.g. a fake
+    exposing get(), info() and subreddit()) for testing.
     
-    def __init__(self, ai_agent):
+    Drop megathreads, designated in REDDIT_MEGATHREADS or detected from post
+    titles, are followed through the subreddits' comment stream: new comments
+    are read from a persisted cursor, filtered to the followed threads and
+    passed on only when their body mentions stock chatter. Comments are
+    processed page by page and never as a whole thread tree, so memory stays
+    bounded however large a megathread grows.
+    """
+    
+    def __init__(self, ai_agent, reddit=None, state=None):
         self.name = "Reddit"
         self.ai_agent = ai_agent
         self.subreddits = ["nvidia", "buildapcsales"]
-        self.reddit = self._setup_reddit()
-        self.last_check = datetime.now() - timedelta(days=1)  # Start by checking posts from last 24h
-        self.priority_keywords = [
-            "priority access", "priority program", "purchase program", 
-            "RTX 5080", "RTX 5090", "drawing", "lottery",
-            "nvidia official", "founders edition", "fe", "queue"
+        self.reddit = reddit if reddit is not None else self._setup_reddit()
+        self.state = state or RedditStateStore(max_seen=int(os.getenv("REDDIT_SEEN_MAX", "5000")))
+        # Posts per listing request (Reddit caps it at 100) and requests per check when catching up
+        self.page_limit = min(int(os.getenv("REDDIT_PAGE_LIMIT", "100")), 100)
+        self.max_pages = int(os.getenv("REDDIT_MAX_PAGES", "5"))
+        # Unseen posts older than this are ignored, e.g. on the very first run
+        self.max_post_age = timedelta(hours=float(os.getenv("REDDIT_MAX_POST_AGE_HOURS", "24")))
+        self.keywords = get_keyword_matcher()
+        # Full priority-access searches are spaced out; new posts are caught from the new-post stream
+        self.priority_search_interval = int(os.getenv("REDDIT_PRIORITY_SEARCH_INTERVAL", "14400"))  # 4 hours
+        self._last_priority_search = 0.0
+        self._priority_candidates = {}
+        # Megathreads: designated ones are resolved on the first comment check, detected ones expire
+        self.designated_megathreads = [
+            value.strip() for value in os.getenv("REDDIT_MEGATHREADS", "").split(",") if value.strip()
         ]
+        self._designated_resolved = False
+        self.megathread_lifetime = float(os.getenv("REDDIT_MEGATHREAD_HOURS", "48")) * 3600
         
     def _setup_reddit(self):
         """Set up the Reddit API client."""
         try:
+            # Imported here so callers injecting a client, or never touching Reddit, skip loading PRAW
+            import praw
             # Initialize with read-only access if no credentials provided
             return praw.Reddit(
                 client_id=os.getenv("REDDIT_CLIENT_ID", ""),
@@ -33,6 +78,91 @@ class RedditMonitor:
             print("Continuing with limited Reddit functionality")
             # Return a minimal placeholder that won't cause further errors
             return None
+    
+    def _multireddit_name(self):
+        return "+".join(self.subreddits)
+    
+    def _page_forward(self, path, before):
+        """Fetch items newer than the `before` fullname, oldest page first, up to max_pages requests."""
+        items = []
+        for _ in range(self.max_pages):
+            page = list(self.reddit.get(path, params={"limit": self.page_limit, "before": before}))
+            items.extend(page)
+            if len(page) < self.page_limit:
+                break
+            # Listings are newest first; the next page starts after the newest item of this one
+            before = page[0].fullname
+        return items
+    
+    def _fetch_since_cursors(self, path, cursor_names):
+        """
+        Items of a multireddit listing created since the previous fetch.
+        
+        The newest of the given cursors anchors the listing. An empty `before`
+        listing is checked against the latest unanchored page: if the cursor is
+        there, nothing is new; if not, the cursor item was removed or has fallen
+        out of Reddit's ~1000-item listing window (e.g. after downtime), so the
+        cursor is dropped and the next one is tried. Without a usable cursor the
+        latest page is read and the seen-set filters out what was already
+        handled; the cursors then restart from its newest items.
+        """
+        cursors = self.state.cursors()
+        candidates = sorted(
+            ((cursors[name]["created_utc"], cursors[name]["fullname"], name) for name in cursor_names if name in cursors),
+            reverse=True
+        )
+        
+        latest = None
+        for _, before, cursor_name in candidates:
+            items = self._page_forward(path, before)
+            if items:
+                return items
+            if latest is None:
+                latest = list(self.reddit.get(path, params={"limit": self.page_limit}))
+            fullnames = [item.fullname for item in latest]
+            if before in fullnames:
+                # Still listed: whatever is listed above it is new (normally nothing)
+                return latest[:fullnames.index(before)]
+            print(f"Reddit cursor {before} for {cursor_name} is no longer listed, falling back to the latest page")
+            self.state.drop_cursor(cursor_name)
+        
+        if latest is None:
+            latest = list(self.reddit.get(path, params={"limit": self.page_limit}))
+        return latest
+    
+    def fetch_new_posts(self):
+        """Posts created since the previous check across all subreddits."""
+        return self._fetch_since_cursors(NEW_LISTING_PATH.format(self._multireddit_name()), self.subreddits)
+    
+    def _advance_cursors(self, items, suffix=""):
+        """Move each subreddit's cursor (posts, or comments with COMMENT_CURSOR_SUFFIX) to its newest fetched item."""
+        newest = {}
+        for item in items:
+            cursor_name = str(item.subreddit).lower() + suffix
+            if cursor_name not in newest or item.created_utc > newest[cursor_name].created_utc:
+                newest[cursor_name] = item
+        for cursor_name, item in newest.items():
+            self.state.advance_cursor(cursor_name, item.fullname, item.created_utc)
+    
+    def _is_fresh(self, post, current_time):
+        """Unseen and recent enough to be worth evaluating."""
+        if self.state.is_seen(post.fullname):
+            return False
+        return datetime.fromtimestamp(post.created_utc) >= current_time - self.max_post_age
+    
+    def _matches_keywords(self, title):
+        return not RELEVANT_CATEGORIES.isdisjoint(self.keywords.categories(title))
+    
+    def _post_record(self, post):
+        return {
+            "title": post.title,
+            "url": f"https://reddit.com{post.permalink}",
+            "link_url": None if post.is_self else post.url,
+            "created": datetime.fromtimestamp(post.created_utc).strftime("%Y-%m-%d %H:%M"),
+            "author": post.author.name if post.author else "[deleted]",
+            "score": post.score,
+            "subreddit": str(post.subreddit)
+        }
             
     def check_for_updates(self):
         """Check Reddit for new information about GPU availability programs."""
@@ -43,18 +173,41 @@ class RedditMonitor:
         current_time = datetime.now()
         
         try:
-            for subreddit_name in self.subreddits:
-                subreddit = self.reddit.subreddit(subreddit_name)
+            # Check new posts first for very recent info
+            new_posts = self.fetch_new_posts()
+            for post in new_posts:
+                if not self._is_fresh(post, current_time):
+                    continue
+                
+                # Picked up by the next priority access check without waiting for a search
+                if "priority_access" in self.keywords.categories(post.title):
+                    self._priority_candidates[post.fullname] = post
                 
-                # Check hot posts first (most likely to contain important announcements)
-                for post in subreddit.hot(limit=20):
-                    # Skip posts we've already seen
-                    post_time = datetime.fromtimestamp(post.created_utc)
-                    if post_time <= self.last_check:
+                # Check for priority access related keywords
+                if self._matches_keywords(post.title):
+                    # For new posts, we'll include all that match keywords without AI filtering
+                    # since they might not have enough content yet for proper evaluation
+                    record = self._post_record(post)
+                    record["type"] = "new_post"
+                    relevant_posts.append(record)
+            
+            self._advance_cursors(new_posts)
+            self.state.mark_seen(post.fullname for post in new_posts)
+            self._detect_megathreads(new_posts)
+            
+            # Hot posts are likely to contain important announcements; only unseen ones are evaluated.
+            # The new posts are already marked seen, so a failing hot listing must not discard them
+            hot_posts = []
+            try:
+                # 20 per subreddit, as when each subreddit was listed on its own
+                listed = list(self.reddit.subreddit(self._multireddit_name()).hot(limit=20 * len(self.subreddits)))
+                relevant_hot = []
+                for post in listed:
+                    if not self._is_fresh(post, current_time):
                         continue
                         
                     # Check for priority access related keywords
-                    if any(keyword.lower() in post.title.lower() for keyword in self.priority_keywords):
+                    if self._matches_keywords(post.title):
                         # Use AI agent to evaluate relevance
                         post_content = f"Title: {post.title}\nContent: {post.selftext[:1000]}"
                         
@@ -66,84 +219,227 @@ class RedditMonitor:
                         
                         # If AI thinks it's relevant, add it to results
                         if "yes" in str(evaluation).lower() or "relevant" in str(evaluation).lower():
-                            relevant_posts.append({
-                                "title": post.title,
-                                "url": f"https://reddit.com{post.permalink}",
-                                "created": post_time.strftime("%Y-%m-%d %H:%M"),
-                                "author": post.author.name if post.author else "[deleted]",
-                                "score": post.score,
-                                "subreddit": subreddit_name
-                            })
+                            relevant_hot.append(self._post_record(post))
                 
-                # Also check new posts for very recent info
-                for post in subreddit.new(limit=30):
-                    # Skip posts we've already seen
-                    post_time = datetime.fromtimestamp(post.created_utc)
-                    if post_time <= self.last_check:
-                        continue
-                        
-                    # Check for priority access related keywords
-                    if any(keyword.lower() in post.title.lower() for keyword in self.priority_keywords):
-                        # For new posts, we'll include all that match keywords without AI filtering
-                        # since they might not have enough content yet for proper evaluation
-                        relevant_posts.append({
-                            "title": post.title,
-                            "url": f"https://reddit.com{post.permalink}",
-                            "created": post_time.strftime("%Y-%m-%d %H:%M"),
-                            "author": post.author.name if post.author else "[deleted]",
-                            "score": post.score,
-                            "subreddit": subreddit_name,
-                            "type": "new_post"
-                        })
-                
-            # Update last check time
-            self.last_check = current_time
+                self.state.mark_seen(post.fullname for post in listed)
+                # Megathreads are usually stickied, so they show up in hot long after they were new
+                self._detect_megathreads(listed)
+                hot_posts = listed
+                relevant_posts.extend(relevant_hot)
+            except Exception as e:
+                # Unmarked hot posts are evaluated again on the next check
+                print(f"Error checking hot Reddit posts: {e}")
+            
+            print(f"Reddit: {len(new_posts)} new posts, {len(hot_posts)} hot posts, {len(relevant_posts)} relevant")
             return relevant_posts
             
         except Exception as e:
             print(f"Error checking Reddit: {e}")
             return []
             
+    def _priority_search_due(self):
+        return time.time() - self._last_priority_search >= self.priority_search_interval
+    
     def check_nvidia_priority_access(self):
-        """Specifically check for NVIDIA Priority Access Program information."""
+        """
+        Specifically check for NVIDIA Priority Access Program information.
+        
+        Posts are found by a week-long search across all subreddits, run every
+        priority_search_interval seconds, and by priority-access titles in the
+        new-post stream in between. Posts analyzed before are refreshed in bulk
+        with one info() lookup; only new or edited posts are sent to the AI
+        agent, and the analysis is cached by post and edit time.
+        
+        Returns:
+            List of post dicts from the past week; 'new_analysis' is True for
+            posts analyzed in this check and 'updated' for those among them
+            analyzed before an edit. None without a Reddit client
+        """
         if not self.reddit:
             return None
             
         priority_info = []
-        current_time = datetime.now()
         
         try:
-            # Check both subreddits with more specific search
-            for subreddit_name in self.subreddits:
-                subreddit = self.reddit.subreddit(subreddit_name)
-                
-                # Search for priority access posts in the past week
+            # Stream candidates are kept until a check gets through, so a failed one does not lose them
+            pending = dict(self._priority_candidates)
+            candidates = dict(pending)
+            
+            if self._priority_search_due():
+                # Search for priority access posts in the past week, all subreddits in one request
+                subreddit = self.reddit.subreddit(self._multireddit_name())
                 for post in subreddit.search("NVIDIA priority access OR priority program", sort="new", time_filter="week"):
-                    post_time = datetime.fromtimestamp(post.created_utc)
-                    
+                    candidates[post.fullname] = post
+                self._last_priority_search = time.time()
+            
+            # Scores and edit times of known posts from one fullname lookup instead of re-searching
+            week_ago = time.time() - 7 * 86400
+            analyzed_before = self.state.analyzed_since(week_ago)
+            known = [fullname for fullname in analyzed_before if fullname not in candidates]
+            if known:
+                for post in self.reddit.info(fullnames=known):
+                    candidates[post.fullname] = post
+            
+            analyzed = 0
+            scores = {}
+            for post in sorted(candidates.values(), key=lambda post: post.created_utc, reverse=True):
+                if getattr(post, "removed_by_category", None) or post.created_utc < week_ago:
+                    continue
+                
+                edited = float(post.edited or 0)
+                analysis = self.state.get_analysis(post.fullname, edited)
+                new_analysis = analysis is None
+                if new_analysis:
                     # Use AI to extract detailed information
                     post_content = f"Title: {post.title}\nContent: {post.selftext[:2000]}"
                     
-                    analysis = self.ai_agent.process_input(
+                    result = self.ai_agent.process_input(
                         "Extract information about NVIDIA Priority Access Program or drawing details for RTX 5080/5090",
                         {
                             "text": post_content,
                             "html": None
                         }
                     )
-                    
-                    # Add the analyzed information
-                    priority_info.append({
-                        "title": post.title,
-                        "url": f"https://reddit.com{post.permalink}",
-                        "created": post_time.strftime("%Y-%m-%d %H:%M"),
-                        "analysis": analysis.get("text", "No analysis available"),
-                        "score": post.score,
-                        "subreddit": subreddit_name
-                    })
+                    analysis = result.get("text", "No analysis available")
+                    self.state.save_analysis(post.fullname, edited, post.title, f"https://reddit.com{post.permalink}",
+                                             str(post.subreddit), post.created_utc, post.score, analysis)
+                    analyzed += 1
+                else:
+                    scores[post.fullname] = post.score
+                
+                # Add the analyzed information
+                priority_info.append({
+                    "title": post.title,
+                    "url": f"https://reddit.com{post.permalink}",
+                    "created": datetime.fromtimestamp(post.created_utc).strftime("%Y-%m-%d %H:%M"),
+                    "analysis": analysis,
+                    "score": post.score,
+                    "subreddit": str(post.subreddit),
+                    "new_analysis": new_analysis,
+                    "updated": new_analysis and post.fullname in analyzed_before
+                })
             
+            self.state.update_scores(scores)
+            for fullname in pending:
+                self._priority_candidates.pop(fullname, None)
+            print(f"Reddit priority access: {len(priority_info)} posts, {analyzed} analyzed, {len(scores)} from cache")
             return priority_info
             
         except Exception as e:
             print(f"Error checking for NVIDIA Priority Access: {e}")
-            return []
\ No newline at end of file
+            return []
+    
+    def _detect_megathreads(self, posts):
+        """Follow recent posts titled as a megathread about the GPUs or a drop."""
+        cutoff = time.time() - self.megathread_lifetime
+        for post in posts:
+            if post.created_utc < cutoff:
+                continue
+            categories = self.keywords.categories(post.title)
+            if "megathread" not in categories or categories.isdisjoint(MEGATHREAD_TOPICS):
+                continue
+            if self.state.follow_thread(post.fullname, post.title, str(post.subreddit), post.created_utc):
+                print(f"Following Reddit megathread: {post.title} (r/{post.subreddit})")
+    
+    def _resolve_designated_megathreads(self):
+        """Follow the REDDIT_MEGATHREADS posts (IDs, fullnames or URLs) and drop designations no longer listed."""
+        fullnames = []
+        for value in self.designated_megathreads:
+            match = re.search(r"/comments/([a-z0-9]+)", value)
+            post_id = match.group(1) if match else value.removeprefix("t3_")
+            fullnames.append(f"t3_{post_id}")
+        
+        for post in self.reddit.info(fullnames=fullnames) if fullnames else []:
+            if self.state.follow_thread(post.fullname, post.title, str(post.subreddit), post.created_utc, designated=True):
+                print(f"Following designated Reddit megathread: {post.title} (r/{post.subreddit})")
+        for fullname, thread in self.state.threads().items():
+            if thread["designated"] and fullname not in fullnames:
+                self.state.unfollow_thread(fullname)
+        self._designated_resolved = True
+    
+    def _followed_threads(self):
+        """Designated threads, plus detected ones until megathread_lifetime after they were posted."""
+        cutoff = time.time() - self.megathread_lifetime
+        threads = {}
+        for fullname, thread in self.state.threads().items():
+            if not thread["designated"] and thread["created_utc"] < cutoff:
+                print(f"Megathread expired: {thread['title']} ({thread['matches']} of {thread['comments']} comments matched)")
+                self.state.unfollow_thread(fullname)
+                continue
+            threads[fullname] = thread
+        return threads
+    
+    def check_megathreads(self):
+        """
+        Stream new comments of followed megathreads and return those mentioning stock.
+        
+        One comment listing covers every subreddit with a followed thread and is
+        read forward from per-subreddit cursors; comments from other threads and
+        comments without stock chatter are dropped as each page is processed.
+        
+        Returns:
+            List of comment dicts with 'thread', 'body', 'url', 'link_url',
+            'created', 'author', 'score', 'subreddit' and 'categories'
+        """
+        if not self.reddit:
+            return []
+        
+        try:
+            if not self._designated_resolved:
+                self._resolve_designated_megathreads()
+            threads = self._followed_threads()
+            if not threads:
+                return []
+            
+            subreddits = sorted({thread["subreddit"].lower() for thread in threads.values()})
+            comments = self._fetch_since_cursors(
+                COMMENTS_LISTING_PATH.format("+".join(subreddits)),
+                [subreddit_name + COMMENT_CURSOR_SUFFIX for subreddit_name in subreddits]
+            )
+            
+            # Pages arrive oldest first but each is newest first; report in posting order
+            comments.sort(key=lambda comment: comment.created_utc)
+            matches = []
+            matched_fullnames = []
+            activity = {}
+            for comment in comments:
+                thread = threads.get(comment.link_id)
+                if thread is None or self.state.is_seen(comment.fullname):
+                    continue
+                
+                categories = self.keywords.categories(comment.body)
+                matched = "stock_chatter" in categories
+                last_comment_utc, count, matched_count = activity.get(comment.link_id, (0.0, 0, 0))
+                activity[comment.link_id] = (max(last_comment_utc, comment.created_utc), count + 1, matched_count + matched)
+                if not matched:
+                    continue
+                
+                matched_fullnames.append(comment.fullname)
+                link = LINK_PATTERN.search(comment.body)
+                matches.append({
+                    "thread": thread["title"],
+                    "body": comment.body[:500],
+                    "url": f"https://reddit.com{comment.permalink}",
+                    "link_url": link.group(0) if link else None,
+                    "created": datetime.fromtimestamp(comment.created_utc).strftime("%Y-%m-%d %H:%M"),
+                    "author": comment.author.name if comment.author else "[deleted]",
+                    "score": comment.score,
+                    "subreddit": str(comment.subreddit),
+                    "categories": sorted(categories)
+                })
+            
+            self._advance_cursors(comments, COMMENT_CURSOR_SUFFIX)
+            # Only passed-on comments need remembering; the rest are filtered out again if re-read
+            self.state.mark_seen(matched_fullnames)
+            self.state.record_thread_activity(activity)
+            print(f"Reddit megathreads: {len(comments)} new comments, "
+                  f"{sum(count for _, count, _ in activity.values())} in {len(threads)} followed threads, {len(matches)} matched")
+            return matches
+            
+        except Exception as e:
+            print(f"Error streaming Reddit megathread comments: {e}")
+            return []
+    
+    def close(self):
+        """Close the persisted ingestion state."""
+        self.state.close()
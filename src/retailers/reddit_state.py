@@ -0,0 +1,237 @@
+import os
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+class RedditStateStore:
+    """
+    Persistent Reddit ingestion state, so a restart neither re-reads nor re-alerts old posts.
+
+    Holds the newest item seen per listing (the `before` cursor for the next
+    request: posts per subreddit, and comments per subreddit for megathread
+    streaming), the followed megathreads and a bounded set of seen fullnames. The seen-set is
+    mirrored in memory, capped at max_seen entries; the oldest entries are
+    evicted from memory and disk together. AI analyses of priority-access
+    posts are cached by fullname and edit time, so a post only reaches the
+    model again once it is edited.
+    """
+
+    def __init__(self, path=None, max_seen=5000):
+        self.path = path or os.getenv("REDDIT_STATE_PATH", os.path.join("data", "reddit_state.db"))
+        self.max_seen = max_seen
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS reddit_cursors (
+                subreddit TEXT PRIMARY KEY,
+                fullname TEXT NOT NULL,
+                created_utc REAL NOT NULL,
+                updated_at REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS reddit_seen (
+                fullname TEXT PRIMARY KEY,
+                seen_at REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS reddit_seen_at ON reddit_seen (seen_at);
+            CREATE TABLE IF NOT EXISTS priority_analyses (
+                fullname TEXT PRIMARY KEY,
+                edited REAL NOT NULL,
+                title TEXT,
+                url TEXT,
+                subreddit TEXT,
+                created_utc REAL NOT NULL,
+                score INTEGER,
+                analysis TEXT,
+                analyzed_at REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS reddit_threads (
+                fullname TEXT PRIMARY KEY,
+                title TEXT,
+                subreddit TEXT NOT NULL,
+                created_utc REAL NOT NULL,
+                designated INTEGER NOT NULL,
+                last_comment_utc REAL,
+                comments INTEGER NOT NULL DEFAULT 0,
+                matches INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID;
+        """)
+        self._db.commit()
+
+        self._cursors = {
+            row[0]: {"fullname": row[1], "created_utc": row[2]}
+            for row in self._db.execute("SELECT subreddit, fullname, created_utc FROM reddit_cursors")
+        }
+        self._threads = {
+            row[0]: {
+                "title": row[1], "subreddit": row[2], "created_utc": row[3], "designated": bool(row[4]),
+                "last_comment_utc": row[5], "comments": row[6], "matches": row[7]
+            }
+            for row in self._db.execute(
+                "SELECT fullname, title, subreddit, created_utc, designated, last_comment_utc, comments, matches "
+                "FROM reddit_threads"
+            )
+        }
+        rows = self._db.execute(
+            "SELECT fullname FROM reddit_seen ORDER BY seen_at DESC LIMIT ?", (max_seen,)
+        ).fetchall()
+        self._seen = OrderedDict((fullname, None) for (fullname,) in reversed(rows))
+        # Drop rows beyond the cap left by a previous run with a larger max_seen
+        self._db.execute(
+            "DELETE FROM reddit_seen WHERE fullname NOT IN (SELECT fullname FROM reddit_seen ORDER BY seen_at DESC LIMIT ?)",
+            (max_seen,)
+        )
+        self._db.commit()
+
+    def cursors(self):
+        """Dict mapping listing name -> {'fullname', 'created_utc'} of the newest item seen."""
+        with self._lock:
+            return {subreddit: dict(cursor) for subreddit, cursor in self._cursors.items()}
+
+    def advance_cursor(self, subreddit, fullname, created_utc):
+        """Move a subreddit's cursor to a post, unless the cursor is already at a newer one."""
+        with self._lock:
+            current = self._cursors.get(subreddit)
+            if current and current["created_utc"] >= created_utc:
+                return
+            self._cursors[subreddit] = {"fullname": fullname, "created_utc": created_utc}
+            self._db.execute(
+                "INSERT OR REPLACE INTO reddit_cursors (subreddit, fullname, created_utc, updated_at) VALUES (?, ?, ?, ?)",
+                (subreddit, fullname, created_utc, time.time())
+            )
+            self._db.commit()
+
+    def drop_cursor(self, subreddit):
+        """Forget a cursor whose post no longer anchors the listing (e.g. it was removed)."""
+        with self._lock:
+            self._cursors.pop(subreddit, None)
+            self._db.execute("DELETE FROM reddit_cursors WHERE subreddit = ?", (subreddit,))
+            self._db.commit()
+
+    def is_seen(self, fullname):
+        with self._lock:
+            return fullname in self._seen
+
+    def mark_seen(self, fullnames):
+        """Add post fullnames to the seen-set, evicting the oldest beyond max_seen."""
+        now = time.time()
+        with self._lock:
+            added = [fullname for fullname in fullnames if fullname not in self._seen]
+            if not added:
+                return
+            for fullname in added:
+                self._seen[fullname] = None
+            evicted = []
+            while len(self._seen) > self.max_seen:
+                evicted.append(self._seen.popitem(last=False)[0])
+            self._db.executemany("INSERT OR REPLACE INTO reddit_seen (fullname, seen_at) VALUES (?, ?)",
+                                 [(fullname, now) for fullname in added])
+            if evicted:
+                self._db.executemany("DELETE FROM reddit_seen WHERE fullname = ?", [(fullname,) for fullname in evicted])
+            self._db.commit()
+
+    def threads(self):
+        """Followed megathreads: dict mapping post fullname -> thread dict."""
+        with self._lock:
+            return {fullname: dict(thread) for fullname, thread in self._threads.items()}
+
+    def follow_thread(self, fullname, title, subreddit, created_utc, designated=False):
+        """
+        Start following a megathread's comments.
+
+        Returns:
+            True if the thread was not followed before
+        """
+        with self._lock:
+            current = self._threads.get(fullname)
+            if current is not None and current["designated"] >= designated:
+                return False
+            self._threads[fullname] = {
+                "title": title, "subreddit": subreddit, "created_utc": created_utc, "designated": designated,
+                "last_comment_utc": current["last_comment_utc"] if current else None,
+                "comments": current["comments"] if current else 0,
+                "matches": current["matches"] if current else 0
+            }
+            self._db.execute(
+                "INSERT OR REPLACE INTO reddit_threads "
+                "(fullname, title, subreddit, created_utc, designated, last_comment_utc, comments, matches) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (fullname, title, subreddit, created_utc, int(designated), self._threads[fullname]["last_comment_utc"],
+                 self._threads[fullname]["comments"], self._threads[fullname]["matches"])
+            )
+            self._db.commit()
+            return current is None
+
+    def unfollow_thread(self, fullname):
+        with self._lock:
+            self._threads.pop(fullname, None)
+            self._db.execute("DELETE FROM reddit_threads WHERE fullname = ?", (fullname,))
+            self._db.commit()
+
+    def record_thread_activity(self, activity):
+        """
+        Add streamed comment counts to followed threads.
+
+        Args:
+            activity: Dict mapping thread fullname -> (newest comment created_utc, comments, matches)
+        """
+        with self._lock:
+            rows = []
+            for fullname, (last_comment_utc, comments, matches) in activity.items():
+                thread = self._threads.get(fullname)
+                if thread is None:
+                    continue
+                thread["last_comment_utc"] = max(thread["last_comment_utc"] or 0, last_comment_utc)
+                thread["comments"] += comments
+                thread["matches"] += matches
+                rows.append((thread["last_comment_utc"], thread["comments"], thread["matches"], fullname))
+            self._db.executemany(
+                "UPDATE reddit_threads SET last_comment_utc = ?, comments = ?, matches = ? WHERE fullname = ?", rows
+            )
+            self._db.commit()
+
+    def get_analysis(self, fullname, edited):
+        """Cached analysis text of a post at the given edit time (0 if never edited), or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT analysis FROM priority_analyses WHERE fullname = ? AND edited = ?", (fullname, edited)
+            ).fetchone()
+        return row[0] if row else None
+
+    def save_analysis(self, fullname, edited, title, url, subreddit, created_utc, score, analysis):
+        """Store the analysis of a post, replacing one made before an edit."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO priority_analyses "
+                "(fullname, edited, title, url, subreddit, created_utc, score, analysis, analyzed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (fullname, edited, title, url, subreddit, created_utc, score, analysis, time.time())
+            )
+            self._db.commit()
+
+    def update_scores(self, scores):
+        """Refresh the stored scores of analyzed posts from a dict of fullname -> score."""
+        if not scores:
+            return
+        with self._lock:
+            self._db.executemany("UPDATE priority_analyses SET score = ? WHERE fullname = ?",
+                                 [(score, fullname) for fullname, score in scores.items()])
+            self._db.commit()
+
+    def analyzed_since(self, created_utc):
+        """Fullnames of analyzed posts created after a UTC timestamp; older analyses are pruned."""
+        with self._lock:
+            self._db.execute("DELETE FROM priority_analyses WHERE created_utc < ?", (created_utc,))
+            self._db.commit()
+            return [row[0] for row in self._db.execute("SELECT fullname FROM priority_analyses")]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
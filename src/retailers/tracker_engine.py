@@ -0,0 +1,118 @@
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+from src.retailers.http_fetcher import get_http_fetcher
+
+TRACKER_TABLE_SELECTOR = "#tracker-table"
+
+
+def _clean(text):
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def parse_tracker_rows(tree, page_url):
+    """
+    Parse every product row of a NowInStock tracker table.
+
+    Args:
+        tree: lxml tree of the tracker page
+        page_url: URL of the page, used to resolve relative links
+
+    Returns:
+        List of row dicts with 'name', 'retailer', 'price', 'status', 'url'
+        and 'in_stock'
+    """
+    rows = []
+    for table in tree.cssselect(TRACKER_TABLE_SELECTOR):
+        for row in table.iter("tr"):
+            product = row.cssselect("td.product")
+            if not product:
+                continue
+            link = product[0].cssselect("a[href]")
+            merchant = row.cssselect("td.merchant")
+            price = row.cssselect("td.price")
+            status = row.cssselect("td.stockStatus")
+
+            status_text = _clean(status[0].text_content()) if status else ""
+            rows.append({
+                "name": _clean(product[0].text_content()),
+                "retailer": _clean(merchant[0].text_content()) if merchant else None,
+                "price": _clean(price[0].text_content()) if price else None,
+                "status": status_text,
+                "url": urljoin(page_url, link[0].get("href")) if link else None,
+                "in_stock": "inStock" in (row.get("class") or "").split() or "in stock" in status_text.lower()
+            })
+    return rows
+
+
+def _row_key(row):
+    return row["url"] or f"{row['name']}|{row['retailer']}"
+
+
+class TrackerPageEngine:
+    """
+    Polls NowInStock tracker pages over pooled HTTP with conditional requests.
+
+    Each page is revalidated with its ETag/Last-Modified, so an unchanged page
+    costs a 304 with no body and no parsing. Changed pages are parsed straight
+    from #tracker-table and diffed against the previous fetch of that page.
+    """
+
+    def __init__(self, fetcher=None, max_workers=8):
+        self.fetcher = fetcher or get_http_fetcher()
+        self.max_workers = max_workers
+        self._rows = {}  # page url -> {row key: row}
+        self._lock = threading.Lock()
+
+    def poll(self, url):
+        """
+        Poll one tracker page.
+
+        Returns:
+            Dict with 'url', 'rows' (all rows of the page), 'not_modified' and
+            'added', 'removed' and 'changed' row lists, or None if the page
+            could not be fetched without a browser
+        """
+        page = self.fetcher.fetch(url, conditional=True)
+        if page is None:
+            return None
+
+        with self._lock:
+            previous = self._rows.get(url)
+        if page["not_modified"]:
+            if previous is not None:
+                return {"url": url, "rows": list(previous.values()), "not_modified": True,
+                        "added": [], "removed": [], "changed": []}
+            # Validators from a fetch whose rows were never kept; get the full page
+            page = self.fetcher.fetch(url)
+            if page is None:
+                return None
+        if page["tree"] is None or not page["tree"].cssselect(TRACKER_TABLE_SELECTOR):
+            return None
+
+        current = {_row_key(row): row for row in parse_tracker_rows(page["tree"], page["url"])}
+        previous = previous or {}
+        with self._lock:
+            self._rows[url] = current
+
+        return {
+            "url": url,
+            "rows": list(current.values()),
+            "not_modified": False,
+            "added": [row for key, row in current.items() if key not in previous],
+            "removed": [row for key, row in previous.items() if key not in current],
+            "changed": [row for key, row in current.items() if key in previous and previous[key] != row]
+        }
+
+    def poll_all(self, urls):
+        """
+        Poll several tracker pages concurrently over the shared connection pool.
+
+        Returns:
+            Dict mapping each URL to its poll() result (None for pages that need a browser)
+        """
+        if len(urls) <= 1:
+            return {url: self.poll(url) for url in urls}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls)), thread_name_prefix="tracker") as executor:
+            return dict(zip(urls, executor.map(self.poll, urls)))
@@ -0,0 +1,229 @@
+import heapq
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+def time_of_day_profile(bands, timezone):
+    """
+    Build an interval function from hour bands.
+
+    Args:
+        bands: List of (start_hour, end_hour, interval_seconds) tuples covering the day
+        timezone: pytz timezone the hours are expressed in
+
+    Returns:
+        Zero-argument callable returning the interval for the current hour
+    """
+    def interval():
+        hour = datetime.now(timezone).hour
+        for start, end, seconds in bands:
+            if start <= hour < end:
+                return seconds
+        return bands[-1][2]
+    return interval
+
+
+class ScheduledTarget:
+    """A recurring check with its own interval, jitter and lane."""
+
+    def __init__(self, key, func, args=(), kwargs=None, interval=300, jitter=0.1, lane=None, on_result=None):
+        self.key = key
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.interval = interval
+        self.jitter = jitter
+        self.lane = lane if lane is not None else key
+        self.on_result = on_result
+        self.next_due = 0.0
+        self.running = False
+        self.started = None
+        self.timed_out = False
+        self.runs = 0
+
+    def current_interval(self):
+        """Interval for the next run, from a fixed value or a time-of-day profile."""
+        return self.interval() if callable(self.interval) else self.interval
+
+    def schedule_next(self, now):
+        """Set the next due time, randomised by +/- jitter to avoid a fixed cadence."""
+        interval = self.current_interval()
+        self.next_due = now + interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+        return self.next_due
+
+
+class TargetScheduler:
+    """
+    Runs recurring checks from a min-heap of next-due times.
+
+    Every target is rescheduled independently when its own check finishes, so a
+    slow site delays only itself. Targets sharing a lane (e.g. two models on the
+    same retailer) never run at the same time, and at most max_workers checks
+    run at once; due targets wait in heap order until capacity frees up.
+    """
+
+    def __init__(self, max_workers=4, check_timeout=120):
+        self.max_workers = max_workers
+        self.check_timeout = check_timeout
+        self.targets = {}
+        self._heap = []  # (next_due, sequence, target)
+        self._sequence = 0
+        self._busy_lanes = set()
+        self._running = 0
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scheduler")
+
+    def add(self, key, func, *args, interval=300, jitter=0.1, lane=None, on_result=None, delay=0.0, **kwargs):
+        """
+        Register a recurring target.
+
+        Args:
+            key: Unique identifier, reported back with each result
+            func: Callable performing the check
+            *args, **kwargs: Arguments passed to func
+            interval: Seconds between runs, or a callable returning them (see time_of_day_profile)
+            jitter: Fraction the interval is randomised by in each direction
+            lane: Targets in the same lane run one at a time (defaults to the key)
+            on_result: Optional callback receiving each result dict
+            delay: Seconds before the first run
+        """
+        target = ScheduledTarget(key, func, args, kwargs, interval, jitter, lane, on_result)
+        target.next_due = time.monotonic() + delay
+        with self._condition:
+            self.targets[key] = target
+            self._push(target)
+            self._condition.notify()
+        return target
+
+    def remove(self, key):
+        """Unregister a target. A check already running finishes but is not rescheduled."""
+        with self._condition:
+            target = self.targets.pop(key, None)
+            self._condition.notify()
+        return target
+
+    def _push(self, target):
+        """Add a target to the heap. Caller holds the condition."""
+        heapq.heappush(self._heap, (target.next_due, self._sequence, target))
+        self._sequence += 1
+
+    def _is_current(self, entry):
+        """Whether a heap entry still belongs to a registered, idle target at its current due time."""
+        due, _, target = entry
+        return self.targets.get(target.key) is target and not target.running and target.next_due == due
+
+    def stop(self):
+        """Stop dispatching new checks; run() returns shortly after."""
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+
+    def run(self):
+        """Dispatch due targets until stop() is called."""
+        self._stop_event.clear()
+        with self._condition:
+            while not self._stop_event.is_set():
+                now = time.monotonic()
+                self._report_overruns(now)
+                deferred = []
+
+                while self._heap and self._heap[0][0] <= now and self._running < self.max_workers:
+                    entry = heapq.heappop(self._heap)
+                    target = entry[2]
+                    if not self._is_current(entry):
+                        continue
+                    if target.lane in self._busy_lanes:
+                        deferred.append(entry)
+                        continue
+                    self._dispatch(target, now)
+
+                # Lane-blocked targets keep their place and are retried when the lane frees up
+                for entry in deferred:
+                    heapq.heappush(self._heap, entry)
+
+                wait = 1.0
+                if self._running < self.max_workers:
+                    for entry in self._heap:
+                        if self._is_current(entry) and entry[2].lane not in self._busy_lanes:
+                            wait = min(wait, entry[0] - now)
+                for target in self.targets.values():
+                    if target.running and not target.timed_out:
+                        wait = min(wait, target.started + self.check_timeout - now)
+                self._condition.wait(timeout=max(0.05, wait))
+
+    def _dispatch(self, target, now):
+        """Start a check on the worker pool. Caller holds the condition."""
+        target.running = True
+        target.timed_out = False
+        target.started = now
+        self._busy_lanes.add(target.lane)
+        self._running += 1
+        self._executor.submit(self._execute, target)
+
+    def _execute(self, target):
+        started = time.monotonic()
+        result, error = None, None
+        try:
+            result = target.func(*target.args, **target.kwargs)
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+        elapsed = time.monotonic() - started
+
+        with self._condition:
+            target.running = False
+            target.runs += 1
+            timed_out = target.timed_out
+            self._busy_lanes.discard(target.lane)
+            self._running -= 1
+            if self.targets.get(target.key) is target:
+                target.schedule_next(time.monotonic())
+                self._push(target)
+            self._condition.notify()
+
+        # A check already reported as timed out has its late result discarded
+        if not timed_out:
+            self._report(target, "ok" if error is None else "error", result, error, elapsed)
+
+    def _report_overruns(self, now):
+        """Report running checks past their deadline as timed out. Caller holds the condition."""
+        for target in self.targets.values():
+            if target.running and not target.timed_out and now - target.started >= self.check_timeout:
+                target.timed_out = True
+                threading.Thread(
+                    target=self._report,
+                    args=(target, "timeout", None, f"Check exceeded {self.check_timeout}s", now - target.started),
+                    daemon=True
+                ).start()
+
+    def _report(self, target, status, result, error, elapsed):
+        if target.on_result is None:
+            if error:
+                print(f"Error in scheduled check {target.key} ({status}): {error}")
+            return
+        try:
+            target.on_result({
+                "key": target.key,
+                "lane": target.lane,
+                "status": status,
+                "result": result,
+                "error": error,
+                "elapsed": elapsed
+            })
+        except Exception as e:
+            print(f"Error handling result of {target.key}: {e}")
+
+    def upcoming(self, limit=5):
+        """Next due targets as (key, seconds_until_due), soonest first."""
+        now = time.monotonic()
+        with self._condition:
+            entries = heapq.nsmallest(limit, [entry for entry in self._heap if self._is_current(entry)])
+        return [(target.key, max(0.0, due - now)) for due, _, target in entries]
+
+    def shutdown(self):
+        """Stop scheduling and release worker threads."""
+        self.stop()
+        self._executor.shutdown(wait=False, cancel_futures=True)
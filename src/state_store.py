@@ -0,0 +1,211 @@
+import os
+import re
+import time
+import sqlite3
+import threading
+
+# Transition kinds that are worth alerting on
+IN_STOCK = "IN_STOCK"
+OUT_OF_STOCK = "OUT_OF_STOCK"
+PRICE_DROP = "PRICE_DROP"
+STATUS_CHANGE = "STATUS_CHANGE"
+
+
+def product_key(product):
+    """Stable identity of a product within a retailer: SKU, else URL, else name."""
+    return str(product.get("sku") or product.get("url") or product.get("name") or "")
+
+
+def parse_price(price):
+    """Parse a price such as '$1,199.99' into a float, or None."""
+    if price is None:
+        return None
+    if isinstance(price, (int, float)):
+        return float(price)
+    match = re.search(r"\d[\d,]*(?:\.\d+)?", str(price))
+    return float(match.group(0).replace(",", "")) if match else None
+
+
+class StockStateStore:
+    """
+    Persistent record of the last known state of every tracked product.
+
+    Backed by SQLite in WAL mode and mirrored in an in-memory dict, so each
+    lookup is a single dict access even with thousands of tracked SKUs. Only
+    changes produce transitions: a product coming into stock, going out of
+    stock, dropping in price, or changing status (e.g. SEE_DETAILS to AVAILABLE).
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("STATE_DB_PATH", os.path.join("data", "gpu_monitor_state.db"))
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS product_state (
+                retailer TEXT NOT NULL,
+                product_key TEXT NOT NULL,
+                scope TEXT,
+                name TEXT,
+                url TEXT,
+                status TEXT,
+                price REAL,
+                available INTEGER NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (retailer, product_key)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS transitions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                retailer TEXT NOT NULL,
+                product_key TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                old_status TEXT,
+                new_status TEXT,
+                old_price REAL,
+                new_price REAL,
+                at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS transitions_product ON transitions (retailer, product_key, at);
+        """)
+        self._db.commit()
+
+        self._states = {}
+        # (retailer, scope) -> keys currently in stock, so missing products are found without a scan
+        self._in_stock = {}
+        for row in self._db.execute(
+            "SELECT retailer, product_key, scope, name, url, status, price, available, updated_at FROM product_state"
+        ):
+            self._states[(row[0], row[1])] = {
+                "scope": row[2], "name": row[3], "url": row[4], "status": row[5],
+                "price": row[6], "available": bool(row[7]), "updated_at": row[8]
+            }
+            if row[7]:
+                self._in_stock.setdefault((row[0], row[2]), set()).add(row[1])
+
+    def get(self, retailer, key):
+        """Last known state of a product, or None."""
+        with self._lock:
+            state = self._states.get((retailer, key))
+            return dict(state) if state else None
+
+    def record_check(self, retailer, scope, products):
+        """
+        Record the in-stock products found by one check and return what changed.
+
+        Products previously in stock for the same retailer and scope (e.g. the
+        same search query) that are missing from this check are marked out of stock.
+
+        Args:
+            retailer: Retailer name
+            scope: What was checked, such as the GPU model searched for
+            products: Product dicts currently available
+
+        Returns:
+            List of transition dicts with 'kind', 'retailer', 'name', 'url',
+            'old_status', 'new_status', 'old_price' and 'new_price'
+        """
+        now = time.time()
+        transitions = []
+        rows = []
+        seen = set()
+
+        with self._lock:
+            for product in products:
+                key = product_key(product)
+                if not key:
+                    continue
+                seen.add(key)
+                previous = self._states.get((retailer, key))
+                state = {
+                    "scope": scope,
+                    "name": product.get("name"),
+                    "url": product.get("url"),
+                    "status": product.get("status") or "AVAILABLE",
+                    "price": parse_price(product.get("price")),
+                    "available": True,
+                    "updated_at": now
+                }
+
+                kind = None
+                if previous is None or not previous["available"]:
+                    kind = IN_STOCK
+                elif previous["status"] != state["status"]:
+                    kind = STATUS_CHANGE
+                elif state["price"] is not None and previous["price"] is not None and state["price"] < previous["price"]:
+                    kind = PRICE_DROP
+
+                if kind:
+                    transitions.append(self._transition(kind, retailer, key, previous, state, now))
+                if previous is not None and previous["available"] and previous["scope"] != scope:
+                    self._in_stock.get((retailer, previous["scope"]), set()).discard(key)
+                self._states[(retailer, key)] = state
+                rows.append((retailer, key, state))
+
+            in_stock = self._in_stock.setdefault((retailer, scope), set())
+            for key in in_stock - seen:
+                previous = self._states[(retailer, key)]
+                state = dict(previous, available=False, status="OUT_OF_STOCK", updated_at=now)
+                transitions.append(self._transition(OUT_OF_STOCK, retailer, key, previous, state, now))
+                self._states[(retailer, key)] = state
+                rows.append((retailer, key, state))
+            self._in_stock[(retailer, scope)] = seen
+
+            self._persist(rows, transitions)
+
+        return transitions
+
+    def _transition(self, kind, retailer, key, previous, state, at):
+        return {
+            "kind": kind,
+            "retailer": retailer,
+            "product_key": key,
+            "name": state["name"],
+            "url": state["url"],
+            "old_status": previous["status"] if previous else None,
+            "new_status": state["status"],
+            "old_price": previous["price"] if previous else None,
+            "new_price": state["price"],
+            "at": at
+        }
+
+    def _persist(self, rows, transitions):
+        """Write changed states and transitions in one transaction. Caller holds the lock."""
+        if not rows:
+            return
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO product_state "
+                "(retailer, product_key, scope, name, url, status, price, available, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(retailer, key, s["scope"], s["name"], s["url"], s["status"], s["price"],
+                  int(s["available"]), s["updated_at"]) for retailer, key, s in rows]
+            )
+            self._db.executemany(
+                "INSERT INTO transitions "
+                "(retailer, product_key, kind, old_status, new_status, old_price, new_price, at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(t["retailer"], t["product_key"], t["kind"], t["old_status"], t["new_status"],
+                  t["old_price"], t["new_price"], t["at"]) for t in transitions]
+            )
+
+    def history(self, retailer, key, limit=50):
+        """Most recent transitions of a product, newest first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT kind, old_status, new_status, old_price, new_price, at FROM transitions "
+                "WHERE retailer = ? AND product_key = ? ORDER BY at DESC LIMIT ?",
+                (retailer, key, limit)
+            ).fetchall()
+        return [
+            {"kind": r[0], "old_status": r[1], "new_status": r[2], "old_price": r[3], "new_price": r[4], "at": r[5]}
+            for r in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
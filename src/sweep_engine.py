@@ -0,0 +1,188 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Empty
+
+
+class SweepEngine:
+    """
+    Runs retailer/model checks concurrently on a bounded worker pool.
+
+    Checks are grouped into lanes (one lane per retailer). Checks in the same
+    lane run one after another so a site is never hit by two checks at once,
+    while different lanes run in parallel. Results are yielded as soon as each
+    check finishes instead of after the slowest site.
+
+    A check abandoned by a timed-out or cancelled sweep keeps holding its
+    lane until the call returns, so a later sweep never drives the same
+    retailer's browser concurrently.
+    """
+
+    def __init__(self, max_workers=4, check_timeout=120, sweep_timeout=900):
+        self.max_workers = max_workers
+        self.check_timeout = check_timeout
+        self.sweep_timeout = sweep_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sweep")
+        self._cancel_event = threading.Event()
+        # lane -> lock held while a check of that lane runs, across sweeps
+        self._lane_locks = {}
+        self._lane_locks_guard = threading.Lock()
+
+    @staticmethod
+    def make_task(lane, key, func, *args, **kwargs):
+        """
+        Build a task description for run().
+
+        Args:
+            lane: Name of the lane the task belongs to (usually the retailer name)
+            key: Identifier reported back with the task's result
+            func: Callable performing the check
+            *args, **kwargs: Arguments passed to func
+
+        Returns:
+            Dict describing the task
+        """
+        return {"lane": lane, "key": key, "func": func, "args": args, "kwargs": kwargs}
+
+    def cancel(self):
+        """Cancel the sweep in progress, or the next one if none is running. Pending checks are skipped."""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def run(self, tasks, on_result=None):
+        """
+        Run tasks concurrently and yield their results as they finish.
+
+        Checks exceeding the per-check deadline are reported as timed out and
+        their late results are discarded. When the sweep deadline passes or the
+        sweep is cancelled, running checks are reported as timed out/cancelled
+        and pending ones as skipped. Running checks cannot be interrupted; the
+        lane only advances once the underlying call has actually returned.
+
+        Args:
+            tasks: Iterable of task dicts created with make_task()
+            on_result: Optional callback invoked with each result dict
+
+        Yields:
+            Dict with 'key', 'lane', 'status' ('ok', 'error', 'timeout',
+            'cancelled' or 'skipped'), 'result', 'error' and 'elapsed'
+        """
+        # This sweep's own token, so checks it abandons are skipped even if another sweep starts
+        run_cancelled = threading.Event()
+        events = Queue()
+        lanes = OrderedDict()
+        for task in tasks:
+            lanes.setdefault(task["lane"], deque()).append(task)
+
+        sweep_deadline = time.monotonic() + self.sweep_timeout
+        running = {}  # token -> {"task", "started"}
+        abandoned = set()
+        next_token = 0
+
+        def submit(task):
+            nonlocal next_token
+            token = next_token
+            next_token += 1
+            running[token] = {"task": task, "started": None}
+            self._executor.submit(self._execute, token, task, events, run_cancelled)
+
+        def report(task, status, result=None, error=None, elapsed=0.0):
+            outcome = {
+                "key": task["key"],
+                "lane": task["lane"],
+                "status": status,
+                "result": result,
+                "error": error,
+                "elapsed": elapsed,
+            }
+            if on_result:
+                on_result(outcome)
+            return outcome
+
+        for lane_tasks in lanes.values():
+            submit(lane_tasks.popleft())
+
+        def busy():
+            # Abandoned checks only matter while their lane still has work queued behind them
+            return any(token not in abandoned or lanes[entry["task"]["lane"]]
+                       for token, entry in running.items())
+
+        while busy():
+            now = time.monotonic()
+
+            if self.cancelled or now >= sweep_deadline:
+                status = "cancelled" if self.cancelled else "timeout"
+                run_cancelled.set()
+                self._cancel_event.clear()
+                for token, entry in running.items():
+                    if token not in abandoned:
+                        elapsed = now - entry["started"] if entry["started"] else 0.0
+                        yield report(entry["task"], status, error=f"Sweep {status}", elapsed=elapsed)
+                for lane_tasks in lanes.values():
+                    while lane_tasks:
+                        yield report(lane_tasks.popleft(), "skipped", error=f"Sweep {status}")
+                return
+
+            # Report checks that have overrun their own deadline
+            for token, entry in running.items():
+                started = entry["started"]
+                if token not in abandoned and started and now - started >= self.check_timeout:
+                    abandoned.add(token)
+                    yield report(entry["task"], "timeout",
+                                 error=f"Check exceeded {self.check_timeout}s", elapsed=now - started)
+
+            wait = sweep_deadline - now
+            for token, entry in running.items():
+                if token not in abandoned and entry["started"]:
+                    wait = min(wait, entry["started"] + self.check_timeout - now)
+
+            try:
+                kind, token, payload = events.get(timeout=max(0.05, min(wait, 1.0)))
+            except Empty:
+                continue
+
+            if kind == "started":
+                running[token]["started"] = payload
+                continue
+
+            entry = running.pop(token)
+            task = entry["task"]
+            if token in abandoned:
+                abandoned.discard(token)
+            else:
+                result, error, elapsed = payload
+                if error is None:
+                    yield report(task, "ok", result=result, elapsed=elapsed)
+                else:
+                    yield report(task, "error", error=error, elapsed=elapsed)
+
+            lane_tasks = lanes[task["lane"]]
+            if lane_tasks and not self.cancelled:
+                submit(lane_tasks.popleft())
+
+    def _lane_lock(self, lane):
+        with self._lane_locks_guard:
+            return self._lane_locks.setdefault(lane, threading.Lock())
+
+    def _execute(self, token, task, events, run_cancelled):
+        """Run a single task on a worker thread once its lane is free and post its outcome."""
+        with self._lane_lock(task["lane"]):
+            started = time.monotonic()
+            events.put(("started", token, started))
+            if run_cancelled.is_set() or self.cancelled:
+                events.put(("done", token, (None, "Sweep cancelled", 0.0)))
+                return
+            try:
+                result = task["func"](*task["args"], **task["kwargs"])
+                events.put(("done", token, (result, None, time.monotonic() - started)))
+            except Exception as e:
+                events.put(("done", token, (None, str(e) or e.__class__.__name__, time.monotonic() - started)))
+
+    def shutdown(self):
+        """Cancel any sweep in progress and release worker threads."""
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
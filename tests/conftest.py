@@ -0,0 +1,129 @@
+"""
+Fake PRAW client and fixtures for the Reddit monitor tests.
+
+Run from the repository root with `python -m pytest`.
+"""
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.retailers.reddit_monitor import RedditMonitor
+from src.retailers.reddit_state import RedditStateStore
+
+
+class FakeReddit:
+    """
+    In-memory stand-in for praw.Reddit covering what RedditMonitor uses.
+
+    get() serves "r/a+b/new" and "r/a+b/comments" listings newest first with
+    Reddit's `before` semantics; like Reddit, a listing only reaches back
+    `window` items and an anchor outside it yields an empty page. info() and
+    subreddit().hot()/search() cover the remaining calls. Every get() is
+    recorded in `requests`.
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self.posts = []
+        self.comments = []
+        self.removed = set()
+        self.requests = []
+        # Strictly increasing creation times, starting an hour ago
+        self._clock = time.time() - 3600
+
+    def _tick(self):
+        self._clock += 1
+        return self._clock
+
+    def add_post(self, subreddit, title, stickied=False):
+        number = len(self.posts) + 1
+        post = SimpleNamespace(
+            id=f"p{number}", fullname=f"t3_p{number}", title=title, subreddit=subreddit,
+            created_utc=self._tick(), permalink=f"/r/{subreddit}/comments/p{number}/", is_self=True, url="",
+            author=SimpleNamespace(name="poster"), score=1, selftext="", edited=False,
+            removed_by_category=None, stickied=stickied
+        )
+        self.posts.append(post)
+        return post
+
+    def add_comment(self, post, body):
+        number = len(self.comments) + 1
+        comment = SimpleNamespace(
+            fullname=f"t1_c{number}", link_id=post.fullname, body=body, subreddit=post.subreddit,
+            created_utc=self._tick(), permalink=f"{post.permalink}c{number}/",
+            author=SimpleNamespace(name="commenter"), score=1
+        )
+        self.comments.append(comment)
+        return comment
+
+    def remove(self, item):
+        self.removed.add(item.fullname)
+        if hasattr(item, "removed_by_category"):
+            item.removed_by_category = "moderator"
+        else:
+            item.body = "[removed]"
+
+    def _listing(self, items, subreddits):
+        listed = [item for item in items if item.subreddit in subreddits and item.fullname not in self.removed]
+        return sorted(listed, key=lambda item: -item.created_utc)[:self.window]
+
+    def get(self, path, params):
+        self.requests.append((path, dict(params)))
+        _, names, kind = path.split("/")
+        items = self._listing(self.comments if kind == "comments" else self.posts, names.split("+"))
+        limit, before = params["limit"], params.get("before")
+        if before is None:
+            return items[:limit]
+        fullnames = [item.fullname for item in items]
+        if before not in fullnames:
+            return []
+        return items[:fullnames.index(before)][-limit:]
+
+    def info(self, fullnames):
+        return iter([item for item in self.posts + self.comments if item.fullname in fullnames])
+
+    def subreddit(self, name):
+        subreddits = name.split("+")
+        return SimpleNamespace(
+            hot=lambda limit: self._listing(self.posts, subreddits)[:limit],
+            search=lambda query, **kwargs: []
+        )
+
+
+class FakeAgent:
+    """AI agent that calls every post relevant."""
+
+    def process_text(self, text):
+        return "yes"
+
+    def process_input(self, prompt, data):
+        return {"text": f"analysis of {data['text'].splitlines()[0]}"}
+
+
+@pytest.fixture(autouse=True)
+def reddit_env(monkeypatch):
+    for name in ("REDDIT_MEGATHREADS", "REDDIT_PAGE_LIMIT", "REDDIT_MAX_PAGES", "REDDIT_MAX_POST_AGE_HOURS"):
+        monkeypatch.delenv(name, raising=False)
+
+
+@pytest.fixture
+def fake_reddit():
+    return FakeReddit()
+
+
+@pytest.fixture
+def make_monitor(tmp_path):
+    """Build RedditMonitors on a fake client, sharing one state file so restarts can be simulated."""
+    monitors = []
+
+    def make(reddit, page_limit=100, max_seen=5000):
+        monitor = RedditMonitor(FakeAgent(), reddit=reddit,
+                                state=RedditStateStore(str(tmp_path / "reddit_state.db"), max_seen=max_seen))
+        monitor.page_limit = page_limit
+        monitors.append(monitor)
+        return monitor
+
+    yield make
+    for monitor in monitors:
+        monitor.close()
@@ -0,0 +1,103 @@
+import time
+
+import pytest
+
+from src.availability_snapshot import default_max_age
+from src.chatbot.gpu_sourcing_chatbot import GPUSourcingChatbot
+
+HOUR = 3600
+
+
+class FakeSource:
+    """Aggregator or retailer returning fixed products, or failing every check."""
+
+    def __init__(self, products=(), fail=False):
+        self.products = list(products)
+        self.fail = fail
+        self.calls = 0
+        self.search_errors = {}
+
+    def search_products(self, query=None):
+        self.calls += 1
+        if self.fail:
+            self.search_errors[query] = "blocked"
+            return []
+        self.search_errors.pop(query, None)
+        return list(self.products)
+
+
+@pytest.fixture
+def chatbot(tmp_path, monkeypatch):
+    monkeypatch.setenv("AVAILABILITY_SNAPSHOT_PATH", str(tmp_path / "snapshot.db"))
+    monkeypatch.setenv("AI_BATCH_WINDOW_MS", "0")
+    monkeypatch.delenv("AVAILABILITY_MAX_AGE", raising=False)
+    monkeypatch.setenv("EXTENDED_CHECK_INTERVAL", str(HOUR))
+    bot = GPUSourcingChatbot()
+    bot._aggregator = FakeSource([{"name": "RTX 5090 FE", "price": "$1,999"}])
+    bot._retailers = {"bestbuy": FakeSource(), "newegg": FakeSource()}
+    yield bot
+    bot.availability_snapshot.close()
+
+
+def ask(bot):
+    """Answer an availability question and wait for any refresh it started."""
+    response = bot._check_current_availability()
+    with bot._refresh_lock:
+        return response
+
+
+def record(bot, source, age):
+    bot.availability_snapshot.record(source, "tracker" if source == "nowinstock" else "RTX 5090", [],
+                                     checked_at=time.time() - age)
+
+
+def test_default_max_age_exceeds_the_slowest_check_interval(monkeypatch):
+    for name, value in (("INTENSIVE_CHECK_INTERVAL", "60"), ("NORMAL_CHECK_INTERVAL", "300"),
+                        ("EXTENDED_CHECK_INTERVAL", "3600")):
+        monkeypatch.setenv(name, value)
+    assert default_max_age() == 2 * HOUR
+    monkeypatch.setenv("CHECK_INTERVAL_BESTBUY", "9000")
+    assert default_max_age() == 18000
+
+
+def test_healthy_monitor_snapshot_is_not_refreshed(chatbot):
+    # Overnight the monitor checks hourly; data from its last check is still current
+    for source in ("nowinstock", "bestbuy", "newegg"):
+        record(chatbot, source, 55 * 60)
+    response = ask(chatbot)
+    assert "refreshing" not in response
+    assert "Bestbuy 55 minutes ago" in response
+    assert chatbot._aggregator.calls == 0
+    assert [retailer.calls for retailer in chatbot._retailers.values()] == [0, 0]
+
+
+def test_only_stale_sources_are_refreshed(chatbot):
+    record(chatbot, "nowinstock", 60)
+    record(chatbot, "bestbuy", 3 * HOUR)
+    record(chatbot, "newegg", 60)
+    response = ask(chatbot)
+    assert "refreshing Bestbuy in the background" in response
+    assert chatbot._aggregator.calls == 0
+    assert chatbot._retailers["bestbuy"].calls == 2
+    assert chatbot._retailers["newegg"].calls == 0
+    assert "refreshing" not in ask(chatbot)
+
+
+def test_failing_source_is_not_retried_on_every_question(chatbot):
+    chatbot._retailers["bestbuy"].fail = True
+    record(chatbot, "nowinstock", 60)
+    record(chatbot, "bestbuy", 3 * HOUR)
+    ask(chatbot)
+    assert chatbot._retailers["bestbuy"].calls == 2
+
+    response = ask(chatbot)
+    assert "Bestbuy 3 hours ago" in response
+    assert "refreshing" not in response
+    assert chatbot._retailers["bestbuy"].calls == 2
+
+
+def test_first_refresh_checks_retailers_even_when_nowinstock_has_stock(chatbot):
+    assert "checking the retailers now" in ask(chatbot)
+    assert chatbot._aggregator.calls == 1
+    assert [retailer.calls for retailer in chatbot._retailers.values()] == [2, 2]
+    assert set(chatbot.availability_snapshot.snapshot()) == {"nowinstock", "bestbuy", "newegg"}
@@ -0,0 +1,148 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.retailers import base_retailer
+from src.retailers.http_fetcher import HttpFetcher
+from src.retailers.newegg_retailer import NeweggRetailer
+from src.retailers.readiness import RESULTS
+
+RECAPTCHA_SCRIPT = '<script src="https://www.google.com/recaptcha/api.js" async defer></script>'
+
+PAGES = {
+    "/search": (200, f"""<html><head><title>rtx 5090 | Newegg</title>{RECAPTCHA_SCRIPT}</head><body>
+        <div class="item-cell"><a class="item-title" href="/p/1">MSI GeForce RTX 5090 Suprim</a></div>
+        <div class="item-cell"><a class="item-title" href="/p/2">ASUS ROG Astral RTX 5090</a></div>
+        <form id="newsletter"><div class="g-recaptcha" data-sitekey="key"></div></form>
+    </body></html>"""),
+    "/app-shell": (200, '<html><body><div id="root"></div><script src="/bundle.js"></script></body></html>'),
+    "/blocked": (403, "<html><body>Access denied</body></html>"),
+    "/challenge": (200, "<html><head><title>Just a moment</title></head><body>Verify you are human</body></html>"),
+    "/captcha-frame": (200, "<html><body><iframe src='https://geo.captcha-delivery.com/c/1'></iframe></body></html>")
+}
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """Local server for the fixture pages; /tracker answers conditional requests with ETags."""
+
+    def __init__(self):
+        self.requests = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                self.requests.append((handler.path, dict(handler.headers)))
+                if handler.path == "/tracker":
+                    if handler.headers.get("If-None-Match") == '"v1"':
+                        handler.send_response(304)
+                        handler.send_header("ETag", '"v1"')
+                        handler.end_headers()
+                        return
+                    status, body = 200, '<html><body><table id="tracker-table"><tr><td>RTX 5090</td></tr></table></body></html>'
+                else:
+                    status, body = PAGES[handler.path]
+                body = body.encode()
+                handler.send_response(status)
+                handler.send_header("Content-Type", "text/html; charset=utf-8")
+                handler.send_header("Content-Length", str(len(body)))
+                if handler.path == "/tracker":
+                    handler.send_header("ETag", '"v1"')
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, *args):
+                pass
+
+        super().__init__(("127.0.0.1", 0), Handler)
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+
+@pytest.fixture
+def server():
+    fixture_server = FixtureServer()
+    threading.Thread(target=fixture_server.serve_forever, daemon=True).start()
+    yield fixture_server
+    fixture_server.shutdown()
+    fixture_server.server_close()
+
+
+@pytest.fixture
+def fetcher():
+    http_fetcher = HttpFetcher(timeout=5)
+    yield http_fetcher
+    http_fetcher.close()
+
+
+def test_server_rendered_page_is_parsed(server, fetcher):
+    page = fetcher.fetch(server.url("/search"), ".item-cell")
+    assert (page["source"], page["status_code"], page["not_modified"]) == ("http", 200, False)
+    titles = [link.text_content() for link in page["tree"].cssselect(".item-cell .item-title")]
+    assert titles == ["MSI GeForce RTX 5090 Suprim", "ASUS ROG Astral RTX 5090"]
+
+
+def test_unchanged_page_costs_a_304(server, fetcher):
+    first = fetcher.fetch(server.url("/tracker"), "#tracker-table", conditional=True)
+    assert first["status_code"] == 200 and first["tree"] is not None
+
+    second = fetcher.fetch(server.url("/tracker"), "#tracker-table", conditional=True)
+    assert (second["status_code"], second["not_modified"], second["tree"]) == (304, True, None)
+    assert server.requests[-1][1].get("If-None-Match") == '"v1"'
+
+    # Unconditional fetches never send validators
+    assert fetcher.fetch(server.url("/tracker"), "#tracker-table")["status_code"] == 200
+    assert "If-None-Match" not in server.requests[-1][1]
+
+
+@pytest.mark.parametrize("path", ["/blocked", "/app-shell", "/challenge"])
+def test_unusable_pages_are_refused(server, fetcher, path):
+    assert fetcher.fetch(server.url(path), ".item-cell") is None
+
+
+def test_recaptcha_script_is_not_a_challenge(server, fetcher):
+    page = fetcher.fetch(server.url("/search"))
+    assert page is not None and page["status_code"] == 200
+    assert not fetcher._looks_like_challenge(page["tree"])
+
+    assert fetcher.fetch(server.url("/challenge")) is None
+    assert fetcher.fetch(server.url("/captcha-frame")) is None
+
+
+class FakeDriver:
+    """Browser stand-in serving a fixed page source."""
+
+    page_source = '<html><body><div class="item-cell">Rendered in Chrome</div></body></html>'
+
+    def get_screenshot_as_png(self):
+        return b"png"
+
+    def get_log(self, name):
+        return []
+
+
+@pytest.fixture
+def retailer(monkeypatch, fetcher):
+    newegg = NeweggRetailer(ai_agent=None)
+    opened = []
+    monkeypatch.setattr(base_retailer, "get_http_fetcher", lambda: fetcher)
+    monkeypatch.setattr(NeweggRetailer, "driver", property(lambda self: FakeDriver()))
+    monkeypatch.setattr(newegg, "open_page", lambda url, profile="probe": opened.append(url))
+    monkeypatch.setattr(newegg, "wait_for_page", lambda ready_selector, timeout=20: RESULTS)
+    newegg.opened = opened
+    return newegg
+
+
+def test_fetch_page_uses_http_when_usable(server, retailer):
+    page = retailer.fetch_page(server.url("/search"), ".item-cell")
+    assert page["source"] == "http" and page["outcome"] == RESULTS
+    assert retailer.opened == []
+
+
+@pytest.mark.parametrize("path", ["/blocked", "/app-shell"])
+def test_fetch_page_falls_back_to_the_browser(server, retailer, path):
+    page = retailer.fetch_page(server.url(path), ".item-cell")
+    assert page["source"] == "browser"
+    assert retailer.opened == [server.url(path)]
+    assert page["tree"].cssselect(".item-cell")[0].text_content() == "Rendered in Chrome"
+    assert page["screenshot"] == b"png"
@@ -0,0 +1,46 @@
+import io
+
+from PIL import Image
+
+from src.ai_agent.inference_cache import InferenceCache
+from src.ai_agent.visual_language_model import VisualLanguageModel
+
+PROMPT = "Is this RTX 5080 or RTX 5090 GPU available for purchase?"
+
+
+def screenshot(color):
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_products_without_screenshots_do_not_share_a_result(tmp_path):
+    cache = InferenceCache(disk_path=str(tmp_path / "inference.db"))
+    assert cache.get_or_compute(None, PROMPT, lambda: "in stock: product A") == "in stock: product A"
+    assert cache.get_or_compute(None, PROMPT, lambda: "sold out: product B") == "sold out: product B"
+    assert cache.stats()["bypassed"] == 2
+    assert cache.stats()["entries"] == 0
+    cache.close()
+
+    # Nothing was persisted for a restart to pick up either
+    restarted = InferenceCache(disk_path=str(tmp_path / "inference.db"))
+    assert restarted.get_or_compute(None, PROMPT, lambda: "sold out: product C") == "sold out: product C"
+    restarted.close()
+
+
+def test_same_screenshot_is_answered_from_the_cache():
+    cache = InferenceCache()
+    image = screenshot("white")
+    assert cache.get_or_compute(image, PROMPT, lambda: "in stock") == "in stock"
+    assert cache.get_or_compute(image, PROMPT, lambda: "recomputed") == "in stock"
+    assert cache.stats()["hits"] == 1
+
+
+def test_batched_requests_without_screenshots_are_computed(monkeypatch):
+    model = VisualLanguageModel(inference_cache=InferenceCache())
+    answers = iter(["in stock: product A", "sold out: product B"])
+    monkeypatch.setattr(model, "_multimodal_inference", lambda image, text_input: next(answers))
+
+    responses = model.multimodal_inference_batch([(None, PROMPT), (None, PROMPT)])
+    assert [response for response, _ in responses] == ["in stock: product A", "sold out: product B"]
+    assert model.inference_cache.stats()["entries"] == 0
@@ -0,0 +1,184 @@
+import json
+import socketserver
+import threading
+import time
+from email import message_from_bytes
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.notification import NotificationManager, SMTPBackend, WebhookBackend
+
+
+class WebhookStub(ThreadingHTTPServer):
+    """Local webhook receiver recording JSON payloads; answers 500 to the first `failures` requests."""
+
+    def __init__(self):
+        self.payloads = []
+        self.attempts = []
+        self.failures = 0
+        self.delay = 0.0
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(handler):
+                body = handler.rfile.read(int(handler.headers["Content-Length"]))
+                self.attempts.append(time.monotonic())
+                time.sleep(self.delay)
+                if self.failures:
+                    self.failures -= 1
+                    handler.send_response(500)
+                else:
+                    self.payloads.append(json.loads(body))
+                    handler.send_response(200)
+                handler.send_header("Content-Length", "0")
+                handler.end_headers()
+
+            def log_message(handler, *args):
+                pass
+
+        super().__init__(("127.0.0.1", 0), Handler)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/hook"
+
+
+class SMTPStub(socketserver.ThreadingTCPServer):
+    """Minimal local SMTP server recording connections, messages and QUITs (no TLS or auth)."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        self.connections = 0
+        self.messages = []
+        self.quits = 0
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(handler, line):
+                handler.wfile.write(line.encode() + b"\r\n")
+
+            def handle(handler):
+                self.connections += 1
+                handler.reply("220 stub ESMTP")
+                while True:
+                    line = handler.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode().strip().upper()
+                    if command.startswith(("EHLO", "HELO")):
+                        handler.reply("250 stub")
+                    elif command == "DATA":
+                        handler.reply("354 end with .")
+                        data = b""
+                        while True:
+                            chunk = handler.rfile.readline()
+                            if chunk in (b".\r\n", b""):
+                                break
+                            data += chunk
+                        self.messages.append(message_from_bytes(data))
+                        handler.reply("250 queued")
+                    elif command == "QUIT":
+                        self.quits += 1
+                        handler.reply("221 bye")
+                        return
+                    else:
+                        handler.reply("250 ok")
+
+        super().__init__(("127.0.0.1", 0), Handler)
+
+
+def serve(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+@pytest.fixture
+def webhook():
+    server = serve(WebhookStub())
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def smtp():
+    server = serve(SMTPStub())
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def smtp_backend(server):
+    return SMTPBackend("127.0.0.1", port=server.server_address[1], sender="monitor@example.com",
+                       recipients=["me@example.com"], starttls=False, timeout=5)
+
+
+def test_alerts_are_delivered_to_webhook_and_email(webhook, smtp):
+    manager = NotificationManager([WebhookBackend(webhook.url), smtp_backend(smtp)])
+    manager.notify("RTX 5090 in stock at Best Buy")
+    assert manager.flush(timeout=5)
+
+    assert webhook.payloads == [{
+        "title": "GPU Stock Alert",
+        "message": "RTX 5090 in stock at Best Buy",
+        "text": "GPU Stock Alert: RTX 5090 in stock at Best Buy"
+    }]
+    [email] = smtp.messages
+    assert email["Subject"] == "GPU Stock Alert"
+    assert email["To"] == "me@example.com"
+    assert email.get_payload().strip() == "RTX 5090 in stock at Best Buy"
+    assert manager.stats()["webhook"]["sent"] == 1 and manager.stats()["smtp"]["sent"] == 1
+    manager.close()
+
+
+def test_failed_send_is_retried_with_backoff(webhook):
+    webhook.failures = 2
+    manager = NotificationManager([WebhookBackend(webhook.url)], max_retries=3, retry_delay=0.05)
+    manager.notify("RTX 5080 in stock at Newegg")
+    assert manager.flush(timeout=5)
+
+    assert [payload["message"] for payload in webhook.payloads] == ["RTX 5080 in stock at Newegg"]
+    first, second, third = webhook.attempts
+    assert second - first >= 0.05
+    assert third - second >= 0.1
+    stats = manager.stats()["webhook"]
+    assert (stats["sent"], stats["retries"], stats["failed"]) == (1, 2, 0)
+    manager.close()
+
+
+def test_gives_up_after_max_retries(webhook):
+    webhook.failures = 10
+    manager = NotificationManager([WebhookBackend(webhook.url)], max_retries=1, retry_delay=0.01)
+    manager.notify("RTX 5080 in stock at Newegg")
+    assert manager.flush(timeout=5)
+    assert len(webhook.attempts) == 2
+    assert manager.stats()["webhook"]["failed"] == 1
+    manager.close()
+
+
+def test_smtp_connection_is_reused(smtp):
+    manager = NotificationManager([smtp_backend(smtp)])
+    for number in range(3):
+        manager.notify(f"Alert {number}")
+    assert manager.flush(timeout=5)
+
+    assert [email.get_payload().strip() for email in smtp.messages] == ["Alert 0", "Alert 1", "Alert 2"]
+    assert smtp.connections == 1
+    manager.close()
+    assert smtp.quits == 1
+
+
+def test_close_drains_the_queues(webhook, smtp):
+    webhook.delay = 0.05
+    manager = NotificationManager([WebhookBackend(webhook.url), smtp_backend(smtp)])
+    for number in range(5):
+        manager.notify(f"Alert {number}")
+    manager.close(timeout=5)
+
+    assert [payload["message"] for payload in webhook.payloads] == [f"Alert {number}" for number in range(5)]
+    assert len(smtp.messages) == 5
+    # Alerts after close are dropped rather than queued for stopped workers
+    manager.notify("Too late")
+    assert len(webhook.payloads) == 5
@@ -0,0 +1,81 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from src.retailers.base_retailer import BaseRetailer
+from src.retailers.bestbuy_retailer import BestBuyRetailer
+from src.retailers.http_fetcher import parse_html
+from src.retailers.readiness import EMPTY, EMPTY_RESULTS_PATTERNS, matches_empty_text
+
+EMPTY_PAGES = [
+    "No results",
+    "Sorry, no results found.",
+    "Showing 0 results for rtx 5090",
+    "0 items found",
+    "Your search did not match any products.",
+    "We didn't find anything for \"rtx 5090\"",
+    "We couldn’t find any matches for rtx 5090",
+    "No matching products found"
+]
+
+RESULT_PAGES = [
+    "Showing 1-24 of 120 results",
+    "40 results for rtx 5090",
+    "1,000 results",
+    "No results? Try these popular searches instead",
+    "Filters\nBrand\nMSI (10)\nEnjoy no results-based fees on returns",
+    "Sold out: we could not find stock nearby"
+]
+
+
+@pytest.mark.parametrize("text", EMPTY_PAGES)
+def test_empty_results_text_matches(text):
+    assert matches_empty_text("Header\n" + text + "\nFooter")
+
+
+@pytest.mark.parametrize("text", RESULT_PAGES)
+def test_results_text_is_not_empty(text):
+    assert not matches_empty_text("Header\n" + text + "\nFooter")
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is needed to run the in-page patterns")
+def test_patterns_behave_the_same_in_the_browser():
+    # The readiness script compiles the same patterns with JavaScript's RegExp
+    texts = ["Header\n" + text + "\nFooter" for text in EMPTY_PAGES + RESULT_PAGES]
+    script = (
+        "const [patterns, texts] = JSON.parse(process.argv[1]);"
+        "console.log(JSON.stringify(texts.map(text => patterns.some(pattern => new RegExp(pattern, 'im').test(text)))));"
+    )
+    output = subprocess.run(["node", "-e", script, json.dumps([EMPTY_RESULTS_PATTERNS, texts])],
+                            capture_output=True, text=True, check=True).stdout
+    assert json.loads(output) == [True] * len(EMPTY_PAGES) + [False] * len(RESULT_PAGES)
+
+
+def test_every_retailer_has_empty_selectors():
+    from src.retailers.asus_retailer import ASUSRetailer
+    from src.retailers.bhphoto_retailer import BHPhotoRetailer
+    from src.retailers.msi_retailer import MSIRetailer
+    from src.retailers.newegg_retailer import NeweggRetailer
+
+    for retailer in (ASUSRetailer, BestBuyRetailer, BHPhotoRetailer, MSIRetailer, NeweggRetailer):
+        assert retailer.empty_selectors != BaseRetailer.empty_selectors
+
+
+def test_tiles_override_an_early_empty_outcome():
+    retailer = BestBuyRetailer(ai_agent=None)
+    html = """
+        <div class="results-header">Showing 1-1 of 1 results</div>
+        <li class="sku-item">
+            <h4 class="sku-title"><a href="/site/rtx-5090/1.p">NVIDIA GeForce RTX 5090 Founders Edition</a></h4>
+            <div class="priceView-customer-price"><span>$1,999.99</span></div>
+            <button class="add-to-cart-button">See Details</button>
+        </li>
+    """
+    page = {"url": "https://www.bestbuy.com/site/searchpage.jsp?st=5090", "tree": parse_html(html), "outcome": EMPTY}
+    products = retailer.analyze_search_page("Find RTX 5090 products", page, "RTX 5090")
+    assert [product["name"] for product in products] == ["NVIDIA GeForce RTX 5090 Founders Edition"]
+
+    page["tree"] = parse_html("<p>No results</p>")
+    assert retailer.analyze_search_page("Find RTX 5090 products", page, "RTX 5090") == []
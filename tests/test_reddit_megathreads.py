@@ -0,0 +1,66 @@
+from conftest import FakeReddit
+
+
+def bodies(comments):
+    return [comment["body"] for comment in comments]
+
+
+def follow_megathread(reddit, make_monitor, page_limit=100):
+    """A monitor that has detected a drop megathread in r/nvidia."""
+    thread = reddit.add_post("nvidia", "RTX 5090 Launch Megathread", stickied=True)
+    other = reddit.add_post("nvidia", "Driver discussion")
+    monitor = make_monitor(reddit, page_limit=page_limit)
+    monitor.check_for_updates()
+    assert thread.fullname in monitor.state.threads()
+    return monitor, thread, other
+
+
+def test_cursor_advances_between_checks(fake_reddit, make_monitor):
+    monitor, thread, _ = follow_megathread(fake_reddit, make_monitor, page_limit=2)
+    fake_reddit.add_comment(thread, "Best Buy restock is live")
+    assert bodies(monitor.check_megathreads()) == ["Best Buy restock is live"]
+    cursor = monitor.state.cursors()["nvidia/comments"]["fullname"]
+    assert cursor == fake_reddit.comments[-1].fullname
+
+    for number in range(3):
+        fake_reddit.add_comment(thread, f"got one {number}")
+    fake_reddit.requests.clear()
+    # Reported in posting order across pages
+    assert bodies(monitor.check_megathreads()) == [f"got one {number}" for number in range(3)]
+    assert fake_reddit.requests[0] == ("r/nvidia/comments", {"limit": 2, "before": cursor})
+    assert monitor.state.cursors()["nvidia/comments"]["fullname"] == fake_reddit.comments[-1].fullname
+
+    assert monitor.check_megathreads() == []
+
+
+def test_only_stock_chatter_in_followed_threads(fake_reddit, make_monitor):
+    monitor, thread, other = follow_megathread(fake_reddit, make_monitor)
+    fake_reddit.add_comment(thread, "Which PSU should I pair with it?")
+    fake_reddit.add_comment(other, "Newegg shows it in stock")
+    fake_reddit.add_comment(thread, "Newegg shows it in stock")
+
+    matches = monitor.check_megathreads()
+    assert bodies(matches) == ["Newegg shows it in stock"]
+    assert matches[0]["thread"] == "RTX 5090 Launch Megathread"
+    assert "stock_chatter" in matches[0]["categories"]
+
+    followed = monitor.state.threads()[thread.fullname]
+    assert (followed["comments"], followed["matches"]) == (2, 1)
+
+
+def test_cursor_lost_to_listing_window(make_monitor):
+    reddit = FakeReddit(window=20)
+    monitor, thread, other = follow_megathread(reddit, make_monitor, page_limit=10)
+    reddit.add_comment(thread, "first drop is live")
+    assert bodies(monitor.check_megathreads()) == ["first drop is live"]
+
+    # A busy subreddit pushes the cursor comment out of the listing between checks
+    for number in range(25):
+        reddit.add_comment(other, f"off-topic {number}")
+    reddit.add_comment(thread, "second restock, carted")
+    assert bodies(monitor.check_megathreads()) == ["second restock, carted"]
+
+    reddit.add_comment(thread, "sold out again")
+    reddit.requests.clear()
+    assert bodies(monitor.check_megathreads()) == ["sold out again"]
+    assert reddit.requests[0][1].get("before") == reddit.comments[-2].fullname
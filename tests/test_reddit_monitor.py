@@ -0,0 +1,157 @@
+from types import SimpleNamespace
+
+from conftest import FakeReddit
+from src.retailers.reddit_state import RedditStateStore
+
+
+def reported(posts):
+    return [post["title"] for post in posts]
+
+
+def test_pages_forward_from_cursor(fake_reddit, make_monitor):
+    fake_reddit.add_post("nvidia", "RTX 5090 restock tomorrow")
+    monitor = make_monitor(fake_reddit, page_limit=2)
+    assert reported(monitor.check_for_updates()) == ["RTX 5090 restock tomorrow"]
+    cursor = monitor.state.cursors()["nvidia"]["fullname"]
+
+    for number in range(5):
+        fake_reddit.add_post("buildapcsales", f"[GPU] RTX 5080 deal {number}")
+    fake_reddit.requests.clear()
+    titles = reported(monitor.check_for_updates())
+
+    assert sorted(titles) == [f"[GPU] RTX 5080 deal {number}" for number in range(5)]
+    befores = [params.get("before") for path, params in fake_reddit.requests if path.endswith("/new")]
+    # Three pages of two, each anchored on the newest post of the page before
+    assert befores[0] == cursor
+    assert len(befores) == 3 and None not in befores
+    assert monitor.state.cursors()["buildapcsales"]["fullname"] == fake_reddit.posts[-1].fullname
+
+    assert monitor.check_for_updates() == []
+
+
+def test_seen_set_eviction_survives_restart(tmp_path):
+    path = str(tmp_path / "seen.db")
+    store = RedditStateStore(path, max_seen=5)
+    for number in range(8):
+        store.mark_seen([f"t3_p{number}"])
+    store.close()
+
+    store = RedditStateStore(path, max_seen=5)
+    assert [store.is_seen(f"t3_p{number}") for number in range(8)] == [False] * 3 + [True] * 5
+    assert store._db.execute("SELECT COUNT(*) FROM reddit_seen").fetchone()[0] == 5
+    store.close()
+
+    # A smaller cap after a restart trims the stored set to the newest entries
+    store = RedditStateStore(path, max_seen=2)
+    assert [store.is_seen(f"t3_p{number}") for number in range(8)] == [False] * 6 + [True] * 2
+    assert store._db.execute("SELECT COUNT(*) FROM reddit_seen").fetchone()[0] == 2
+    store.close()
+
+
+def test_restart_does_not_re_report(fake_reddit, make_monitor):
+    for number in range(8):
+        fake_reddit.add_post("nvidia", f"RTX 5090 post {number}")
+    monitor = make_monitor(fake_reddit)
+    assert len(monitor.check_for_updates()) == 8
+    monitor.close()
+
+    restarted = make_monitor(fake_reddit)
+    assert restarted.check_for_updates() == []
+    fake_reddit.add_post("nvidia", "RTX 5090 post 8")
+    assert reported(restarted.check_for_updates()) == ["RTX 5090 post 8"]
+
+
+def test_removed_cursor_falls_back_to_latest_page(fake_reddit, make_monitor):
+    fake_reddit.add_post("nvidia", "RTX 5090 first")
+    anchor = fake_reddit.add_post("nvidia", "RTX 5090 second")
+    monitor = make_monitor(fake_reddit)
+    assert len(monitor.check_for_updates()) == 2
+    assert monitor.state.cursors()["nvidia"]["fullname"] == anchor.fullname
+
+    fake_reddit.remove(anchor)
+    fake_reddit.add_post("nvidia", "RTX 5090 third")
+    # The seen-set keeps "first" from being reported again
+    assert reported(monitor.check_for_updates()) == ["RTX 5090 third"]
+    assert monitor.state.cursors()["nvidia"]["fullname"] == fake_reddit.posts[-1].fullname
+
+    fake_reddit.add_post("nvidia", "RTX 5090 fourth")
+    assert reported(monitor.check_for_updates()) == ["RTX 5090 fourth"]
+
+
+def test_cursor_outside_listing_window_recovers(tmp_path, make_monitor):
+    reddit = FakeReddit(window=20)
+    reddit.add_post("nvidia", "RTX 5090 before downtime")
+    monitor = make_monitor(reddit, page_limit=10)
+    assert len(monitor.check_for_updates()) == 1
+
+    # More posts than the listing reaches back: the cursor post is no longer listed
+    for number in range(25):
+        reddit.add_post("nvidia", f"Build help {number}")
+    reddit.add_post("nvidia", "RTX 5090 during downtime")
+    assert reported(monitor.check_for_updates()) == ["RTX 5090 during downtime"]
+
+    # The cursor restarted from the latest page, so the next check pages forward again
+    reddit.add_post("nvidia", "RTX 5090 after downtime")
+    reddit.requests.clear()
+    assert reported(monitor.check_for_updates()) == ["RTX 5090 after downtime"]
+    assert reddit.requests[0][1].get("before") == reddit.posts[-2].fullname
+
+
+def test_cursor_still_listed_with_nothing_new(fake_reddit, make_monitor):
+    fake_reddit.add_post("nvidia", "RTX 5090 only post")
+    monitor = make_monitor(fake_reddit)
+    monitor.check_for_updates()
+    cursors = monitor.state.cursors()
+
+    assert monitor.check_for_updates() == []
+    assert monitor.state.cursors() == cursors
+
+
+def test_priority_candidates_survive_a_failed_check(fake_reddit, make_monitor):
+    post = fake_reddit.add_post("nvidia", "NVIDIA priority access invitations are out")
+    monitor = make_monitor(fake_reddit)
+    monitor.check_for_updates()
+
+    def failing_search(*args, **kwargs):
+        raise RuntimeError("search unavailable")
+
+    subreddit = fake_reddit.subreddit
+    fake_reddit.subreddit = lambda name: SimpleNamespace(search=failing_search)
+    assert monitor.check_nvidia_priority_access() == []
+    assert post.fullname in monitor._priority_candidates
+
+    fake_reddit.subreddit = subreddit
+    [info] = monitor.check_nvidia_priority_access()
+    assert (info["new_analysis"], info["updated"]) == (True, False)
+    assert monitor._priority_candidates == {}
+
+
+def test_edited_priority_post_is_an_update(fake_reddit, make_monitor):
+    post = fake_reddit.add_post("nvidia", "NVIDIA priority access invitations are out")
+    monitor = make_monitor(fake_reddit)
+    monitor.check_for_updates()
+    [info] = monitor.check_nvidia_priority_access()
+    assert (info["new_analysis"], info["updated"]) == (True, False)
+
+    [info] = monitor.check_nvidia_priority_access()
+    assert (info["new_analysis"], info["updated"]) == (False, False)
+
+    post.edited = post.created_utc + 60
+    [info] = monitor.check_nvidia_priority_access()
+    assert (info["new_analysis"], info["updated"]) == (True, True)
+
+
+def test_failed_hot_listing_keeps_new_posts(fake_reddit, make_monitor):
+    monitor = make_monitor(fake_reddit)
+    monitor.check_for_updates()
+    fake_reddit.add_post("nvidia", "RTX 5090 restock now")
+
+    def failing_hot(limit):
+        raise RuntimeError("hot listing unavailable")
+
+    subreddit = fake_reddit.subreddit
+    fake_reddit.subreddit = lambda name: SimpleNamespace(hot=failing_hot)
+    assert reported(monitor.check_for_updates()) == ["RTX 5090 restock now"]
+
+    fake_reddit.subreddit = subreddit
+    assert monitor.check_for_updates() == []
@@ -0,0 +1,23 @@
+import pytest
+
+from src.retailers.bestbuy_retailer import BestBuyRetailer
+from src.retailers.newegg_retailer import NeweggRetailer
+
+
+def search_with_buttons(retailer, monkeypatch, buttons):
+    """Run a search whose extracted products carry the given button labels."""
+    products = [{"name": f"RTX 5090 #{index}", "button_text": text} for index, text in enumerate(buttons)]
+    monkeypatch.setattr(retailer, "fetch_page", lambda url, selector: {"url": url})
+    monkeypatch.setattr(retailer, "analyze_search_page", lambda instruction, page, query: products)
+    return [product["button_text"] for product in retailer.search_products("RTX 5090")]
+
+
+@pytest.mark.parametrize("retailer_class, buttons, available", [
+    (BestBuyRetailer, ["See Details", "SEE DETAILS", "See details ", "Sold Out", None],
+     ["See Details", "SEE DETAILS", "See details "]),
+    (NeweggRetailer, ["Add to cart", "Add to Cart", "ADD TO CART ", "Auto Notify", None],
+     ["Add to cart", "Add to Cart", "ADD TO CART "]),
+])
+def test_button_labels_match_regardless_of_case(monkeypatch, retailer_class, buttons, available):
+    retailer = retailer_class(ai_agent=None)
+    assert search_with_buttons(retailer, monkeypatch, buttons) == available